@@ -4,205 +4,651 @@
 3D 오목 게임 - AI 플레이어
 """
 
+import copy
+import json
+import time
+import zlib
 import random
+import itertools
 import numpy as np
+from transposition import (TranspositionTable, position_key, size_key, encode_move,
+                           decode_move, EXACT, LOWER, UPPER)
+from patterns import (RUN_CLASS_ARRAY, RUN_CLASS_COUNT, THREAT, THREAT_OPEN_THREE, THREAT_FOUR,
+                      THREAT_FIVE, run_class)
+from rules import has_forbidden_moves, classify_moves
+from solver import ProofSolver, RESULT_WIN, RESULT_DRAW
+
+# 탐색 생성기가 내보내는 요청 종류 (요청은 (종류, 보드, 둘 차례))
+REQUEST_THREATS = 'threats'     # 답: (후보 수, 둘 수 있는지, 최고 공격 등급, 5를 만드는지,
+                                #       상대 5 자리인지, 정렬 점수 내림차순 후보 순서)
+REQUEST_EVALUATE = 'evaluate'   # 답: evaluate_board 점수
+
+
+class SearchTimeout(Exception):
+    """시간 제한 탐색이 마감을 넘김 (끝내지 못한 반복은 버림)"""
+
 
 class AIPlayer:
     """AI 플레이어 클래스"""
     
+    # 승리 점수 (승리까지 남은 수만큼 빼서 빠른 승리를 선호)
+    WIN_SCORE = 1000000
+    MAX_PLY = 1000
+    INFINITY = 10000000
+    
+    # 애스피레이션 윈도 반폭과 정지 탐색 최대 깊이
+    ASPIRATION_WINDOW = 500
+    QUIESCENCE_DEPTH = 6
+    
+    # 내부 노드와 정지 탐색에서 볼 최대 후보 수
+    MAX_BRANCHING = 12
+    QUIESCENCE_BRANCHING = 6
+    
+    # 볼 수가 이 이하로 남으면 증명수 탐색으로 정확한 결과를 먼저 찾아봄
+    SOLVER_MOVES = 12
+    SOLVER_NODE_BUDGET = 20000
+    
+    # 빈 칸 전체에서 무작위로 고를 때 좌표를 뽑아 보는 횟수 (모두 실패하면 빈 칸을 훑음)
+    RANDOM_MOVE_TRIES = 64
+    # 보통 난이도가 먼저 고르는 중앙 근처의 거리 (맨해튼 거리)
+    CENTER_DISTANCE = 3
+    
+    # 시간 제한 탐색 (clock.TimeManager가 정한 목표/최대 시간 안에서 반복 심화)
+    # - 전술 국면과 반복마다 최선의 수가 바뀔 때 목표 시간에 곱하는 배율 (최대 시간까지)
+    # - 다음 반복이 이번 반복보다 오래 걸린다고 보는 배수의 범위와 최대 깊이
+    # - 끝내기 해결기에 목표 시간의 절반을 줄 때 초당 노드 수 추정값
+    TACTICAL_TIME_SCALE = 1.5
+    UNSTABLE_TIME_SCALE = 1.5
+    MIN_ITERATION_GROWTH = 2.0
+    MAX_ITERATION_GROWTH = 4.0
+    MAX_TIMED_DEPTH = 30
+    SOLVER_NODES_PER_SECOND = 2000
+    
+    # 수 정렬에 쓰는 위협 등급별 가중치 (patterns.THREAT_* 순서)
+    THREAT_ORDER_WEIGHTS = [0, 1, 4, 40, 60, 1000, 10000]
+    
+    # 평가의 라인 점수 (이름 -> 점수). tune.py가 자체 대국으로 조정한 가중치 파일로 바꿀 수 있음
+    DEFAULT_LINE_WEIGHTS = {'five': 10000, 'open_four': 1000, 'four': 100, 'open_three': 100,
+                            'three': 10, 'open_two': 10, 'two': 1}
+    # (연속 개수, 막힌 쪽 수) -> 라인 점수 이름 (5개 이상은 막힘과 무관하게 'five')
+    LINE_WEIGHT_NAMES = {(4, 0): 'open_four', (4, 1): 'four', (3, 0): 'open_three',
+                         (3, 1): 'three', (2, 0): 'open_two', (2, 1): 'two'}
+    
     def __init__(self):
         """AI 플레이어 초기화"""
         self.difficulty = "medium"  # easy, medium, hard
-    
-    def get_best_move(self, board, player):
-        """최선의 수를 찾는 함수"""
-        valid_moves = board.get_valid_moves()
+        self.search_depth = 3  # 어려운 난이도의 탐색 깊이
         
-        if not valid_moves:
-            return None
+        # 평가 캐시 (대칭 정규형 해시 -> 점수, 대칭 국면끼리 공유)
+        self.eval_cache = {}
+        self.eval_cache_limit = 200000
+        
+        # 라인 점수와 그것을 연속 개수 분류 번호로 펼친 조회표 (run_scores, run_score_array)
+        self.set_line_weights(self.DEFAULT_LINE_WEIGHTS)
+        
+        # 후보 수 전체를 배열 연산으로 분류할 때 쓰는 numpy 사본
+        self.order_weight_array = np.array(self.THREAT_ORDER_WEIGHTS, dtype=np.int64)
         
+        # 탐색 치환표와 마지막 탐색의 노드 수
+        self.transposition_table = TranspositionTable()
+        self.nodes = 0
+        # 시간 제한 탐색의 마감 시각 (time.perf_counter 기준, 없으면 깊이만큼 끝까지 탐색)
+        self.deadline = None
+        
+        # 끝내기 해결기 (결과 파일을 쓰려면 ProofSolver(path)로 바꿔 끼움)
+        self.solver = ProofSolver(node_budget=self.SOLVER_NODE_BUDGET)
+    
+    def fork(self):
+        """치환표, 평가 캐시, 가중치는 함께 쓰고 노드 수와 마감 시각만 따로 두는 사본
+        (한 스레드에서 여러 탐색 생성기를 번갈아 돌릴 때 탐색마다 하나씩 씀)"""
+        searcher = copy.copy(self)
+        searcher.nodes = 0
+        searcher.deadline = None
+        return searcher
+    
+    def get_best_move(self, board, player, time_limits=None):
+        """최선의 수를 찾는 함수 (time_limits = (목표 시간, 최대 시간) 이면 어려운 난이도는 시간 제한 탐색)"""
         # 난이도에 따른 AI 로직
+        # 보드 넓이에 비례하지 않도록 승리/막기와 탐색은 돌 주변 후보 수만 보고, 무작위 수는
+        # 좌표를 뽑아 빈 칸 전체에서 고름. 금수 확인은 고르는 수에만 함
+        # (어려운 난이도는 탐색의 후보 분류가 함께 판정)
         if self.difficulty == "easy":
-            return self.get_random_move(valid_moves)
+            move = self.get_random_move(board, player)
         elif self.difficulty == "medium":
-            return self.get_medium_move(board, valid_moves, player)
+            move = self.get_medium_move(board, board.get_candidate_moves(), player)
         else:  # hard
-            return self.get_hard_move(board, valid_moves, player)
+            move = self.get_hard_move(board, board.get_candidate_moves(), player, time_limits)
+        
+        # 후보가 모두 금수일 때만 빈 칸을 모두 훑음
+        if move is None:
+            move = self.first_playable(board, board.get_valid_moves(), player)
+        return move
+    
+    def first_playable(self, board, moves, player):
+        """moves 중 player가 둘 수 있는 첫 수 (없으면 None)"""
+        for move in moves:
+            if self.is_playable(board, move, player):
+                return move
+        return None
     
-    def get_random_move(self, valid_moves):
-        """랜덤 수 선택 (쉬운 난이도)"""
-        return random.choice(valid_moves)
+    def get_random_move(self, board, player, excluded=()):
+        """랜덤 수 선택 (쉬운 난이도) - excluded 밖의 빈 칸 전체에서 고르게 뽑은 둘 수 있는 수
+
+        보드 넓이에 비례하지 않도록 무작위 좌표를 먼저 뽑아 보고, 빈 칸이 적어 모두 실패하면
+        빈 칸을 훑는다. 크기 제한이 없는 보드는 빈 칸을 셀 수 없으므로 돌 주변 후보에서 고른다.
+        """
+        if board.rows is not None:
+            sides = ((board.cols, board.rows, board.layers) if len(board.center()) == 3
+                     else (board.cols, board.rows))
+            for _ in range(self.RANDOM_MOVE_TRIES):
+                move = tuple(random.randrange(side) for side in sides)
+                if (move not in excluded and board.is_valid_move(*move) and
+                        self.is_playable(board, move, player)):
+                    return move
+        moves = [move for move in board.get_valid_moves() if move not in excluded]
+        random.shuffle(moves)
+        return self.first_playable(board, moves, player)
     
     def get_medium_move(self, board, valid_moves, player):
-        """중간 난이도 AI - 기본적인 전략 사용"""
-        # 즉시 승리할 수 있는 수가 있는지 확인
-        for x, y in valid_moves:
-            test_board = board.copy()
-            test_board.place_stone(x, y, player)
-            if test_board.check_win(x, y, player):
-                return (x, y)
+        """중간 난이도 AI - 기본적인 전략 사용
+
+        바로 이기거나 막는 자리는 돌 바로 옆이므로 valid_moves (돌 주변 후보) 에서 찾고,
+        없으면 중앙 근처의 빈 칸, 그것도 없으면 나머지 빈 칸 전체에서 무작위로 고른다.
+        """
+        # 즉시 승리할 수 있는 수가 있는지 확인 (check_win은 빈 칸을 그 돌로 보고 판정)
+        for move in valid_moves:
+            if board.check_win(*move, player) and self.is_playable(board, move, player):
+                return move
         
         # 상대방이 즉시 승리할 수 있는 수를 막기
         opponent = 3 - player
-        for x, y in valid_moves:
-            test_board = board.copy()
-            test_board.place_stone(x, y, opponent)
-            if test_board.check_win(x, y, opponent):
-                return (x, y)
-        
-        # 중앙 근처의 수 우선 선택
-        center_x, center_y = board.cols // 2, board.rows // 2
-        center_moves = []
-        other_moves = []
-        
-        for x, y in valid_moves:
-            distance = abs(x - center_x) + abs(y - center_y)
-            if distance <= 3:
-                center_moves.append((x, y))
-            else:
-                other_moves.append((x, y))
+        for move in valid_moves:
+            if board.check_win(*move, opponent) and self.is_playable(board, move, player):
+                return move
         
-        if center_moves:
-            return random.choice(center_moves)
+        # 중앙 근처의 수 우선 선택 (3D 보드는 좌표가 3개)
+        center = board.center()
+        reach = self.CENTER_DISTANCE
+        center_cells = {tuple(c + d for c, d in zip(center, offset))
+                        for offset in itertools.product(range(-reach, reach + 1), repeat=len(center))
+                        if sum(abs(d) for d in offset) <= reach}
+        center_moves = [move for move in center_cells if board.is_valid_move(*move)]
+        random.shuffle(center_moves)
+        move = self.first_playable(board, center_moves, player)
+        if move is not None:
+            return move
+        return self.get_random_move(board, player, center_cells)
+    
+    def get_hard_move(self, board, valid_moves, player, time_limits=None):
+        """어려운 난이도 AI - 끝내기는 증명수 탐색, 나머지는 반복 심화 PVS 탐색 사용"""
+        node_budget = None
+        if time_limits is not None:
+            node_budget = min(self.SOLVER_NODE_BUDGET,
+                              int(time_limits[0] / 2 * self.SOLVER_NODES_PER_SECOND))
+        solved_move = self.solve_endgame(board, player, node_budget)
+        if solved_move is not None:
+            return solved_move
+        if time_limits is not None:
+            best_move, _ = self.search(board, player, self.MAX_TIMED_DEPTH, time_limits)
         else:
-            return random.choice(other_moves)
+            best_move, _ = self.search(board, player, self.search_depth)
+        return best_move if best_move is not None else self.first_playable(board, valid_moves, player)
     
-    def get_hard_move(self, board, valid_moves, player):
-        """어려운 난이도 AI - 미니맥스 알고리즘 사용"""
+    def solve_endgame(self, board, player, node_budget=None):
+        """볼 수가 적게 남았으면 이기거나 비기는 것이 증명된 수 (증명하지 못하면 None)
+
+        이미 증명해 저장한 국면은 탐색 없이 바로 돌려준다.
+        """
+        if board.live_windows[1] is None:
+            return None  # 크기 제한이 없는 보드
+        # 이길 수 있는 창마다 빈 칸이 있고 한 칸은 창 (5 x 방향 수) 개에만 드므로,
+        # 창이 많이 남았으면 보드를 훑지 않고도 볼 수가 많다는 것을 안다
+        if max(board.live_windows[1:]) > self.SOLVER_MOVES * 5 * len(board.directions):
+            return None
+        if len(self.solver.generate_moves(board)) > self.SOLVER_MOVES:
+            return None
+        result, move = self.solver.solve(board, player, node_budget)
+        if result in (RESULT_WIN, RESULT_DRAW):
+            return move
+        return None
+    
+    def search(self, board, player, depth, time_limits=None):
+        """반복 심화 + 애스피레이션 윈도 탐색 - (최선의 수, 점수) 반환
+
+        depth는 첫 수 아래로 더 내려가는 깊이이다 (전체 depth + 1 수).
+        time_limits = (목표 시간, 최대 시간) 을 주면 depth는 최대 깊이이고 시간을 보고 멈춘다.
+        """
+        return self.run_steps(self.search_steps(board, player, depth, time_limits))
+    
+    def run_steps(self, steps):
+        """탐색 생성기를 요청마다 바로 답하며 끝까지 실행하고 반환값을 돌려줌"""
+        try:
+            request = next(steps)
+            while True:
+                request = steps.send(self.answer(request))
+        except StopIteration as stop:
+            return stop.value
+    
+    def answer(self, request):
+        """탐색 요청 (종류, 보드, 플레이어) 하나에 답함 - 여러 국면을 묶어 답하는 쪽은 batch_service"""
+        kind, board, player = request
+        if kind == REQUEST_EVALUATE:
+            return self.evaluate_board(board, player)
+        candidates = board.get_candidate_moves()
+        attack, defense, playable = self.get_threat_matrices(board, candidates, player)
+        best, wins, fives, priority = self.score_threats(attack.T, defense.T)
+        return candidates, playable, best, wins, fives, np.argsort(-priority, kind='stable')
+    
+    def score_threats(self, attack, defense):
+        """(방향 수, 수 개수) 위협 등급 배열로 후보 수 점수 계산
+        - (최고 공격 등급, 5를 만드는지, 상대 5 자리인지, 정렬 점수)
+
+        정렬 점수는 공격 가중치 두 배와 수비 가중치의 합이다. 방향을 첫 축에 두면
+        여러 국면의 후보를 이어 붙인 긴 배열도 방향 수만큼의 원소별 연산으로 끝난다.
+        """
+        weights = self.order_weight_array
+        return (attack.max(axis=0, initial=0), (attack == THREAT_FIVE).any(axis=0),
+                (defense == THREAT_FIVE).any(axis=0),
+                weights[attack].sum(axis=0) * 2 + weights[defense].sum(axis=0))
+    
+    def search_steps(self, board, player, depth, time_limits=None):
+        """search의 생성기 판 (평가와 후보 수 분류는 요청으로 내보내고 답을 받아 진행)"""
+        board = board.copy()
+        self.nodes = 0
+        best_move, score = None, 0
+        
+        # 무승부가 확정된 국면은 어디에 두어도 같으므로 탐색하지 않음
+        if board.is_dead():
+            moves = self.order_candidates((yield (REQUEST_THREATS, board, player)), limit=1)
+            return (moves[0] if moves else None), 0
+        
+        if time_limits is not None:
+            start = time.perf_counter()
+            target, limit = time_limits
+            threats = yield (REQUEST_THREATS, board, player)
+            moves = self.order_candidates(threats)
+            # 둘 수가 하나뿐이면 (5 만들기, 하나뿐인 막기, 빈 보드 중앙) 시간을 쓰지 않음
+            if len(moves) <= 1:
+                return (moves[0] if moves else None), 0
+            # 한 반복도 끝내지 못하면 정렬 첫 수를 둠
+            best_move = moves[0]
+            if self.is_tactical(threats, (yield (REQUEST_THREATS, board, 3 - player))):
+                target = min(target * self.TACTICAL_TIME_SCALE, limit)
+            self.deadline = start + limit
+            previous_time = None
+        
+        try:
+            for iteration in range(depth + 1):
+                iteration_start = time.perf_counter()
+                if iteration == 0:
+                    alpha, beta = -self.INFINITY, self.INFINITY
+                else:
+                    # 이전 반복의 점수 주변 좁은 창으로 먼저 탐색
+                    alpha, beta = score - self.ASPIRATION_WINDOW, score + self.ASPIRATION_WINDOW
+                
+                while True:
+                    move, result = yield from self.search_root_steps(board, player, iteration + 1,
+                                                                     alpha, beta, best_move)
+                    # 창을 벗어나면 넓혀서 다시 탐색 (이미 무한 창이면 그 결과가 끝, 예: 둘 수 있는 수가 없음)
+                    if result <= alpha and alpha > -self.INFINITY:
+                        alpha = -self.INFINITY  # 창 아래로 실패: 다시 탐색
+                    elif result >= beta and beta < self.INFINITY:
+                        beta = self.INFINITY    # 창 위로 실패: 다시 탐색
+                    else:
+                        break
+                
+                if time_limits is not None and iteration and move != best_move:
+                    # 반복마다 최선의 수가 바뀌면 더 깊이 볼 가치가 있으므로 목표 시간을 늘림
+                    target = min(target * self.UNSTABLE_TIME_SCALE, limit)
+                best_move, score = move, result
+                if self.is_win_score(abs(score)):
+                    break
+                
+                if time_limits is not None:
+                    # 다음 반복은 이번 반복의 (직전 반복 대비 늘어난) 배수만큼 걸린다고 보고,
+                    # 그 반복이 목표 시간 안에 끝나지 않을 것 같으면 멈춤
+                    now = time.perf_counter()
+                    iteration_time = now - iteration_start
+                    growth = self.MIN_ITERATION_GROWTH
+                    if previous_time:
+                        growth = min(max(growth, iteration_time / previous_time),
+                                     self.MAX_ITERATION_GROWTH)
+                    previous_time = iteration_time
+                    if now - start + iteration_time * growth > target:
+                        break
+        except SearchTimeout:
+            pass  # 마감까지 끝내지 못한 반복은 버리고 마지막으로 끝낸 반복의 결과를 씀
+        finally:
+            self.deadline = None
+        
+        return best_move, score
+    
+    def search_root(self, board, player, depth, alpha, beta, first_move=None):
+        """루트 PVS - (최선의 수, 점수) 반환"""
+        return self.run_steps(self.search_root_steps(board, player, depth, alpha, beta, first_move))
+    
+    def search_root_steps(self, board, player, depth, alpha, beta, first_move=None):
+        """search_root의 생성기 판"""
+        opponent = 3 - player
+        moves = self.order_candidates((yield (REQUEST_THREATS, board, player)), first_move)
+        best_move, best_score = (moves[0] if moves else None), -self.INFINITY
+        
+        for i, move in enumerate(moves):
+            board.place_stone(*move, player)
+            if i == 0:
+                score = -(yield from self.negamax_steps(board, depth - 1, -beta, -alpha,
+                                                        opponent, move, 1))
+            else:
+                score = -(yield from self.negamax_steps(board, depth - 1, -alpha - 1, -alpha,
+                                                        opponent, move, 1))
+                if alpha < score < beta:
+                    score = -(yield from self.negamax_steps(board, depth - 1, -beta, -alpha,
+                                                            opponent, move, 1))
+            board.remove_stone(*move)
+            
+            if score > best_score:
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+        
+        return best_move, best_score
+    
+    def score_moves(self, board, valid_moves, player, depth):
+        """각 수를 둔 뒤의 정확한 탐색 점수 {수: 점수} (둔 쪽 기준)"""
+        board = board.copy()
+        opponent = 3 - player
+        scores = {}
+        for move in valid_moves:
+            board.place_stone(*move, player)
+            scores[move] = -self.negamax(board, depth, -self.INFINITY, self.INFINITY,
+                                         opponent, move, 1)
+            board.remove_stone(*move)
+        return scores
+    
+    def pick_best(self, scores):
+        """점수표에서 (최선의 수, 점수) 선택 (동점이면 먼저 나온 수)"""
         best_score = float('-inf')
         best_move = None
+        for move, score in scores.items():
+            if score > best_score:
+                best_score = score
+                best_move = move
+        return best_move, best_score
+    
+    def analyze_position(self, board, player, depth=None):
+        """국면 분석 - (최선의 수, 최선 점수, 후보 수별 점수표) 반환"""
+        candidates = board.get_candidate_moves()
+        if not candidates or board.is_full() or board.is_dead():
+            return None, 0, {}
+        if depth is None:
+            depth = self.search_depth
+        scores = self.score_moves(board, candidates, player, depth)
+        best_move, best_score = self.pick_best(scores)
+        return best_move, best_score, scores
+    
+    def is_win_score(self, score):
+        """강제 승리 점수인지 확인"""
+        return score >= self.WIN_SCORE - self.MAX_PLY
+    
+    def negamax(self, board, depth, alpha, beta, player, last_move, ply):
+        """PVS 네가맥스 (점수는 둘 차례인 player 기준)"""
+        return self.run_steps(self.negamax_steps(board, depth, alpha, beta, player, last_move, ply))
+    
+    def negamax_steps(self, board, depth, alpha, beta, player, last_move, ply):
+        """negamax의 생성기 판"""
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+        opponent = 3 - player
         
-        for x, y in valid_moves:
-            test_board = board.copy()
-            test_board.place_stone(x, y, player)
-            
-            # 미니맥스 알고리즘으로 점수 계산
-            score = self.minimax(test_board, 3, False, player, float('-inf'), float('inf'))
+        # 승리는 직전 수로만 생기므로 그 자리만 확인
+        if board.check_win(*last_move, opponent):
+            return -(self.WIN_SCORE - ply)
+        # 양쪽 모두 이길 수 있는 5칸 창이 없으면 더 볼 것 없이 무승부
+        if board.is_full() or board.is_dead():
+            return 0
+        if depth <= 0:
+            return (yield from self.quiescence_steps(board, alpha, beta, player, ply,
+                                                     self.QUIESCENCE_DEPTH))
+        
+        # 치환표 확인
+        alpha_orig = alpha
+        key, transform = position_key(board, player)
+        entry = self.transposition_table.probe(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, flag, entry_score, move_index = entry
+            tt_move = decode_move(board, move_index, transform)
+            if entry_depth >= depth:
+                entry_score = self.score_from_table(entry_score, ply)
+                if flag == EXACT:
+                    return entry_score
+                if flag == LOWER and entry_score >= beta:
+                    return entry_score
+                if flag == UPPER and entry_score <= alpha:
+                    return entry_score
+        
+        best_score, best_move = -self.INFINITY, None
+        moves = self.order_candidates((yield (REQUEST_THREATS, board, player)), tt_move,
+                                      self.MAX_BRANCHING)
+        for i, move in enumerate(moves):
+            board.place_stone(*move, player)
+            if i == 0:
+                score = -(yield from self.negamax_steps(board, depth - 1, -beta, -alpha,
+                                                        opponent, move, ply + 1))
+            else:
+                # 널 윈도로 확인하고, 더 좋으면 전체 창으로 재탐색
+                score = -(yield from self.negamax_steps(board, depth - 1, -alpha - 1, -alpha,
+                                                        opponent, move, ply + 1))
+                if alpha < score < beta:
+                    score = -(yield from self.negamax_steps(board, depth - 1, -beta, -alpha,
+                                                            opponent, move, ply + 1))
+            board.remove_stone(*move)
             
             if score > best_score:
-                best_score = score
-                best_move = (x, y)
+                best_score, best_move = score, move
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
         
-        return best_move
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.transposition_table.store(key, depth, flag, self.score_to_table(best_score, ply),
+                                       encode_move(board, best_move, transform))
+        return best_score
+    
+    def quiescence(self, board, alpha, beta, player, ply, qdepth):
+        """정지 탐색 - 깊이 0 이후에도 4와 열린 3 같은 강제 수는 계속 탐색"""
+        return self.run_steps(self.quiescence_steps(board, alpha, beta, player, ply, qdepth))
     
-    def minimax(self, board, depth, is_maximizing, player, alpha, beta):
-        """미니맥스 알고리즘 (알파-베타 가지치기 포함)"""
+    def quiescence_steps(self, board, alpha, beta, player, ply, qdepth):
+        """quiescence의 생성기 판"""
+        self.nodes += 1
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
         opponent = 3 - player
+        if board.is_dead():
+            return 0
+        my_threats, opponent_fives = self.pick_threats((yield (REQUEST_THREATS, board, player)))
         
-        # 종료 조건
-        if depth == 0 or board.is_full():
-            return self.evaluate_board(board, player)
+        # 바로 5를 만들 수 있으면 승리
+        if my_threats and my_threats[0][0] == THREAT_FIVE:
+            return self.WIN_SCORE - (ply + 1)
+        # 상대의 5 자리가 둘 이상이면 막을 수 없음
+        if len(opponent_fives) >= 2:
+            return -(self.WIN_SCORE - (ply + 2))
+        if qdepth <= 0:
+            return (yield (REQUEST_EVALUATE, board, player))
         
-        # 승리 조건 확인
-        for y in range(board.rows):
-            for x in range(board.cols):
-                if board.board[y][x] != 0:
-                    if board.check_win(x, y, board.board[y][x]):
-                        if board.board[y][x] == player:
-                            return 1000
-                        else:
-                            return -1000
-        
-        valid_moves = board.get_valid_moves()
-        
-        if is_maximizing:
-            max_eval = float('-inf')
-            for x, y in valid_moves:
-                test_board = board.copy()
-                test_board.place_stone(x, y, player)
-                eval_score = self.minimax(test_board, depth - 1, False, player, alpha, beta)
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            for x, y in valid_moves:
-                test_board = board.copy()
-                test_board.place_stone(x, y, opponent)
-                eval_score = self.minimax(test_board, depth - 1, True, player, alpha, beta)
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            return min_eval
+        # 상대의 4는 반드시 막아야 함
+        if opponent_fives:
+            move = opponent_fives[0]
+            if not self.is_playable(board, move, player):
+                return -(self.WIN_SCORE - (ply + 2))  # 막는 자리가 금수
+            board.place_stone(*move, player)
+            score = -(yield from self.quiescence_steps(board, -beta, -alpha, opponent, ply + 1,
+                                                       qdepth - 1))
+            board.remove_stone(*move)
+            return score
+        
+        stand_pat = yield (REQUEST_EVALUATE, board, player)
+        if stand_pat >= beta:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+        
+        for threat, move in my_threats[:self.QUIESCENCE_BRANCHING]:
+            board.place_stone(*move, player)
+            score = -(yield from self.quiescence_steps(board, -beta, -alpha, opponent, ply + 1,
+                                                       qdepth - 1))
+            board.remove_stone(*move)
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        
+        return alpha
+    
+    def score_to_table(self, score, ply):
+        """승리 점수는 현재 노드 기준 거리로 바꿔 저장"""
+        if self.is_win_score(score):
+            return score + ply
+        if self.is_win_score(-score):
+            return score - ply
+        return score
+    
+    def score_from_table(self, score, ply):
+        """저장된 승리 점수를 루트 기준 거리로 복원"""
+        if self.is_win_score(score):
+            return score - ply
+        if self.is_win_score(-score):
+            return score + ply
+        return score
+    
+    def order_moves(self, board, player, first_move=None, limit=None):
+        """후보 수를 공격/수비 위협 순으로 정렬 (first_move는 맨 앞, 최대 limit개)"""
+        return self.order_candidates(self.answer((REQUEST_THREATS, board, player)), first_move, limit)
+    
+    def order_candidates(self, threats, first_move=None, limit=None):
+        """위협 요청의 답으로 order_moves 계산"""
+        candidates, playable, best, wins, fives, order = threats
+        
+        # 5를 만들 수 있으면 그 수만, 상대의 5를 막아야 하면 막는 수만 본다
+        # (막는 자리가 모두 금수면 막을 수 없으므로 나머지 수를 그대로 본다)
+        wins = np.flatnonzero(wins & playable)
+        if len(wins):
+            return [candidates[wins[0]]]
+        blocks = np.flatnonzero(fives & playable)
+        if len(blocks):
+            return [candidates[i] for i in blocks]
+        
+        moves = [candidates[i] for i in order[playable[order]]]
+        if first_move is not None and first_move in moves:
+            moves.remove(first_move)
+            moves.insert(0, first_move)
+        if limit is not None:
+            moves = moves[:limit]
+        return moves
+    
+    def find_threats(self, board, player):
+        """(내 위협 수 목록 [(등급, 수)] 내림차순, 상대의 5 자리 목록)"""
+        return self.pick_threats(self.answer((REQUEST_THREATS, board, player)))
+    
+    def is_tactical(self, threats, opponent_threats):
+        """양쪽 위협 요청의 답으로 어느 쪽이든 4 이상을 만들 수 있는 (이미 3이 있는) 국면인지"""
+        return any(((best >= THREAT_FOUR) & playable).any()
+                   for _, playable, best, _, _, _ in (threats, opponent_threats))
+    
+    def pick_threats(self, threats):
+        """위협 요청의 답으로 find_threats 계산"""
+        candidates, playable, best, wins, fives, order = threats
+        rows = np.flatnonzero((best >= THREAT_OPEN_THREE) & playable)
+        rows = rows[np.argsort(-best[rows].astype(np.int64), kind='stable')]
+        my_threats = [(threat, candidates[i]) for threat, i in zip(best[rows].tolist(), rows)]
+        opponent_fives = [candidates[i] for i in np.flatnonzero(fives)]
+        return my_threats, opponent_fives
+    
+    def get_threat_matrices(self, board, moves, player):
+        """여러 수의 위협 등급 배열 (player 공격, 상대 수비, player가 둘 수 있는지) - rules.classify_moves"""
+        return classify_moves(board, moves, player)
+    
+    def is_playable(self, board, move, player):
+        """player가 move에 둘 수 있는지 (렌주 흑의 금수 제외)"""
+        return not (has_forbidden_moves(board.rule, player) and board.is_forbidden(*move))
+    
+    def get_move_threats(self, board, move, player):
+        """move에 player가 둘 때 방향별 위협 등급 (평면 4방향, 3D 13방향)"""
+        threats = THREAT[player]
+        return [threats[window] for window in board.get_windows(*move)]
+    
+    def eval_cache_key(self, board, player):
+        """평가 캐시 키 (정규형 해시에 보드 크기를 섞음 - 크기가 다른 보드가 캐시를 같이 씀)"""
+        return board.canonical_hash() ^ size_key(board), player
     
     def evaluate_board(self, board, player):
         """보드 상태 평가"""
-        opponent = 3 - player
-        score = 0
-        
-        # 각 위치에서 연속된 돌 개수 확인
-        for y in range(board.rows):
-            for x in range(board.cols):
-                if board.board[y][x] != 0:
-                    current_player = board.board[y][x]
-                    directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
-                    
-                    for dx, dy in directions:
-                        count = 1
-                        blocked = 0
-                        
-                        # 정방향 확인
-                        temp_x, temp_y = x + dx, y + dy
-                        while (0 <= temp_x < board.cols and 
-                               0 <= temp_y < board.rows and 
-                               board.board[temp_y][temp_x] == current_player):
-                            count += 1
-                            temp_x += dx
-                            temp_y += dy
-                        
-                        # 정방향 막힘 확인
-                        if not (0 <= temp_x < board.cols and 
-                               0 <= temp_y < board.rows and 
-                               board.board[temp_y][temp_x] == 0):
-                            blocked += 1
-                        
-                        # 역방향 확인
-                        temp_x, temp_y = x - dx, y - dy
-                        while (0 <= temp_x < board.cols and 
-                               0 <= temp_y < board.rows and 
-                               board.board[temp_y][temp_x] == current_player):
-                            count += 1
-                            temp_x -= dx
-                            temp_y -= dy
-                        
-                        # 역방향 막힘 확인
-                        if not (0 <= temp_x < board.cols and 
-                               0 <= temp_y < board.rows and 
-                               board.board[temp_y][temp_x] == 0):
-                            blocked += 1
-                        
-                        # 점수 계산
-                        if current_player == player:
-                            score += self.get_line_score(count, blocked)
-                        else:
-                            score -= self.get_line_score(count, blocked)
+        # 대칭인 국면은 평가 값이 같으므로 정규형 해시로 캐시
+        cache_key = self.eval_cache_key(board, player)
+        cached = self.eval_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
+        score = self._evaluate_board(board, player)
         
+        if len(self.eval_cache) >= self.eval_cache_limit:
+            self.eval_cache.clear()
+        self.eval_cache[cache_key] = score
         return score
     
+    def _evaluate_board(self, board, player):
+        """보드 상태 평가 (캐시 없이 직접 계산)
+
+        놓인 돌마다 모든 방향 패턴 창의 연속 개수 분류를 조회표에서 읽어 점수를 더한다.
+        """
+        if not board.stones:
+            return 0
+        windows = board.get_window_matrix(list(board.stones))
+        stone_scores = self.run_score_array[RUN_CLASS_ARRAY[windows]].sum(axis=1)
+        owners = np.fromiter(board.stones.values(), dtype=np.int64, count=len(board.stones))
+        return int(stone_scores[owners == player].sum() - stone_scores[owners != player].sum())
+    
     def get_line_score(self, count, blocked):
         """연속된 돌 개수에 따른 점수 계산"""
         if count >= 5:
-            return 10000
-        elif count == 4:
-            if blocked == 0:
-                return 1000
-            elif blocked == 1:
-                return 100
-        elif count == 3:
-            if blocked == 0:
-                return 100
-            elif blocked == 1:
-                return 10
-        elif count == 2:
-            if blocked == 0:
-                return 10
-            elif blocked == 1:
-                return 1
-        
-        return 0
+            return self.line_weights['five']
+        name = self.LINE_WEIGHT_NAMES.get((count, blocked))
+        return self.line_weights[name] if name else 0
+    
+    def set_line_weights(self, weights):
+        """라인 점수 교체 (빠진 이름은 기본값) - 평가 조회표를 다시 만들고 캐시를 비움"""
+        self.line_weights = dict(self.DEFAULT_LINE_WEIGHTS)
+        self.line_weights.update({name: int(round(weights[name]))
+                                  for name in self.DEFAULT_LINE_WEIGHTS if name in weights})
+        
+        # 연속 개수 분류 번호 -> 점수 (get_line_score를 조회표로 펼친 것)
+        self.run_scores = [0] * RUN_CLASS_COUNT
+        for count in range(6):
+            for blocked in range(3):
+                self.run_scores[run_class(count, blocked)] = self.get_line_score(count, blocked)
+        self.run_score_array = np.array(self.run_scores, dtype=np.int64)
+        
+        self.eval_cache.clear()
+        if hasattr(self, 'transposition_table'):
+            self.transposition_table.clear()
+    
+    def load_weights(self, path):
+        """tune.py가 쓴 가중치 파일 (JSON, {"weights": {이름: 점수}}) 읽기"""
+        with open(path, encoding='utf-8') as stream:
+            self.set_line_weights(json.load(stream)['weights'])
+    
+    def weights_tag(self):
+        """라인 점수를 구분하는 번호 (기본값이면 0) - 파일 치환표가 다른 평가의 점수를 버리는 데 씀"""
+        if self.line_weights == self.DEFAULT_LINE_WEIGHTS:
+            return 0
+        return zlib.crc32(json.dumps(self.line_weights, sort_keys=True).encode('ascii'))
     
     def set_difficulty(self, difficulty):
         """AI 난이도 설정"""
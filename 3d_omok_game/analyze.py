@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 기보 일괄 분석 도구
+
+기보를 스트리밍으로 읽어 여러 프로세스에 게임 단위로 나눠 주고,
+각 수마다 AI 평가 결과(평가 곡선, 악수, 놓친 필승)를 JSON Lines로 기록한다.
+
+--shared-table을 주면 워커들이 공유 메모리 치환표 하나를 함께 써서
+다른 워커가 이미 탐색한 국면을 다시 탐색하지 않는다.
+
+사용 예:
+    python analyze.py game_records -o annotations.jsonl --workers 8 --depth 1
+    python analyze.py game_records -o annotations.jsonl --workers 8 --shared-table 4000000
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import threading
+import multiprocessing
+from ai_player import AIPlayer
+from game_record import GameRecordStore, read_text
+from transposition import SharedTranspositionTable
+
+# 워커 프로세스마다 하나씩 만드는 AI
+_worker_ai = None
+_worker_options = None
+
+
+def _init_worker(depth, blunder_threshold, shared_table=None):
+    """워커 프로세스 초기화 (공유 치환표가 있으면 프로세스별 치환표 대신 사용)"""
+    global _worker_ai, _worker_options
+    _worker_ai = AIPlayer()
+    _worker_ai.search_depth = depth
+    if shared_table is not None:
+        _worker_ai.transposition_table = shared_table
+    _worker_options = {'blunder_threshold': blunder_threshold}
+
+
+def analyze_game(ai, game_id, record, blunder_threshold):
+    """한 판의 모든 수를 평가해 수별 주석 목록 반환"""
+    annotations = []
+    for board, ply, move, player in record.replay():
+        if move is None:
+            break
+        best_move, best_score, scores = ai.analyze_position(board, player)
+        if best_move is None:
+            # 이미 무승부로 정해진 (죽은) 국면 뒤에 이어 둔 수는 최선의 수 없이 무승부 점수
+            played_score = best_score
+        else:
+            if move not in scores:
+                # 후보 밖의 수는 따로 평가
+                scores.update(ai.score_moves(board, [move], player, ai.search_depth))
+            played_score = scores[move]
+        loss = best_score - played_score
+
+        annotations.append({
+            'game': game_id,
+            'ply': ply,
+            'player': player,
+            'move': list(move),
+            'best_move': list(best_move) if best_move is not None else None,
+            'eval': best_score,
+            'played_eval': played_score,
+            # 평가 곡선은 흑 기준 점수로 통일
+            'eval_black': best_score if player == 1 else -best_score,
+            'blunder': loss >= blunder_threshold,
+            'missed_win': ai.is_win_score(best_score) and not ai.is_win_score(played_score),
+        })
+    return annotations
+
+
+def _analyze_task(task):
+    """워커에서 실행되는 게임 하나 분석"""
+    game_id, record = task
+    return analyze_game(_worker_ai, game_id, record,
+                        _worker_options['blunder_threshold'])
+
+
+def iter_input(path):
+    """기보 저장소 디렉터리 또는 텍스트 기보 파일에서 (게임 번호, 기보) 생성"""
+    if os.path.isdir(path):
+        store = GameRecordStore(path)
+        try:
+            for game_id, record in store.iter_records():
+                yield game_id, record
+        finally:
+            store.close()
+    else:
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+        for game_id, record in enumerate(read_text(stream)):
+            yield game_id, record
+
+
+def run_analysis(tasks, output, workers, depth, blunder_threshold, max_pending=None,
+                 shared_table=None):
+    """작업을 프로세스 풀에 나눠 주고 결과를 도착하는 대로 기록
+
+    입력 전체를 메모리에 올리지 않도록 처리 중인 게임 수를 max_pending으로 제한한다.
+    shared_table(SharedTranspositionTable)을 주면 모든 워커가 그 치환표를 함께 쓴다.
+    (분석한 게임 수, 수 개수) 를 반환한다.
+    """
+    if max_pending is None:
+        max_pending = workers * 4
+    pending = threading.BoundedSemaphore(max_pending)
+
+    def bounded(iterable):
+        for task in iterable:
+            pending.acquire()
+            yield task
+
+    games = plies = 0
+    with multiprocessing.Pool(workers, _init_worker,
+                              (depth, blunder_threshold, shared_table)) as pool:
+        for annotations in pool.imap_unordered(_analyze_task, bounded(tasks)):
+            pending.release()
+            for annotation in annotations:
+                output.write(json.dumps(annotation) + '\n')
+            games += 1
+            plies += len(annotations)
+    return games, plies
+
+
+def main():
+    """분석 도구 명령줄 진입점"""
+    parser = argparse.ArgumentParser(description="오목 기보 일괄 분석")
+    parser.add_argument('input', help="기보 저장소 디렉터리 또는 텍스트 기보 파일 ('-'는 표준 입력)")
+    parser.add_argument('-o', '--output', default='-', help="주석 출력 파일 (JSON Lines)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="워커 프로세스 수")
+    parser.add_argument('-d', '--depth', type=int, default=1, help="수마다 탐색 깊이")
+    parser.add_argument('--blunder-threshold', type=int, default=500,
+                        help="악수로 표시할 점수 손실")
+    parser.add_argument('--shared-table', type=int, default=0, metavar='ENTRIES',
+                        help="워커들이 함께 쓰는 공유 치환표 항목 수 (0이면 워커마다 따로)")
+    args = parser.parse_args()
+
+    output = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8')
+    shared_table = SharedTranspositionTable(args.shared_table) if args.shared_table else None
+    start = time.time()
+    try:
+        games, plies = run_analysis(iter_input(args.input), output, args.workers,
+                                    args.depth, args.blunder_threshold,
+                                    shared_table=shared_table)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        if shared_table is not None:
+            shared_table.close()
+            shared_table.unlink()
+    elapsed = time.time() - start
+    print("분석 완료: {}판, {}수, {:.1f}초 ({:.1f}수/초, 워커 {}개)".format(
+        games, plies, elapsed, plies / elapsed if elapsed else 0, args.workers),
+        file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
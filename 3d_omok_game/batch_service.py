@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 여러 대국의 AI 탐색을 묶어 처리하는 서비스
+
+여러 호출자(스레드나 asyncio)가 submit()으로 국면을 넣으면 서비스 스레드 하나가 각 탐색을
+생성기 (AIPlayer.search_steps) 로 번갈아 돌린다. 탐색이 평가나 후보 수 분류를 요청하면 바로 답하지 않고
+진행 중인 모든 탐색의 요청을 모아, 같은 크기의 보드끼리 (보드 수, 세로, 가로) 배열로 쌓아
+창 번호 계산과 조회표 읽기를 numpy 연산 몇 번으로 끝낸 뒤 각 탐색에 돌려준다.
+    - 쉬고 있을 때 첫 요청이 오면 window초 동안 더 모은 뒤 시작 (추가되는 대기 시간의 상한)
+    - 동시에 진행하는 탐색은 max_batch개까지, 나머지는 대기열에서 차례를 기다림
+    - 묶음 계산은 Board(2D 조밀 보드)만 하고, SparseBoard와 Board3D는 국면마다 AIPlayer.answer로 답함
+묶음 계산의 답은 같은 국면에서 AIPlayer.answer와 같다 (fuzz.py의 batch_threats, batch_evaluate 판정).
+탐색 하나는 한 단계마다 묶음 하나를 기다리므로, 동시에 도는 탐색이 많을수록 총 처리량은 늘고
+탐색 하나의 시간은 길어진다 (benchmark.py batch로 측정).
+
+사용 예:
+    service = BatchAIService(window=0.002)
+    future = service.submit(board, player, depth=1)   # 여러 스레드에서 동시에
+    move, score = future.result()
+    service.close()
+"""
+
+import time
+import queue
+import threading
+from concurrent.futures import Future
+import numpy as np
+from board import Board, DIRECTIONS, LINE_PADDING
+from patterns import RUN_CLASS_ARRAY, THREAT_ARRAY, WINDOW_CENTER, WALL
+from rules import apply_move_rules
+from ai_player import AIPlayer, REQUEST_EVALUATE
+
+# 후보 수 거리 (Board.get_candidate_moves 기본값)
+CANDIDATE_DISTANCE = 2
+
+# 돌이 없는 칸의 놓인 순서 값
+NO_STONE = np.iinfo(np.int32).max
+
+
+def window_codes(cells):
+    """(보드 수, 세로, 가로) 칸 값 -> (4, 보드 수, 세로, 가로) 방향별 9칸 창 번호 (Board.get_windows와 같음)
+
+    보드 둘레에 보드 밖 칸을 붙여 한 줄로 펴면 한 방향으로 한 칸 가는 것은 번호에 일정한 값을 더하는 것이라
+    모든 연산이 연속된 배열 조각 위에서 일어난다. 방향마다 이웃 3칸 번호를 먼저 만들고
+    3칸씩 떨어진 세 번호를 이어 붙여 9칸을 만든다.
+    """
+    count, rows, cols = cells.shape
+    pad = LINE_PADDING
+    width = cols + 2 * pad
+    reach = width + 1               # 한 칸 이동의 최대 번호 차이 (대각선)
+    start = pad * reach             # 보드 첫 칸의 번호
+    length = rows * width           # (세로, 너비)로 다시 접을 구간 길이
+    flat = np.full((count, (rows + 2 * pad + 1) * width), WALL, dtype=np.int32)
+    flat.reshape(count, -1, width)[:, pad:pad + rows, pad:pad + cols] = cells
+    shifted = [flat, flat << 2, flat << 4]
+
+    # 3칸 번호는 보드 구간 양쪽으로 (창 반폭 - 1) 칸 더 필요
+    margin = (WINDOW_CENTER - 1) * reach
+    base = start - margin
+    span = length + 2 * margin
+    codes = []
+    for dx, dy in DIRECTIONS:
+        offset = dy * width + dx
+        triple = shifted[0][:, base - offset:base - offset + span].copy()
+        triple |= shifted[1][:, base:base + span]
+        triple |= shifted[2][:, base + offset:base + offset + span]
+        jump = (WINDOW_CENTER - 1) * offset
+        code = triple[:, margin - jump:margin - jump + length].copy()
+        code |= triple[:, margin:margin + length] << 6
+        code |= triple[:, margin + jump:margin + jump + length] << 12
+        codes.append(code.reshape(count, rows, width)[:, :, :cols])
+    return np.stack(codes)
+
+
+def first_neighbors(ranks):
+    """칸마다 distance 칸 이내 돌 중 가장 먼저 놓인 돌의 순서 (없으면 NO_STONE)
+
+    Board.get_candidate_moves는 놓인 순서대로 돌 주변을 행 우선으로 훑으므로
+    후보 수는 (이 값, y, x) 순서로 나온다.
+    """
+    count, rows, cols = ranks.shape
+    reach = CANDIDATE_DISTANCE
+    padded = np.full((count, rows + 2 * reach, cols + 2 * reach), NO_STONE, dtype=np.int32)
+    padded[:, reach:reach + rows, reach:reach + cols] = ranks
+    across = padded[:, :, :cols].copy()
+    for dx in range(1, 2 * reach + 1):
+        np.minimum(across, padded[:, :, dx:dx + cols], out=across)
+    first = across[:, :rows].copy()
+    for dy in range(1, 2 * reach + 1):
+        np.minimum(first, across[:, dy:dy + rows], out=first)
+    return first
+
+
+def batch_evaluate(ai, boards, players):
+    """같은 크기 Board 여러 개의 AIPlayer._evaluate_board 값 목록 (한 번에 계산)"""
+    cells = np.stack([board.board for board in boards])
+    scores = ai.run_score_array[RUN_CLASS_ARRAY[window_codes(cells)]].sum(axis=0)
+    own = cells == np.array(players)[:, None, None]
+    sign = np.where(own, 1, np.where(cells == 0, 0, -1))
+    return (scores * sign).sum(axis=(1, 2)).tolist()
+
+
+def batch_threats(ai, boards, players):
+    """같은 크기 Board 여러 개의 위협 요청 답 목록 (AIPlayer.answer와 같은 후보 순서와 값)
+
+    빈 보드는 후보가 중앙 한 칸이라 계산하지 않고 None을 돌려준다.
+    """
+    count = len(boards)
+    rows, cols = boards[0].rows, boards[0].cols
+    cells = np.stack([board.board for board in boards]).reshape(count, -1)
+
+    # 보드마다 돌이 놓인 순서 (stones 사전의 순서)
+    board_index, cell_index, order = [], [], []
+    for b, board in enumerate(boards):
+        board_index.extend([b] * len(board.stones))
+        cell_index.extend(y * cols + x for x, y in board.stones)
+        order.extend(range(len(board.stones)))
+    ranks = np.full((count, rows * cols), NO_STONE, dtype=np.int32)
+    ranks[board_index, cell_index] = order
+    first = first_neighbors(ranks.reshape(count, rows, cols)).reshape(count, -1)
+
+    # 모든 보드의 후보 칸을 (보드, 가장 먼저 놓인 이웃 돌, 칸 번호) 순서로 정렬
+    # (nonzero가 (보드, 칸 번호) 순서로 주므로 앞의 두 값을 합친 키의 안정 정렬 한 번이면 됨)
+    board_index, cell_index = np.nonzero((first != NO_STONE) & (cells == 0))
+    order = np.argsort((board_index << 32) | first[board_index, cell_index], kind='stable')
+    board_index, cell_index = board_index[order], cell_index[order]
+    codes = window_codes(cells.reshape(count, rows, cols)).reshape(len(DIRECTIONS), count, -1)
+    codes = codes[:, board_index, cell_index]
+    black = np.array(players)[board_index] == 1
+    attack = np.where(black, THREAT_ARRAY[1][codes], THREAT_ARRAY[2][codes])
+    defense = np.where(black, THREAT_ARRAY[2][codes], THREAT_ARRAY[1][codes])
+    moves = list(zip((cell_index % cols).tolist(), (cell_index // cols).tolist()))
+    bounds = np.searchsorted(board_index, np.arange(count + 1)).tolist()
+
+    # 규칙 반영은 보드마다 (자유룰이면 아무것도 바꾸지 않음) - 공격/수비 배열 조각을 제자리에서 고침
+    playable = []
+    for b, (board, player) in enumerate(zip(boards, players)):
+        low, high = bounds[b], bounds[b + 1]
+        playable.append(apply_move_rules(board, moves[low:high], player,
+                                         attack[:, low:high].T, defense[:, low:high].T))
+
+    # 후보 점수는 모든 보드를 한 번에 계산하고, 보드 안 정렬 순서는 (보드, 점수 내림차순) 안정 정렬로 구함
+    best, wins, fives, priority = ai.score_threats(attack, defense)
+    ranking = np.argsort((board_index << 32) - priority, kind='stable')
+
+    answers = []
+    for b, board in enumerate(boards):
+        if not board.stones:
+            answers.append(None)
+            continue
+        low, high = bounds[b], bounds[b + 1]
+        answers.append((moves[low:high], playable[b], best[low:high], wins[low:high],
+                        fives[low:high], ranking[low:high] - low))
+    return answers
+
+
+def answer_requests(ai, requests):
+    """탐색 요청 목록에 답함 - 같은 크기 Board끼리 묶어 계산하고 나머지는 AIPlayer.answer"""
+    answers = [None] * len(requests)
+    groups = {}
+    for i, request in enumerate(requests):
+        kind, board, player = request
+        if type(board) is not Board:
+            answers[i] = ai.answer(request)
+            continue
+        if kind == REQUEST_EVALUATE:
+            cached = ai.eval_cache.get(ai.eval_cache_key(board, player))
+            if cached is not None:
+                answers[i] = cached
+                continue
+        groups.setdefault((kind, board.rows, board.cols), []).append(i)
+
+    for (kind, _, _), indices in groups.items():
+        boards = [requests[i][1] for i in indices]
+        players = [requests[i][2] for i in indices]
+        if kind == REQUEST_EVALUATE:
+            for i, board, player, score in zip(indices, boards, players,
+                                               batch_evaluate(ai, boards, players)):
+                if len(ai.eval_cache) >= ai.eval_cache_limit:
+                    ai.eval_cache.clear()
+                ai.eval_cache[ai.eval_cache_key(board, player)] = score
+                answers[i] = score
+        else:
+            for i, answer in zip(indices, batch_threats(ai, boards, players)):
+                answers[i] = answer if answer is not None else ai.answer(requests[i])
+    return answers
+
+
+class BatchAIService:
+    """여러 호출자의 AI 탐색을 한 스레드에서 번갈아 돌리며 평가를 묶어 처리하는 서비스"""
+
+    def __init__(self, window=0.002, max_batch=64, weights=None):
+        """window: 쉬다가 첫 요청이 오면 더 모으는 시간(초), max_batch: 동시에 진행하는 탐색 수"""
+        self.window = window
+        self.max_batch = max_batch
+        self.weights = weights
+        # 규칙 -> AIPlayer (치환표 점수는 규칙마다 다르므로 규칙별로 따로 둠)
+        # 탐색은 그 AIPlayer의 fork()로 하나씩 돌려 노드 수가 섞이지 않게 함
+        self.players = {}
+        self.queue = queue.Queue()
+        # 통계: 처리한 묶음 수와 답한 요청 수 (평균 묶음 크기 = requests / batches), 끝난 탐색의 노드 수 합
+        self.batches = 0
+        self.requests = 0
+        self.nodes = 0
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def submit(self, board, player, depth=1):
+        """국면 하나의 탐색 요청 - (최선의 수, 점수)를 돌려줄 Future (보드는 넣는 순간 복사)"""
+        future = Future()
+        self.queue.put((board.copy(), player, depth, future))
+        return future
+
+    def get_best_move(self, board, player, depth=1):
+        """탐색이 끝날 때까지 기다려 최선의 수 반환"""
+        return self.submit(board, player, depth).result()[0]
+
+    def close(self):
+        """남은 요청을 모두 처리한 뒤 서비스 스레드 종료"""
+        self.queue.put(None)
+        self.thread.join()
+
+    def get_ai(self, rule):
+        """규칙별 AIPlayer"""
+        ai = self.players.get(rule)
+        if ai is None:
+            ai = AIPlayer()
+            if self.weights is not None:
+                ai.set_line_weights(self.weights)
+            self.players[rule] = ai
+        return ai
+
+    def take_requests(self, active):
+        """대기열에서 새 탐색 요청을 꺼냄 (쉬고 있으면 첫 요청 뒤 window초 동안 더 모음) - 닫혔으면 False"""
+        room = self.max_batch - len(active)
+        items = []
+        if not active:
+            items.append(self.queue.get())
+            deadline = time.perf_counter() + self.window
+            while items[-1] is not None and len(items) < room:
+                remaining = deadline - time.perf_counter()
+                try:
+                    items.append(self.queue.get(timeout=remaining) if remaining > 0
+                                 else self.queue.get_nowait())
+                except queue.Empty:
+                    break
+        else:
+            while len(items) < room:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+        open_ = True
+        for item in items:
+            if item is None:
+                open_ = False
+                continue
+            board, player, depth, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            ai = self.get_ai(board.rule)
+            searcher = ai.fork()
+            self.advance(active, (searcher, searcher.search_steps(board, player, depth)),
+                         None, future, ai)
+        return open_
+
+    def advance(self, active, search, answer, future, ai):
+        """탐색 (탐색용 사본, 생성기) 을 다음 요청까지 진행 (끝나면 Future에 결과를 넣음)"""
+        searcher, steps = search
+        try:
+            request = next(steps) if answer is None else steps.send(answer)
+        except StopIteration as stop:
+            self.nodes += searcher.nodes
+            future.set_result(stop.value)
+        except Exception as error:  # 탐색 하나의 오류가 다른 탐색을 멈추지 않도록 호출자에게 넘김
+            future.set_exception(error)
+        else:
+            active.append((search, request, future, ai))
+
+    def run(self):
+        """서비스 스레드: 새 요청을 받고, 진행 중인 탐색의 요청을 묶어 답하기를 반복"""
+        active = []
+        open_ = True
+        while open_ or active or not self.queue.empty():
+            if not self.take_requests(active):
+                open_ = False
+            if not active:
+                continue
+
+            pending, active = active, []
+            groups = {}
+            for item in pending:
+                groups.setdefault(id(item[3]), []).append(item)
+            for items in groups.values():
+                ai = items[0][3]
+                answers = answer_requests(ai, [request for _, request, _, _ in items])
+                self.batches += 1
+                self.requests += len(items)
+                for (search, _, future, _), answer in zip(items, answers):
+                    self.advance(active, search, answer, future, ai)
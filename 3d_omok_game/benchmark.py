@@ -0,0 +1,689 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 성능 측정 스크립트
+
+사용 예:
+    python benchmark.py search --depth 2
+    python benchmark.py board-size --sizes 15 50 100 1000 0
+    python benchmark.py board3d --sizes 9 15
+    python benchmark.py rules --depth 2
+    python benchmark.py endgame --sizes 6 7 --games 4
+    python benchmark.py solver --sizes 7 9 11 --budget 5000
+    python benchmark.py shared-table --workers 1 2 4 8 16
+    python benchmark.py cache --games 3 --depth 2
+    python benchmark.py batch --callers 1 4 16 64 --window 2
+    python benchmark.py hints --games 20
+    python benchmark.py timeline --seeks 200
+    python benchmark.py clock --control 20+0.2 --games 2
+"""
+
+import os
+import time
+import random
+import argparse
+import tempfile
+import threading
+import itertools
+import multiprocessing
+from board import Board
+from sparse_board import SparseBoard
+from board3d import Board3D
+from rules import RULES
+from ai_player import AIPlayer, REQUEST_THREATS
+from solver import ProofSolver, RESULT_UNKNOWN, RESULT_NAMES
+from batch_service import BatchAIService
+from hints import HintMap
+from timeline import Timeline
+from clock import TimeControl, GameClock, TimeManager
+from transposition import (TranspositionTable, SharedTranspositionTable,
+                           PersistentTranspositionTable, EXACT)
+
+# 측정에 쓰는 초반 국면 (x, y, 플레이어)
+OPENING = [(7, 7, 1), (8, 8, 2), (8, 7, 1), (9, 7, 2), (6, 8, 1), (7, 8, 2), (6, 6, 1)]
+
+
+def make_board(stones, rows=15, cols=15, rule=RULES[0]):
+    """돌 목록으로 보드 생성"""
+    board = Board(rows, cols, rule)
+    for x, y, player in stones:
+        board.place_stone(x, y, player)
+    return board
+
+
+def plain_alphabeta(ai, board, depth, is_maximizing, player, alpha, beta, counter):
+    """비교용 기존 방식 탐색 - 모든 빈 칸, 전체 창, 고정 깊이"""
+    counter[0] += 1
+    if depth == 0 or board.is_full():
+        return ai.evaluate_board(board, player)
+    for (x, y), owner in board.stones.items():
+        if board.check_win(x, y, owner):
+            return 1000 if owner == player else -1000
+
+    mover = player if is_maximizing else 3 - player
+    best = float('-inf') if is_maximizing else float('inf')
+    for x, y in board.get_valid_moves():
+        board.place_stone(x, y, mover)
+        score = plain_alphabeta(ai, board, depth - 1, not is_maximizing, player,
+                                alpha, beta, counter)
+        board.remove_stone(x, y)
+        if is_maximizing:
+            best = max(best, score)
+            alpha = max(alpha, score)
+        else:
+            best = min(best, score)
+            beta = min(beta, score)
+        if beta <= alpha:
+            break
+    return best
+
+
+def bench_search(args):
+    """기존 알파-베타와 PVS 탐색의 노드 수/시간 비교"""
+    board = make_board(OPENING)
+    player = 2
+
+    for depth in range(args.depth + 1):
+        ai = AIPlayer()
+        start = time.time()
+        move, score = ai.search(board, player, depth)
+        elapsed = time.time() - start
+        print("PVS       depth {}: 수 {} 점수 {:>8} 노드 {:>8} {:7.2f}초".format(
+            depth, move, score, ai.nodes, elapsed))
+
+    for depth in range(min(args.depth, args.plain_depth) + 1):
+        ai = AIPlayer()
+        counter = [0]
+        start = time.time()
+        work = board.copy()
+        best_move, best_score = None, float('-inf')
+        for x, y in work.get_valid_moves():
+            work.place_stone(x, y, player)
+            counter[0] += 1
+            score = plain_alphabeta(ai, work, depth, False, player,
+                                    float('-inf'), float('inf'), counter)
+            work.remove_stone(x, y)
+            if score > best_score:
+                best_move, best_score = (x, y), score
+        elapsed = time.time() - start
+        print("알파-베타 depth {}: 수 {} 점수 {:>8} 노드 {:>8} {:7.2f}초".format(
+            depth, best_move, best_score, counter[0], elapsed))
+
+
+def bench_board_size(args):
+    """보드 크기별 AI 한 수 시간 (희소 보드는 크기와 무관해야 함)
+
+    게임이 부르는 get_best_move 전체 (후보 수 목록, 끝내기 확인 포함) 를 잰다.
+    """
+    print("{:>10} {:>8} {:>10} {:>12} {:>12}".format(
+        "크기", "보드", "준비(ms)", "어려움(ms)", "보통(ms)"))
+    for size in args.sizes:
+        kinds = [('sparse', SparseBoard)]
+        if 0 < size <= args.dense_limit:
+            kinds.insert(0, ('dense', Board))
+        for name, board_class in kinds:
+            start = time.time()
+            if size:
+                board = board_class(size, size)
+                cx, cy = board.center()
+            else:
+                board = board_class()  # 크기 제한 없음
+                cx, cy = 0, 0
+            for x, y, player in OPENING:
+                board.place_stone(cx + x - 7, cy + y - 7, player)
+            setup = (time.time() - start) * 1000
+
+            ai = AIPlayer()
+            ai.search_depth = args.depth
+            elapsed = {}
+            for difficulty in ("hard", "medium"):
+                ai.set_difficulty(difficulty)
+                start = time.time()
+                for _ in range(args.repeat):
+                    ai.transposition_table.clear()
+                    ai.eval_cache.clear()
+                    ai.get_best_move(board, 2)
+                elapsed[difficulty] = (time.time() - start) * 1000 / args.repeat
+            label = "{0}x{0}".format(size) if size else "무한"
+            print("{:>10} {:>8} {:>10.1f} {:>12.1f} {:>12.1f}".format(
+                label, name, setup, elapsed["hard"], elapsed["medium"]))
+
+
+def bench_board3d(args):
+    """3D 보드 크기별 놓기/빼기, 후보 수, AI 한 수 시간"""
+    print("{:>8} {:>10} {:>12} {:>8} {:>10} {:>10}".format(
+        "크기", "준비(ms)", "놓기+빼기(us)", "후보", "노드", "한 수(ms)"))
+    for size in args.sizes:
+        start = time.time()
+        board = Board3D(size)
+        setup = (time.time() - start) * 1000
+        c = size // 2
+        for x, y, player in OPENING:
+            board.place_stone(x - 7 + c, y - 7 + c, c + (x + y) % 3 - 1, player)
+
+        start = time.time()
+        for _ in range(1000):
+            board.place_stone(0, 0, 0, 1)
+            board.remove_stone(0, 0, 0)
+        place = (time.time() - start) * 1000
+
+        ai = AIPlayer()
+        start = time.time()
+        ai.search(board, 2, args.depth)
+        elapsed = (time.time() - start) * 1000
+        label = "{0}^3".format(size)
+        print("{:>8} {:>10.1f} {:>12.1f} {:>8} {:>10} {:>10.1f}".format(
+            label, setup, place, len(board.get_candidate_moves()), ai.nodes, elapsed))
+
+
+def bench_rules(args):
+    """규칙별 탐색 시간 비교 (자유룰 대비 금수/정확한 5 판정 비용)"""
+    board = make_board(OPENING, rule=RULES[-1])
+    board.is_forbidden(0, 0)  # 규칙 조회표 미리 읽기
+    start = time.time()
+    cells = board.get_valid_moves()
+    for x, y in cells:
+        board.is_forbidden(x, y)
+    per_check = (time.time() - start) * 1e6 / len(cells)
+    print("금수 판정 한 번: {:.1f}us".format(per_check))
+
+    print("{:>12} {:>8} {:>10} {:>10}".format("규칙", "깊이", "노드", "시간(ms)"))
+    for rule in RULES:
+        board = make_board(OPENING, rule=rule)
+        for player in (1, 2):
+            ai = AIPlayer()
+            start = time.time()
+            ai.search(board, player, args.depth)
+            elapsed = (time.time() - start) * 1000
+            label = "{} ({})".format(rule, "흑" if player == 1 else "백")
+            print("{:>12} {:>8} {:>10} {:>10.1f}".format(label, args.depth, ai.nodes, elapsed))
+
+
+def bench_endgame(args):
+    """작은 보드 자체 대국에서 무승부 확정 시점 (보드가 가득 찰 때 대비) 과 놓기+빼기 비용"""
+    print("{:>8} {:>6} {:>10} {:>10} {:>12}".format("크기", "대국", "무승부", "확정 수", "가득 찬 수"))
+    for size in args.sizes:
+        rng = random.Random(size)
+        draws, dead_moves = 0, []
+        for _ in range(args.games):
+            board = Board(size, size)
+            ai = AIPlayer()
+            player, result = 1, None
+            # 첫 두 수는 무작위로 두어 대국마다 다른 국면을 만듦
+            while result is None:
+                if board.move_count < 2:
+                    move = rng.choice(board.get_valid_moves())
+                else:
+                    move, _ = ai.search(board, player, args.depth)
+                board.place_stone(*move, player)
+                if board.check_win(*move, player):
+                    result = player
+                elif board.is_dead() or board.is_full():
+                    result = 0
+                player = 3 - player
+            if result == 0:
+                draws += 1
+                dead_moves.append(board.move_count)
+        average = sum(dead_moves) / len(dead_moves) if dead_moves else 0
+        print("{:>8} {:>6} {:>10} {:>10.1f} {:>12}".format(
+            "{0}x{0}".format(size), args.games, draws, average, size * size))
+
+    board = make_board(OPENING)
+    moves = board.get_candidate_moves()
+    start = time.time()
+    for _ in range(100):
+        for x, y in moves:
+            board.place_stone(x, y, 1)
+            board.remove_stone(x, y)
+    elapsed = (time.time() - start) * 1e6 / (100 * len(moves))
+    print("15x15 놓기+빼기: {:.1f}us".format(elapsed))
+
+
+def bench_solver(args):
+    """자체 대국의 매 국면을 노드 예산 안에서 df-pn으로 풀어, 결과를 처음 증명한 시점을 측정"""
+    print("{:>8} {:>8} {:>10} {:>8} {:>10} {:>10}".format(
+        "크기", "대국 수", "증명 시점", "결과", "노드", "노드/초"))
+    for size in args.sizes:
+        rng = random.Random(size)
+        board = Board(size, size)
+        ai = AIPlayer()
+        solver = ProofSolver(max_entries=args.entries)
+        player, proven, total_nodes, elapsed = 1, None, 0, 0.0
+        while not board.is_dead() and not board.is_full():
+            if proven is None and board.move_count >= 2:
+                start = time.time()
+                result, _ = solver.solve(board, player, args.budget)
+                elapsed += time.time() - start
+                total_nodes += solver.nodes
+                if result != RESULT_UNKNOWN:
+                    proven = (board.move_count, RESULT_NAMES[result])
+            if board.move_count < 2:
+                move = rng.choice(board.get_valid_moves())
+            else:
+                move, _ = ai.search(board, player, 1)
+            board.place_stone(*move, player)
+            if board.check_win(*move, player):
+                break
+            player = 3 - player
+        ply, result = proven if proven else ('-', 'unknown')
+        print("{:>8} {:>8} {:>10} {:>8} {:>10} {:>10.0f}".format(
+            "{0}x{0}".format(size), board.move_count, ply, result,
+            total_nodes, total_nodes / max(elapsed, 1e-9)))
+
+
+def _probe_worker(task):
+    """공유 치환표에 무작위 키를 저장하고 조회하는 워커 (처리 개수 반환)"""
+    table, count, seed = task
+    rng = random.Random(seed)
+    keys = [rng.getrandbits(64) for _ in range(count)]
+    for key in keys:
+        table.store(key, 1, EXACT, 0, 0)
+    for key in keys:
+        table.probe(key)
+    table.close()
+    return 2 * count
+
+
+_search_ai = None
+_search_depth = None
+
+
+def _init_search_worker(depth, shared_table):
+    """탐색 워커 초기화 (공유 치환표가 있으면 그것을 씀)"""
+    global _search_ai, _search_depth
+    _search_ai = AIPlayer()
+    _search_depth = depth
+    if shared_table is not None:
+        _search_ai.transposition_table = shared_table
+
+
+def _search_task(task):
+    """수순으로 국면을 만들어 한 번 탐색 (노드 수 반환)"""
+    size, moves = task
+    board = Board(size, size)
+    for i, move in enumerate(moves):
+        board.place_stone(*move, 1 + i % 2)
+    _search_ai.search(board, 1 + len(moves) % 2, _search_depth)
+    return _search_ai.nodes
+
+
+def self_play_moves(games, size):
+    """측정용 자체 대국 수순 목록 (첫 두 수만 무작위, 깊이 1)"""
+    rng = random.Random(size)
+    games_moves = []
+    for _ in range(games):
+        board = Board(size, size)
+        ai = AIPlayer()
+        moves, player = [], 1
+        while not board.is_dead() and not board.is_full():
+            if board.move_count < 2:
+                move = rng.choice(board.get_valid_moves())
+            else:
+                move, _ = ai.search(board, player, 1)
+            board.place_stone(*move, player)
+            moves.append(move)
+            if board.check_win(*move, player):
+                break
+            player = 3 - player
+        games_moves.append(moves)
+    return games_moves
+
+
+def bench_shared_table(args):
+    """공유 치환표 조회/저장 처리량과 워커 수별 탐색 속도 (프로세스별 치환표 대비)"""
+    keys = [random.getrandbits(64) for _ in range(args.probes)]
+    for table in (TranspositionTable(), SharedTranspositionTable(args.entries)):
+        start = time.time()
+        for key in keys:
+            table.store(key, 1, EXACT, 0, 0)
+        stored = time.time() - start
+        start = time.time()
+        for key in keys:
+            table.probe(key)
+        probed = time.time() - start
+        print("{:>26}: 저장 {:.2f}M/초, 조회 {:.2f}M/초".format(
+            type(table).__name__, len(keys) / stored / 1e6, len(keys) / probed / 1e6))
+        if isinstance(table, SharedTranspositionTable):
+            table.close()
+            table.unlink()
+
+    print("CPU {}개".format(multiprocessing.cpu_count()))
+    print("{:>6} {:>16}".format("워커", "처리량(M/초)"))
+    for workers in args.workers:
+        table = SharedTranspositionTable(args.entries)
+        start = time.time()
+        with multiprocessing.Pool(workers) as pool:
+            done = sum(pool.map(_probe_worker, [(table, args.probes // workers, seed)
+                                               for seed in range(workers)]))
+        elapsed = time.time() - start
+        table.close()
+        table.unlink()
+        print("{:>6} {:>16.2f}".format(workers, done / elapsed / 1e6))
+
+    # 같은 대국의 이웃한 국면은 탐색 트리가 겹치므로 공유 표에서 서로의 결과를 재사용함
+    tasks = [(args.size, moves[:ply]) for moves in self_play_moves(args.games, args.size)
+             for ply in range(2, len(moves))]
+    print("국면 {}개, 깊이 {}".format(len(tasks), args.depth))
+    print("{:>6} {:>12} {:>12} {:>10} {:>10}".format("워커", "따로(초)", "공유(초)", "배속", "공유 노드"))
+    baseline = None
+    for workers in args.workers:
+        start = time.time()
+        with multiprocessing.Pool(workers, _init_search_worker, (args.depth, None)) as pool:
+            pool.map(_search_task, tasks, chunksize=1)
+        private = time.time() - start
+        table = SharedTranspositionTable(args.entries)
+        start = time.time()
+        with multiprocessing.Pool(workers, _init_search_worker, (args.depth, table)) as pool:
+            nodes = sum(pool.map(_search_task, tasks, chunksize=1))
+        shared = time.time() - start
+        table.close()
+        table.unlink()
+        if baseline is None:
+            baseline = private
+        print("{:>6} {:>12.2f} {:>12.2f} {:>10.2f} {:>10}".format(
+            workers, private, shared, baseline / shared, nodes))
+
+
+def timed_game(size, depth, seed, table=None):
+    """첫 두 수만 seed로 정한 자체 대국의 수마다 AI 시간(ms) 목록 (table이 있으면 그 치환표 사용)"""
+    rng = random.Random(seed)
+    board = Board(size, size)
+    ai = AIPlayer()
+    if table is not None:
+        ai.transposition_table = table
+    latencies, player = [], 1
+    while not board.is_dead() and not board.is_full():
+        if board.move_count < 2:
+            move = rng.choice(board.get_valid_moves())
+        else:
+            start = time.time()
+            move, _ = ai.search(board, player, depth)
+            latencies.append((time.time() - start) * 1000)
+        board.place_stone(*move, player)
+        if board.check_win(*move, player):
+            break
+        player = 3 - player
+    return latencies
+
+
+def bench_cache(args):
+    """파일 치환표의 첫 실행(빈 캐시)과 재시작 뒤(채워진 캐시) 수당 시간 비교"""
+    print("{:>12} {:>8} {:>10} {:>10} {:>10} {:>10}".format(
+        "캐시", "수", "평균(ms)", "p50(ms)", "p90(ms)", "항목"))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'search_cache.bin')
+        for label in ('메모리', '파일 (cold)', '파일 (warm)'):
+            latencies, entries = [], '-'
+            for seed in range(args.games):
+                # 게임마다 새 AI와 새로 연 파일로 프로그램 재시작을 흉내 냄
+                table = None if label == '메모리' else PersistentTranspositionTable(path, args.entries)
+                latencies += timed_game(args.size, args.depth, seed, table)
+                if table is not None:
+                    entries = len(table)
+                    table.close()
+            latencies.sort()
+            print("{:>12} {:>8} {:>10.1f} {:>10.1f} {:>10.1f} {:>10}".format(
+                label, len(latencies), sum(latencies) / len(latencies),
+                latencies[len(latencies) // 2], latencies[len(latencies) * 9 // 10], entries))
+
+
+def batch_positions(count, size):
+    """자체 대국 수순에서 뽑은 측정용 중반 국면 (보드, 둘 차례) count개 (모자라면 되풀이)"""
+    positions = []
+    for moves in self_play_moves(2, size):
+        for ply in range(4, len(moves), 2):
+            board = Board(size, size)
+            for i, move in enumerate(moves[:ply]):
+                board.place_stone(*move, 1 + i % 2)
+            positions.append((board, 1 + ply % 2))
+    return list(itertools.islice(itertools.cycle(positions), count))
+
+
+def run_callers(positions, callers, search):
+    """callers개 스레드가 국면을 하나씩 가져가 search(보드, 플레이어)를 부름 - (걸린 초, 국면별 지연 목록)"""
+    next_index = itertools.count()
+    latencies = []
+
+    def caller():
+        for i in iter(lambda: next(next_index), None):
+            if i >= len(positions):
+                return
+            start = time.perf_counter()
+            search(*positions[i])
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=caller) for _ in range(callers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def bench_batch(args):
+    """동시 호출 수별 묶음 서비스의 처리량과 지연 (국면마다 따로 탐색하는 AIPlayer와 비교)"""
+    positions = batch_positions(args.positions, args.size)
+    print("{}x{} 중반 국면 {}개, 깊이 {}, 묶음 대기 {}ms (서비스는 스레드 하나 = 코어 하나)".format(
+        args.size, args.size, len(positions), args.depth, args.window))
+    print("{:>16} {:>10} {:>10} {:>10} {:>10}".format(
+        "방식", "수/초", "p50(ms)", "p99(ms)", "평균 묶음"))
+
+    def report(label, elapsed, latencies, batch='-'):
+        print("{:>16} {:>10.1f} {:>10.1f} {:>10.1f} {:>10}".format(
+            label, len(latencies) / elapsed, latencies[len(latencies) // 2] * 1000,
+            latencies[min(len(latencies) - 1, len(latencies) * 99 // 100)] * 1000, batch))
+
+    ai = AIPlayer()
+    report("국면마다", *run_callers(positions, 1, lambda board, player:
+                                   ai.search(board, player, args.depth)))
+    for callers in args.callers:
+        with BatchAIService(args.window / 1000, max_batch=callers) as service:
+            elapsed, latencies = run_callers(
+                positions, callers,
+                lambda board, player: service.submit(board, player, args.depth).result())
+        report("묶음 x{}".format(callers), elapsed, latencies,
+               "{:.1f}".format(service.requests / max(service.batches, 1)))
+
+
+def bench_hints(args):
+    """힌트 점수의 수당 증분 갱신 시간 (처음부터 다시 만드는 시간과 비교)"""
+    print("{:>8} {:>6} {:>12} {:>12} {:>14}".format(
+        "보드", "수", "증분 p50(us)", "증분 p99(us)", "다시 만들기(us)"))
+    for label, make in (('15x15', lambda: Board(15, 15)), ('100x100', lambda: SparseBoard(100, 100)),
+                        ('9x9x9', lambda: Board3D(9))):
+        rng = random.Random(0)
+        updates, rebuilds, moves = [], [], 0
+        for _ in range(args.games):
+            board = make()
+            hints = HintMap(board)
+            move = board.center()
+            for ply in range(args.moves):
+                board.place_stone(*move, 1 + ply % 2)
+                start = time.perf_counter()
+                hints.stone_placed(*move)
+                updates.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                HintMap(board)
+                rebuilds.append(time.perf_counter() - start)
+                move = rng.choice(board.get_candidate_moves())
+                moves += 1
+        updates.sort()
+        print("{:>8} {:>6} {:>12.0f} {:>12.0f} {:>14.0f}".format(
+            label, moves, updates[len(updates) // 2] * 1e6, updates[len(updates) * 99 // 100] * 1e6,
+            sum(rebuilds) / len(rebuilds) * 1e6))
+
+
+def bench_timeline(args):
+    """수순 타임라인의 임의 이동 시간 (처음부터 다시 두는 것과 비교)"""
+    print("{:>10} {:>6} {:>12} {:>12} {:>16}".format(
+        "보드", "수", "이동 p50(ms)", "이동 최대(ms)", "다시 두기 평균(ms)"))
+    cases = [('15x15', lambda: Board(15, 15), 15, 200), ('100x100', lambda: Board(100, 100), 100, 2000),
+             ('1000x1000', lambda: SparseBoard(1000, 1000), 200, 5000), ('9x9x9', lambda: Board3D(9), 9, 600)]
+    for label, make, spread, count in cases:
+        rng = random.Random(0)
+        timeline = Timeline(make())
+        while len(timeline) < count:
+            cell = tuple(rng.randrange(spread) for _ in timeline.board.center())
+            timeline.play(cell)
+        moves = timeline.get_moves()
+
+        targets = [rng.randint(0, count) for _ in range(args.seeks)]
+        seeks = []
+        for target in targets:
+            start = time.perf_counter()
+            timeline.seek(target)
+            seeks.append(time.perf_counter() - start)
+        seeks.sort()
+
+        replays = []
+        for target in targets[:args.replays]:
+            start = time.perf_counter()
+            board = make()
+            for i in range(target):
+                board.place_stone(*moves[i], 1 + i % 2)
+            replays.append(time.perf_counter() - start)
+        print("{:>10} {:>6} {:>12.2f} {:>12.2f} {:>16.1f}".format(
+            label, count, seeks[len(seeks) // 2] * 1000, seeks[-1] * 1000,
+            sum(replays) / len(replays) * 1000))
+
+
+def bench_clock(args):
+    """시간 규칙 아래 AI 자체 대국의 수 종류별 사용 시간 (강제 수 / 전술 / 조용한 국면)"""
+    control = TimeControl.parse(args.control)
+    ai = AIPlayer()
+    ai.set_difficulty("hard")
+    manager = TimeManager()
+    times = {'forced': [], 'tactical': [], 'quiet': []}
+    over_limit = flags = 0
+    for game in range(args.games):
+        rng = random.Random(game)
+        board = Board(15, 15)
+        clock = GameClock(control)
+        ply = 0
+        while ply < args.opening:
+            move = (7 + rng.randint(-2, 2), 7 + rng.randint(-2, 2))
+            if board.place_stone(*move, 1 + ply % 2):
+                ply += 1
+        while not board.is_full() and not board.is_dead():
+            player = 1 + ply % 2
+            threats = ai.answer((REQUEST_THREATS, board, player))
+            if len(ai.order_candidates(threats)) <= 1:
+                kind = 'forced'
+            elif ai.is_tactical(threats, ai.answer((REQUEST_THREATS, board, 3 - player))):
+                kind = 'tactical'
+            else:
+                kind = 'quiet'
+            clock.start(player)
+            start = time.perf_counter()
+            limits = manager.allocate(clock, player, ply // 2)
+            move = ai.get_best_move(board, player, limits)
+            spent = time.perf_counter() - start
+            clock.press()
+            if clock.flagged is not None:
+                flags += 1
+                break
+            over_limit += spent > limits[1] + manager.overhead
+            times[kind].append(spent)
+            board.place_stone(*move, player)
+            ply += 1
+            if board.check_win(*move, player):
+                break
+        print("판 {}: {}수, 남은 시간 흑 {} / 백 {}".format(
+            game + 1, ply, clock.format(1), clock.format(2)))
+
+    print("시간 규칙 {}, 시간패 {}번, 최대 시간 초과 {}수".format(control, flags, over_limit))
+    print("{:>10} {:>6} {:>12} {:>12}".format("국면", "수", "평균(s)", "최대(s)"))
+    for kind, spent in times.items():
+        if spent:
+            print("{:>10} {:>6} {:>12.3f} {:>12.3f}".format(
+                kind, len(spent), sum(spent) / len(spent), max(spent)))
+
+
+def main():
+    """성능 측정 진입점"""
+    parser = argparse.ArgumentParser(description="오목 엔진 성능 측정")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    search_parser = sub.add_parser('search', help="탐색 노드 수 비교")
+    search_parser.add_argument('--depth', type=int, default=2)
+    search_parser.add_argument('--plain-depth', type=int, default=1,
+                               help="기존 방식 탐색의 최대 깊이 (느림)")
+    search_parser.set_defaults(func=bench_search)
+
+    size_parser = sub.add_parser('board-size', help="보드 크기별 한 수 시간")
+    size_parser.add_argument('--sizes', type=int, nargs='+', default=[15, 50, 100, 1000, 0],
+                             help="한 변 크기 목록 (0은 크기 제한 없음)")
+    size_parser.add_argument('--depth', type=int, default=1)
+    size_parser.add_argument('--repeat', type=int, default=3)
+    size_parser.add_argument('--dense-limit', type=int, default=100,
+                             help="일반 보드로도 측정할 최대 크기")
+    size_parser.set_defaults(func=bench_board_size)
+
+    cube_parser = sub.add_parser('board3d', help="3D 보드 크기별 시간")
+    cube_parser.add_argument('--sizes', type=int, nargs='+', default=[9, 15])
+    cube_parser.add_argument('--depth', type=int, default=1)
+    cube_parser.set_defaults(func=bench_board3d)
+
+    rules_parser = sub.add_parser('rules', help="규칙별 탐색 시간")
+    rules_parser.add_argument('--depth', type=int, default=2)
+    rules_parser.set_defaults(func=bench_rules)
+
+    endgame_parser = sub.add_parser('endgame', help="무승부 조기 판정")
+    endgame_parser.add_argument('--sizes', type=int, nargs='+', default=[6, 7])
+    endgame_parser.add_argument('--games', type=int, default=4)
+    endgame_parser.add_argument('--depth', type=int, default=1)
+    endgame_parser.set_defaults(func=bench_endgame)
+
+    solver_parser = sub.add_parser('solver', help="df-pn 끝내기 증명")
+    solver_parser.add_argument('--sizes', type=int, nargs='+', default=[7, 9, 11])
+    solver_parser.add_argument('--budget', type=int, default=5000, help="국면당 노드 예산")
+    solver_parser.add_argument('--entries', type=int, default=200000)
+    solver_parser.set_defaults(func=bench_solver)
+
+    shared_parser = sub.add_parser('shared-table', help="공유 치환표 처리량과 워커 수별 분석 속도")
+    shared_parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    shared_parser.add_argument('--probes', type=int, default=200000)
+    shared_parser.add_argument('--entries', type=int, default=1 << 20)
+    shared_parser.add_argument('--games', type=int, default=2)
+    shared_parser.add_argument('--size', type=int, default=9)
+    shared_parser.add_argument('--depth', type=int, default=2)
+    shared_parser.set_defaults(func=bench_shared_table)
+
+    cache_parser = sub.add_parser('cache', help="파일 치환표 cold/warm 수당 시간")
+    cache_parser.add_argument('--games', type=int, default=3)
+    cache_parser.add_argument('--size', type=int, default=9)
+    cache_parser.add_argument('--depth', type=int, default=2)
+    cache_parser.add_argument('--entries', type=int, default=1 << 20)
+    cache_parser.set_defaults(func=bench_cache)
+
+    batch_parser = sub.add_parser('batch', help="묶음 AI 서비스의 동시 호출 수별 처리량과 지연")
+    batch_parser.add_argument('--callers', type=int, nargs='+', default=[1, 4, 16, 64])
+    batch_parser.add_argument('--positions', type=int, default=128, help="탐색할 국면 수")
+    batch_parser.add_argument('--window', type=float, default=2, help="묶음 대기 시간 (ms)")
+    batch_parser.add_argument('--size', type=int, default=15)
+    batch_parser.add_argument('--depth', type=int, default=0)
+    batch_parser.set_defaults(func=bench_batch)
+
+    hints_parser = sub.add_parser('hints', help="힌트 점수 수당 갱신 시간")
+    hints_parser.add_argument('--games', type=int, default=20)
+    hints_parser.add_argument('--moves', type=int, default=40, help="판마다 둘 수")
+    hints_parser.set_defaults(func=bench_hints)
+
+    timeline_parser = sub.add_parser('timeline', help="수순 타임라인 임의 이동 시간")
+    timeline_parser.add_argument('--seeks', type=int, default=200)
+    timeline_parser.add_argument('--replays', type=int, default=10, help="비교용으로 처음부터 다시 둘 횟수")
+    timeline_parser.set_defaults(func=bench_timeline)
+
+    clock_parser = sub.add_parser('clock', help="시간 규칙 아래 AI 자체 대국의 수 종류별 사용 시간")
+    clock_parser.add_argument('--control', default='20+0.2', help="시간 규칙 (예: 300, 300+5, 300/3x30)")
+    clock_parser.add_argument('--games', type=int, default=2)
+    clock_parser.add_argument('--opening', type=int, default=3, help="무작위로 둘 초반 수")
+    clock_parser.set_defaults(func=bench_clock)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,192 @@
 3D 오목 게임 - 보드 관리 및 승리 판정
 """
 
+import random
 import numpy as np
+from patterns import THREAT, THREAT_FIVE, FREE_FIVES, WINDOW_MASK, WALL
+from rules import (RULE_STANDARD, RULES, LONG_WINDOW_CENTER, requires_exact_five,
+                   has_forbidden_moves, is_exact_five, is_forbidden)
+
+# 대칭 변환 번호 (0: 항등, 1~3: 90/180/270도 회전, 4~7: 반사)
+SYMMETRY_COUNT = 8
+
+# 정사각형이 아닌 보드에서 모양을 유지하는 변환 (항등, 180도 회전, 좌우/상하 반사)
+RECT_SYMMETRIES = (0, 2, 4, 5)
+
+# 90/270도 회전만 서로 역변환이고 나머지는 자기 자신이 역변환
+INVERSE_SYMMETRY = (0, 3, 2, 1, 4, 5, 6, 7)
+
+_ZOBRIST_SEED = 20240615
+_zobrist_cache = {}
+
+# 라인 방향 (가로, 세로, 우하 대각선, 우상 대각선)
+DIRECTIONS = [(1, 0), (0, 1), (1, 1), (1, -1)]
+
+# 라인 정수의 앞뒤에 붙이는 보드 밖 칸 수 (패턴 창 반폭)
+LINE_PADDING = 4
+
+_empty_lines_cache = {}
+
+# 승리에 필요한 연속 돌 수
+FIVE = 5
+
+
+def transform_point(x, y, transform, cols, rows):
+    """좌표에 대칭 변환 적용"""
+    if transform == 0:
+        return x, y
+    elif transform == 1:
+        return rows - 1 - y, x
+    elif transform == 2:
+        return cols - 1 - x, rows - 1 - y
+    elif transform == 3:
+        return y, cols - 1 - x
+    elif transform == 4:
+        return cols - 1 - x, y
+    elif transform == 5:
+        return x, rows - 1 - y
+    elif transform == 6:
+        return y, x
+    else:
+        return rows - 1 - y, cols - 1 - x
+
+
+def get_symmetries(rows, cols):
+    """보드 크기에서 사용할 수 있는 대칭 변환 목록"""
+    if rows == cols:
+        return tuple(range(SYMMETRY_COUNT))
+    return RECT_SYMMETRIES
+
+
+def get_zobrist_keys(rows, cols):
+    """보드 크기별 조브리스트 키 테이블 (keys[변환][플레이어][칸])
+
+    각 변환의 키는 변환된 칸의 기본 키이므로, 대칭인 두 국면은
+    서로 다른 변환 번호에서 같은 해시 값을 가진다.
+    """
+    size = (rows, cols)
+    if size not in _zobrist_cache:
+        rng = random.Random(_ZOBRIST_SEED + rows * 1000 + cols)
+        base = [None] + [[rng.getrandbits(64) for _ in range(rows * cols)]
+                         for _ in range(2)]
+        keys = []
+        for t in range(SYMMETRY_COUNT):
+            if t not in get_symmetries(rows, cols):
+                keys.append(None)
+                continue
+            per_player = [None]
+            for player in (1, 2):
+                cell_keys = []
+                for y in range(rows):
+                    for x in range(cols):
+                        tx, ty = transform_point(x, y, t, cols, rows)
+                        cell_keys.append(base[player][ty * cols + tx])
+                per_player.append(cell_keys)
+            keys.append(per_player)
+        _zobrist_cache[size] = keys
+    return _zobrist_cache[size]
+
+
+def line_position(x, y, direction, rows):
+    """(x, y)가 속한 라인 번호와 라인 안 위치"""
+    if direction == 0:
+        return y, x
+    elif direction == 1:
+        return x, y
+    elif direction == 2:
+        return x - y + rows - 1, y
+    else:
+        return x + y, x
+
+
+def get_empty_lines(rows, cols):
+    """빈 보드의 방향별 라인 정수 목록 (보드 밖 칸은 WALL로 채움)
+
+    라인 안 위치 p의 칸은 비트 2 * (p + LINE_PADDING) 에 있으므로
+    (line >> 2 * p) & WINDOW_MASK 가 그 칸 중심의 9칸 패턴 창이 된다.
+    """
+    size = (rows, cols)
+    if size not in _empty_lines_cache:
+        all_lines = []
+        for direction, (dx, dy) in enumerate(DIRECTIONS):
+            if direction == 0:
+                count, length = rows, cols
+            elif direction == 1:
+                count, length = cols, rows
+            else:
+                count = rows + cols - 1
+                length = rows if direction == 2 else cols
+            
+            lines = []
+            for line_id in range(count):
+                value = 0
+                for pos in range(-LINE_PADDING, length + LINE_PADDING):
+                    if direction == 0:
+                        x, y = pos, line_id
+                    elif direction == 1:
+                        x, y = line_id, pos
+                    elif direction == 2:
+                        x, y = line_id - rows + 1 + pos, pos
+                    else:
+                        x, y = pos, line_id - pos
+                    if not (0 <= x < cols and 0 <= y < rows):
+                        value |= WALL << (2 * (pos + LINE_PADDING))
+                lines.append(value)
+            all_lines.append(lines)
+        _empty_lines_cache[size] = all_lines
+    return _empty_lines_cache[size]
+
+
+def count_five_windows(dimensions, directions):
+    """보드 안의 5칸 창 개수 (dimensions는 축별 크기, 방향마다 축별로 놓일 수 있는 시작 칸 수의 곱)"""
+    total = 0
+    for direction in directions:
+        count = 1
+        for size, delta in zip(dimensions, direction):
+            count *= max(0, size - (FIVE - 1) * abs(delta))
+        total += count
+    return total
+
+
+def check_rule(rule):
+    """규칙 이름 확인"""
+    if rule not in RULES:
+        raise ValueError("알 수 없는 규칙: {} (가능: {})".format(rule, ", ".join(RULES)))
+    return rule
+
 
 class Board:
     """오목판 클래스"""
     
-    def __init__(self, rows=15, cols=15):
-        """보드 초기화"""
+    # 승리 라인 방향 (3D 보드는 13방향)
+    directions = DIRECTIONS
+    
+    def __init__(self, rows=15, cols=15, rule=RULE_STANDARD):
+        """보드 초기화 (rule: rules.RULES 중 하나)"""
         self.rows = rows
         self.cols = cols
+        self.rule = check_rule(rule)
         self.board = np.zeros((rows, cols), dtype=int)
         self.move_count = 0
+        
+        # 대칭 변환별 조브리스트 해시 (돌을 놓을 때마다 갱신)
+        self.symmetries = get_symmetries(rows, cols)
+        self.zobrist_keys = get_zobrist_keys(rows, cols)
+        self.hashes = [0] * SYMMETRY_COUNT
+        
+        # 놓인 돌 목록 {(x, y): 플레이어} - 빈 칸을 훑지 않기 위해 유지
+        self.stones = {}
+        
+        # 방향별 라인을 칸당 2비트 정수로 유지 (패턴 조회표의 창 번호를 바로 얻기 위함)
+        self.lines = [lines[:] for lines in get_empty_lines(rows, cols)]
+        
+        # 플레이어별 아직 5를 만들 수 있는 5칸 창 수 (상대 돌이 없는 창)
+        window_count = count_five_windows((cols, rows), self.directions)
+        self.live_windows = [None, window_count, window_count]
+    
+    def in_bounds(self, x, y):
+        """보드 안의 칸인지 확인"""
+        return 0 <= x < self.cols and 0 <= y < self.rows
     
     def is_valid_move(self, x, y):
         """유효한 수인지 확인"""
@@ -27,47 +202,192 @@ class Board:
         if self.is_valid_move(x, y):
             self.board[y][x] = player
             self.move_count += 1
+            self.stones[(x, y)] = player
+            self._update_hashes(x, y, player)
+            self._update_viability(x, y, player, 1)
+            self._update_lines(x, y, player)
             return True
         return False
     
-    def check_win(self, x, y, player):
-        """승리 조건 확인"""
-        # 8방향 검사 (가로, 세로, 대각선)
-        directions = [
-            (1, 0),   # 가로
-            (0, 1),   # 세로
-            (1, 1),   # 우하 대각선
-            (1, -1)   # 우상 대각선
+    def _update_viability(self, x, y, player, step):
+        """상대가 이길 수 있는 5칸 창 수 갱신 (놓기는 돌을 넣기 전, 빼기는 돌을 뺀 뒤 호출)
+
+        (x, y)를 포함하면서 player 돌이 없는 창은 player가 두면 상대에게 죽은 창이 되고,
+        빼면 다시 살아난다. 창 수는 9칸 패턴 창에서 조회표로 바로 읽는다.
+        """
+        free = FREE_FIVES[player]
+        lines = self.lines
+        changed = (free[(lines[0][y] >> (2 * x)) & WINDOW_MASK] +
+                   free[(lines[1][x] >> (2 * y)) & WINDOW_MASK] +
+                   free[(lines[2][x - y + self.rows - 1] >> (2 * y)) & WINDOW_MASK] +
+                   free[(lines[3][x + y] >> (2 * x)) & WINDOW_MASK])
+        self.live_windows[3 - player] -= step * changed
+    
+    def count_live_windows(self, player):
+        """player가 아직 5를 만들 수 있는 5칸 창 수"""
+        return self.live_windows[player]
+    
+    def is_dead(self):
+        """두 플레이어 모두 5를 만들 수 있는 창이 없어 무승부가 확정됐는지
+
+        창 안에 상대 돌이 없다는 것만 보므로 실제보다 늦게 판정할 수는 있어도
+        이길 수 있는 국면을 무승부로 보지는 않는다.
+        """
+        return not self.live_windows[1] and not self.live_windows[2]
+    
+    def _update_lines(self, x, y, player):
+        """네 방향 라인 정수에서 한 칸을 XOR (놓기와 빼기 모두 사용)"""
+        rows = self.rows
+        lines = self.lines
+        lines[0][y] ^= player << (2 * (x + LINE_PADDING))
+        lines[1][x] ^= player << (2 * (y + LINE_PADDING))
+        lines[2][x - y + rows - 1] ^= player << (2 * (y + LINE_PADDING))
+        lines[3][x + y] ^= player << (2 * (x + LINE_PADDING))
+    
+    def get_window(self, x, y, direction):
+        """(x, y) 중심 한 방향 9칸 패턴 창 번호"""
+        line_id, pos = line_position(x, y, direction, self.rows)
+        return (self.lines[direction][line_id] >> (2 * pos)) & WINDOW_MASK
+    
+    def get_windows(self, x, y):
+        """(x, y) 중심 네 방향 패턴 창 번호 목록"""
+        lines = self.lines
+        return [
+            (lines[0][y] >> (2 * x)) & WINDOW_MASK,
+            (lines[1][x] >> (2 * y)) & WINDOW_MASK,
+            (lines[2][x - y + self.rows - 1] >> (2 * y)) & WINDOW_MASK,
+            (lines[3][x + y] >> (2 * x)) & WINDOW_MASK,
         ]
+
+    def get_window_matrix(self, moves):
+        """여러 칸의 패턴 창 번호 배열 (수 개수, 방향 수) - 조회표로 한 번에 분류하기 위함"""
+        return np.array([self.get_windows(*move) for move in moves],
+                        dtype=np.int64).reshape(len(moves), len(self.directions))
+
+    def remove_stone(self, x, y):
+        """놓인 돌을 되돌리는 함수 (탐색용)"""
+        player = self.stones.pop((x, y), None)
+        if player is None:
+            return False
+        self.board[y][x] = 0
+        self.move_count -= 1
+        self._update_hashes(x, y, player)
+        self._update_lines(x, y, player)
+        self._update_viability(x, y, player, -1)
+        return True
+    
+    def get_candidate_moves(self, distance=2):
+        """놓인 돌에서 distance 칸 이내의 빈 칸들 (빈 보드면 중앙)"""
+        if not self.stones:
+            return [self.center()]
         
-        for dx, dy in directions:
-            count = 1  # 현재 위치 포함
-            
-            # 양방향으로 연속된 돌 개수 확인
-            # 정방향
-            temp_x, temp_y = x + dx, y + dy
-            while (0 <= temp_x < self.cols and 
-                   0 <= temp_y < self.rows and 
-                   self.board[temp_y][temp_x] == player):
-                count += 1
-                temp_x += dx
-                temp_y += dy
-            
-            # 역방향
-            temp_x, temp_y = x - dx, y - dy
-            while (0 <= temp_x < self.cols and 
-                   0 <= temp_y < self.rows and 
-                   self.board[temp_y][temp_x] == player):
-                count += 1
-                temp_x -= dx
-                temp_y -= dy
-            
-            # 5개 이상이면 승리
-            if count >= 5:
-                return True
-        
+        candidates = {}
+        for sx, sy in self.stones:
+            for y in range(max(0, sy - distance), min(self.rows, sy + distance + 1)):
+                for x in range(max(0, sx - distance), min(self.cols, sx + distance + 1)):
+                    if (x, y) not in self.stones:
+                        candidates[(x, y)] = True
+        return list(candidates)
+    
+    def _update_hashes(self, x, y, player):
+        """대칭 해시 갱신 (놓기와 빼기 모두 XOR 한 번)"""
+        index = y * self.cols + x
+        for t in self.symmetries:
+            self.hashes[t] ^= self.zobrist_keys[t][player][index]
+    
+    def get_hash(self):
+        """현재 방향 그대로의 국면 해시"""
+        return self.hashes[0]
+    
+    def get_canonical(self):
+        """대칭 정규형 해시와 그 정규형으로 가는 변환 번호"""
+        best_t = 0
+        best_hash = self.hashes[0]
+        for t in self.symmetries:
+            if self.hashes[t] < best_hash:
+                best_hash = self.hashes[t]
+                best_t = t
+        return best_hash, best_t
+    
+    def get_canonical_transforms(self):
+        """정규형 해시와 그 값을 주는 모든 변환 번호 (대칭인 국면은 여러 개)"""
+        canonical_hash = self.get_canonical()[0]
+        return canonical_hash, [t for t in self.symmetries
+                                if self.hashes[t] == canonical_hash]
+    
+    def canonical_hash_after(self, x, y, player):
+        """(x, y)에 player가 둔 뒤의 정규형 해시 (돌을 놓지 않고 계산)"""
+        index = y * self.cols + x
+        hashes = self.hashes
+        keys = self.zobrist_keys
+        return min(hashes[t] ^ keys[t][player][index] for t in self.symmetries)
+    
+    def canonical_hash(self):
+        """대칭 정규형 해시 (캐시/정석 테이블의 키)"""
+        return self.get_canonical()[0]
+    
+    def to_canonical(self, x, y, transform):
+        """실제 좌표를 정규형 좌표로 변환"""
+        return transform_point(x, y, transform, self.cols, self.rows)
+    
+    def from_canonical(self, x, y, transform):
+        """정규형 좌표를 실제 좌표로 되돌림"""
+        return transform_point(x, y, INVERSE_SYMMETRY[transform], self.cols, self.rows)
+    
+    def check_win(self, x, y, player):
+        """승리 조건 확인 (x, y를 player 돌로 보고 5개 이상 연속이면 승리, 규칙에 따라 정확히 5)"""
+        threats = THREAT[player]
+        for window in self.get_windows(x, y):
+            if threats[window] == THREAT_FIVE:
+                return self.is_rule_five((x, y), player)
         return False
     
+    def is_rule_five(self, cell, player):
+        """5 이상이 되는 수가 규칙상 승리인지 (정확히 5 규칙이면 장목 제외)"""
+        if not requires_exact_five(self.rule, player):
+            return True
+        return is_exact_five(self.get_long_windows(*cell), player)
+    
+    def is_forbidden(self, *cell):
+        """흑이 cell에 두는 수가 금수인지 (렌주 규칙에서만)"""
+        if not has_forbidden_moves(self.rule, 1):
+            return False
+        return is_forbidden(self.get_long_windows(*cell))
+    
+    def get_long_windows(self, *cell):
+        """cell 중심 방향별 11칸 창 번호 (9칸 창 양쪽에 ±5 칸을 붙임)
+
+        규칙 판정에만 쓰이므로 라인 정수를 넓히지 않고 두 칸을 직접 읽는다.
+        """
+        windows = []
+        reach = LONG_WINDOW_CENTER
+        for direction, window in zip(self.directions, self.get_windows(*cell)):
+            before = tuple(c - reach * d for c, d in zip(cell, direction))
+            after = tuple(c + reach * d for c, d in zip(cell, direction))
+            windows.append(self._cell_code(before) | (window << 2) |
+                           (self._cell_code(after) << (4 * reach)))
+        return windows
+    
+    def _cell_code(self, cell):
+        """창에 넣을 칸 값 (보드 밖이면 WALL)"""
+        return self.get(*cell) if self.in_bounds(*cell) else WALL
+    
+    def get(self, x, y):
+        """칸의 값 (0: 빈 칸, 1: 흑, 2: 백)"""
+        return self.stones.get((x, y), 0)
+    
+    def encode_cell(self, x, y):
+        """칸 좌표를 정수 번호로 변환 (치환표의 수 저장용)"""
+        return y * self.cols + x
+    
+    def decode_cell(self, index):
+        """정수 번호를 칸 좌표로 변환"""
+        return index % self.cols, index // self.cols
+    
+    def center(self):
+        """보드 중앙 좌표"""
+        return self.cols // 2, self.rows // 2
+    
     def is_full(self):
         """보드가 가득 찼는지 확인"""
         return self.move_count >= self.rows * self.cols
@@ -83,9 +403,13 @@ class Board:
     
     def copy(self):
         """보드 복사"""
-        new_board = Board(self.rows, self.cols)
+        new_board = Board(self.rows, self.cols, self.rule)
         new_board.board = self.board.copy()
         new_board.move_count = self.move_count
+        new_board.hashes = self.hashes[:]
+        new_board.stones = self.stones.copy()
+        new_board.lines = [lines[:] for lines in self.lines]
+        new_board.live_windows = self.live_windows[:]
         return new_board
     
     def print_board(self):
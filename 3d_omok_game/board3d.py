@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 정육면체 보드 (13방향 승리 판정)
+
+칸 좌표는 (x, y, z) 이고 z는 층 번호이다. 칸 수가 평면 보드의 수십~수백 배이므로
+모든 연산을 돌 주변만 보도록 만든다.
+    - 13방향 라인을 칸당 2비트 정수 (numpy int64 배열) 로 유지하므로 패턴 창은 시프트 한 번으로 얻는다.
+    - 칸마다 (라인 번호, 시프트) 표를 미리 계산해 두어 놓기/빼기는 배열 XOR 한 번이고,
+      후보 수 전체의 패턴 창도 배열 연산 한 번으로 얻는다.
+    - 돌에서 라인을 따라 2칸 이내인 빈 칸의 개수표를 유지해 후보 수를 바로 꺼낸다.
+    - 48가지 정육면체 대칭 각각의 조브리스트 해시를 유지한다.
+    - 플레이어별 아직 이길 수 있는 5칸 창 수를 유지해 무승부를 일찍 판정한다.
+"""
+
+import random
+import itertools
+import numpy as np
+from board import Board, LINE_PADDING, check_rule, count_five_windows
+from rules import RULE_STANDARD
+from patterns import THREAT, THREAT_FIVE, FREE_FIVES, WINDOW_MASK, WALL
+
+# 13방향 (반대 방향은 같은 라인이므로 한쪽만)
+DIRECTIONS_3D = [
+    (1, 0, 0), (0, 1, 0), (1, 1, 0), (1, -1, 0),      # 같은 층 안의 4방향
+    (0, 0, 1),                                        # 층을 관통하는 방향
+    (1, 0, 1), (1, 0, -1), (0, 1, 1), (0, 1, -1),     # 세로 평면 대각선
+    (1, 1, 1), (1, 1, -1), (1, -1, 1), (1, -1, -1),   # 공간 대각선
+]
+
+# 후보 수로 보는 거리 (돌에서 라인을 따라 몇 칸까지)
+CANDIDATE_DISTANCE = 2
+
+# 라인 정수를 int64에 담을 수 있는 최대 크기 ((크기 + 2 * LINE_PADDING) * 2 <= 63)
+MAX_SIZE = 63 // 2 - 2 * LINE_PADDING
+
+# 정육면체 대칭 변환 (축 순열 6가지 x 축 반전 8가지)
+AXIS_PERMUTATIONS = list(itertools.permutations(range(3)))
+SYMMETRY_COUNT_3D = len(AXIS_PERMUTATIONS) * 8
+
+_ZOBRIST_SEED = 20240616
+_geometry_cache = {}
+
+
+def transform_point_3d(x, y, z, transform, size):
+    """좌표에 정육면체 대칭 변환 적용 (transform = 순열 번호 * 8 + 반전 비트)"""
+    point = (x, y, z)
+    permutation = AXIS_PERMUTATIONS[transform >> 3]
+    result = [point[axis] for axis in permutation]
+    for axis in range(3):
+        if transform & (1 << axis):
+            result[axis] = size - 1 - result[axis]
+    return tuple(result)
+
+
+def _build_inverse_symmetry():
+    """변환 번호별 역변환 번호 (좌표값이 모두 다른 점 하나로 확인)"""
+    inverse = []
+    point = (0, 1, 3)
+    for t in range(SYMMETRY_COUNT_3D):
+        moved = transform_point_3d(*point, t, 10)
+        inverse.append(next(u for u in range(SYMMETRY_COUNT_3D)
+                            if transform_point_3d(*moved, u, 10) == point))
+    return tuple(inverse)
+
+
+INVERSE_SYMMETRY_3D = _build_inverse_symmetry()
+
+
+class Geometry3D:
+    """보드 크기별로 한 번만 계산하는 라인/이웃/해시 키 표"""
+
+    def __init__(self, size):
+        self.size = size
+        cell_count = size ** 3
+
+        # 칸별 13방향의 라인 번호와 창 시프트 (라인 안 위치 p의 창은 line >> 2 * p)
+        empty_lines = []
+        line_ids = np.zeros((cell_count, len(DIRECTIONS_3D)), dtype=np.int64)
+        shifts = np.zeros((cell_count, len(DIRECTIONS_3D)), dtype=np.int64)
+        for direction, (dx, dy, dz) in enumerate(DIRECTIONS_3D):
+            starts = {}
+            for index in range(cell_count):
+                x, y, z = self.decode(index)
+                back = self._steps(x, y, z, -dx, -dy, -dz)
+                start = (x - back * dx, y - back * dy, z - back * dz)
+                line_id = starts.get(start)
+                if line_id is None:
+                    length = self._steps(*start, dx, dy, dz) + 1
+                    line_id = starts[start] = len(empty_lines)
+                    empty_lines.append(self._wall_line(length))
+                line_ids[index, direction] = line_id
+                shifts[index, direction] = 2 * back
+        self.empty_lines = np.array(empty_lines, dtype=np.int64)
+        self.line_ids = line_ids
+        self.shifts = shifts
+        # 돌을 놓을 때 라인에 XOR할 값 (플레이어 번호를 곱해서 사용)
+        self.stone_bits = np.left_shift(1, shifts + 2 * LINE_PADDING)
+
+        # 칸별 후보 이웃 (13방향 라인을 따라 양쪽 CANDIDATE_DISTANCE 칸 이내)
+        self.neighbors = []
+        for index in range(cell_count):
+            x, y, z = self.decode(index)
+            cells = []
+            for dx, dy, dz in DIRECTIONS_3D:
+                for k in range(1, CANDIDATE_DISTANCE + 1):
+                    for sign in (k, -k):
+                        nx, ny, nz = x + sign * dx, y + sign * dy, z + sign * dz
+                        if 0 <= nx < size and 0 <= ny < size and 0 <= nz < size:
+                            cells.append((nx, ny, nz))
+            self.neighbors.append(cells)
+
+        self.zobrist_keys = self._build_zobrist_keys()
+
+    def decode(self, index):
+        """칸 번호 -> (x, y, z)"""
+        size = self.size
+        return index % size, (index // size) % size, index // (size * size)
+
+    def _steps(self, x, y, z, dx, dy, dz):
+        """(x, y, z)에서 한 방향으로 보드 안에 머무를 수 있는 칸 수"""
+        steps = self.size
+        for value, delta in ((x, dx), (y, dy), (z, dz)):
+            if delta > 0:
+                steps = min(steps, self.size - 1 - value)
+            elif delta < 0:
+                steps = min(steps, value)
+        return steps
+
+    def _wall_line(self, length):
+        """길이 length 라인의 빈 정수 (앞뒤 LINE_PADDING 칸은 WALL)"""
+        value = 0
+        for pos in range(-LINE_PADDING, length + LINE_PADDING):
+            if not 0 <= pos < length:
+                value |= WALL << (2 * (pos + LINE_PADDING))
+        return value
+
+    def _build_zobrist_keys(self):
+        """keys[변환][플레이어][칸] (평면 보드와 같이 변환된 칸의 기본 키)"""
+        size = self.size
+        cell_count = size ** 3
+        rng = random.Random(_ZOBRIST_SEED + size)
+        base = [None] + [np.array([rng.getrandbits(64) for _ in range(cell_count)],
+                                  dtype=np.uint64) for _ in range(2)]
+        index = np.arange(cell_count)
+        coords = np.stack([index % size, (index // size) % size, index // (size * size)])
+        keys = []
+        for t in range(SYMMETRY_COUNT_3D):
+            moved = coords[list(AXIS_PERMUTATIONS[t >> 3])]
+            for axis in range(3):
+                if t & (1 << axis):
+                    moved[axis] = size - 1 - moved[axis]
+            target = moved[0] + moved[1] * size + moved[2] * size * size
+            keys.append([None] + [base[player][target].tolist() for player in (1, 2)])
+        return keys
+
+
+def get_geometry(size):
+    """크기별 Geometry3D (캐시)"""
+    if size not in _geometry_cache:
+        _geometry_cache[size] = Geometry3D(size)
+    return _geometry_cache[size]
+
+
+class Board3D(Board):
+    """정육면체 오목판 클래스 (size x size x size)"""
+
+    directions = DIRECTIONS_3D
+
+    def __init__(self, size=9, rule=RULE_STANDARD):
+        """보드 초기화"""
+        if not 5 <= size <= MAX_SIZE:
+            raise ValueError("3D 보드 크기는 5 이상 {} 이하여야 합니다".format(MAX_SIZE))
+        self.size = size
+        self.rows = self.cols = self.layers = size
+        self.rule = check_rule(rule)
+        self.move_count = 0
+        self.stones = {}
+
+        geometry = get_geometry(size)
+        self.line_ids = geometry.line_ids
+        self.shifts = geometry.shifts
+        self.stone_bits = geometry.stone_bits
+        self.neighbors = geometry.neighbors
+        self.zobrist_keys = geometry.zobrist_keys
+        self.symmetries = tuple(range(SYMMETRY_COUNT_3D))
+        self.hashes = [0] * SYMMETRY_COUNT_3D
+
+        # 13방향 라인 정수 (모든 방향의 라인을 한 배열에)
+        self.lines = geometry.empty_lines.copy()
+
+        # 층별 돌 {(x, y): 플레이어} - 화면에 한 층을 그릴 때 사용
+        self.layer_stones = [{} for _ in range(size)]
+
+        # 후보 칸별 주변 돌 수 (0이 되면 지움)
+        self.neighbor_counts = {}
+
+        # 플레이어별 아직 5를 만들 수 있는 5칸 창 수
+        window_count = count_five_windows((size, size, size), DIRECTIONS_3D)
+        self.live_windows = [None, window_count, window_count]
+
+    def index(self, x, y, z):
+        """칸 좌표 -> 칸 번호"""
+        return (z * self.size + y) * self.size + x
+
+    def in_bounds(self, x, y, z):
+        """보드 안의 칸인지 확인"""
+        size = self.size
+        return 0 <= x < size and 0 <= y < size and 0 <= z < size
+
+    def is_valid_move(self, x, y, z):
+        """유효한 수인지 확인"""
+        return self.in_bounds(x, y, z) and (x, y, z) not in self.stones
+
+    def place_stone(self, x, y, z, player):
+        """돌을 놓는 함수"""
+        if not self.is_valid_move(x, y, z):
+            return False
+        self.stones[(x, y, z)] = player
+        self.layer_stones[z][(x, y)] = player
+        self.move_count += 1
+        index = self.index(x, y, z)
+        self._update_hashes(index, player)
+        self._update_viability(index, player, 1)
+        self._update_lines(index, player)
+
+        counts = self.neighbor_counts
+        for cell in self.neighbors[index]:
+            counts[cell] = counts.get(cell, 0) + 1
+        return True
+
+    def remove_stone(self, x, y, z):
+        """놓인 돌을 되돌리는 함수 (탐색용)"""
+        player = self.stones.pop((x, y, z), None)
+        if player is None:
+            return False
+        del self.layer_stones[z][(x, y)]
+        self.move_count -= 1
+        index = self.index(x, y, z)
+        self._update_hashes(index, player)
+        self._update_lines(index, player)
+        self._update_viability(index, player, -1)
+
+        counts = self.neighbor_counts
+        for cell in self.neighbors[index]:
+            count = counts[cell] - 1
+            if count:
+                counts[cell] = count
+            else:
+                del counts[cell]
+        return True
+
+    def _update_hashes(self, index, player):
+        """대칭 해시 갱신 (놓기와 빼기 모두 XOR)"""
+        hashes = self.hashes
+        for t, keys in enumerate(self.zobrist_keys):
+            hashes[t] ^= keys[player][index]
+
+    def _update_viability(self, index, player, step):
+        """상대가 이길 수 있는 5칸 창 수 갱신 (13방향 패턴 창의 창 수를 조회표에서 합산)"""
+        free = FREE_FIVES[player]
+        windows = ((self.lines[self.line_ids[index]] >> self.shifts[index]) & WINDOW_MASK).tolist()
+        changed = sum([free[window] for window in windows])
+        self.live_windows[3 - player] -= step * changed
+
+    def _update_lines(self, index, player):
+        """칸이 속한 13개 라인 정수를 XOR (한 칸의 13개 라인은 모두 다름)"""
+        self.lines[self.line_ids[index]] ^= self.stone_bits[index] * player
+
+    def get_window(self, x, y, z, direction):
+        """(x, y, z) 중심 한 방향 9칸 패턴 창 번호"""
+        index = self.index(x, y, z)
+        line = int(self.lines[self.line_ids[index, direction]])
+        return (line >> int(self.shifts[index, direction])) & WINDOW_MASK
+
+    def get_windows(self, x, y, z):
+        """(x, y, z) 중심 13방향 패턴 창 번호 목록"""
+        index = self.index(x, y, z)
+        return ((self.lines[self.line_ids[index]] >> self.shifts[index]) & WINDOW_MASK).tolist()
+
+    def get_window_matrix(self, moves):
+        """여러 칸의 패턴 창 번호 배열 (수 개수, 13) - 배열 연산 한 번"""
+        size = self.size
+        index = np.array([(z * size + y) * size + x for x, y, z in moves], dtype=np.int64)
+        return (self.lines[self.line_ids[index]] >> self.shifts[index]) & WINDOW_MASK
+
+    def check_win(self, x, y, z, player):
+        """승리 조건 확인 (x, y, z를 player 돌로 보고 13방향 중 5개 이상 연속이면 승리)"""
+        threats = THREAT[player]
+        for window in self.get_windows(x, y, z):
+            if threats[window] == THREAT_FIVE:
+                return self.is_rule_five((x, y, z), player)
+        return False
+
+    def get_candidate_moves(self, distance=CANDIDATE_DISTANCE):
+        """놓인 돌에서 13방향 라인을 따라 distance 칸 이내의 빈 칸들 (빈 보드면 중앙)"""
+        if not self.stones:
+            return [self.center()]
+        stones = self.stones
+        if distance == CANDIDATE_DISTANCE:
+            return [cell for cell in self.neighbor_counts if cell not in stones]
+
+        candidates = {}
+        for sx, sy, sz in stones:
+            for dx, dy, dz in DIRECTIONS_3D:
+                for k in range(-distance, distance + 1):
+                    cell = (sx + k * dx, sy + k * dy, sz + k * dz)
+                    if cell not in stones and self.in_bounds(*cell):
+                        candidates[cell] = True
+        return list(candidates)
+
+    def get(self, x, y, z):
+        """칸의 값 (0: 빈 칸, 1: 흑, 2: 백)"""
+        return self.stones.get((x, y, z), 0)
+
+    def canonical_hash_after(self, x, y, z, player):
+        """(x, y, z)에 player가 둔 뒤의 정규형 해시 (돌을 놓지 않고 계산)"""
+        index = self.index(x, y, z)
+        hashes = self.hashes
+        return min(hashes[t] ^ keys[player][index] for t, keys in enumerate(self.zobrist_keys))
+
+    def to_canonical(self, x, y, z, transform):
+        """실제 좌표를 정규형 좌표로 변환"""
+        return transform_point_3d(x, y, z, transform, self.size)
+
+    def from_canonical(self, x, y, z, transform):
+        """정규형 좌표를 실제 좌표로 되돌림"""
+        return transform_point_3d(x, y, z, INVERSE_SYMMETRY_3D[transform], self.size)
+
+    def encode_cell(self, x, y, z):
+        """칸 좌표를 정수 번호로 변환 (치환표의 수 저장용)"""
+        return self.index(x, y, z)
+
+    def decode_cell(self, index):
+        """정수 번호를 칸 좌표로 변환"""
+        size = self.size
+        return index % size, (index // size) % size, index // (size * size)
+
+    def center(self):
+        """보드 중앙 좌표"""
+        middle = self.size // 2
+        return middle, middle, middle
+
+    def is_full(self):
+        """보드가 가득 찼는지 확인"""
+        return self.move_count >= self.size ** 3
+
+    def get_valid_moves(self):
+        """유효한 수들의 리스트 반환"""
+        size = self.size
+        return [(x, y, z) for z in range(size) for y in range(size) for x in range(size)
+                if (x, y, z) not in self.stones]
+
+    def copy(self):
+        """보드 복사"""
+        new_board = Board3D(self.size, self.rule)
+        new_board.move_count = self.move_count
+        new_board.stones = self.stones.copy()
+        new_board.layer_stones = [stones.copy() for stones in self.layer_stones]
+        new_board.hashes = self.hashes[:]
+        new_board.lines = self.lines.copy()
+        new_board.neighbor_counts = self.neighbor_counts.copy()
+        new_board.live_windows = self.live_windows[:]
+        return new_board
+
+    def print_board(self):
+        """층별 보드 출력 (디버깅용)"""
+        for z in range(self.size):
+            print("z = {}".format(z))
+            for y in range(self.size):
+                print(' '.join('.' if self.get(x, y, z) == 0 else
+                               '●' if self.get(x, y, z) == 1 else '○'
+                               for x in range(self.size)))
+        print()
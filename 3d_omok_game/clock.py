@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 대국 시계와 AI 시간 배분
+
+시간 규칙은 "본 시간[+추가 시간][/횟수x초읽기]" 문자열 (초 단위) 로 정한다.
+    300        : 서든데스 (본 시간 5분을 다 쓰면 패배)
+    300+5      : 피셔 (한 수 둘 때마다 5초 추가)
+    300/3x30   : 초읽기 (본 시간 뒤 30초 초읽기 3번, 30초 안에 두면 그 초읽기는 다시 30초)
+초읽기를 넘길 때마다 한 번씩 줄고, 마지막 초읽기까지 넘기면 패배이다.
+
+TimeManager는 AI 차례에 남은 시간을 남은 수로 나눠 (목표 시간, 최대 시간) 을 정한다.
+목표 시간을 전술 국면과 불안정한 국면에 늘려 쓰는 것은 AIPlayer의 시간 제한 탐색이 한다.
+보드와 pygame 없이 쓸 수 있다.
+"""
+
+import re
+import time
+
+# 시간 규칙 문자열
+TIME_CONTROL_PATTERN = re.compile(
+    r'^(?P<main>\d+(?:\.\d+)?)(?:\+(?P<increment>\d+(?:\.\d+)?))?'
+    r'(?:/(?P<periods>\d+)x(?P<period>\d+(?:\.\d+)?))?$')
+
+# 앞으로 둘 것으로 보는 자기 수 (남은 시간을 나누는 수, 둔 수만큼 줄지만 최소값 아래로는 안 줄임)
+EXPECTED_MOVES = 40
+MIN_MOVES_TO_GO = 10
+
+# 한 수의 최대 시간은 목표의 이 배수까지, 그리고 남은 본 시간의 이 비율까지
+MAX_STRETCH = 4.0
+MAX_MAIN_SHARE = 0.25
+
+# 매 수 다시 채워지는 초읽기 한 번에서 목표로 쓰는 비율과 최대로 쓰는 비율
+PERIOD_TARGET_SHARE = 0.5
+PERIOD_MAX_SHARE = 0.8
+
+# 탐색 밖에서 드는 시간 (수 적용, 화면 갱신) 으로 남겨 두는 여유 (초)
+MOVE_OVERHEAD = 0.05
+
+
+class TimeControl:
+    """시간 규칙 (본 시간, 수마다 추가 시간, 초읽기 횟수와 길이 - 초 단위)"""
+
+    def __init__(self, main_time, increment=0.0, periods=0, period_time=0.0):
+        self.main_time = main_time
+        self.increment = increment
+        self.periods = periods
+        self.period_time = period_time
+
+    @classmethod
+    def parse(cls, text):
+        """시간 규칙 문자열 읽기 (예: 300, 300+5, 300/3x30)"""
+        match = TIME_CONTROL_PATTERN.match(text.strip())
+        if match is None or (match.group('periods') is not None and
+                              not (int(match.group('periods')) and float(match.group('period')))):
+            raise ValueError("알 수 없는 시간 규칙: {} (예: 300, 300+5, 300/3x30)".format(text))
+        return cls(float(match.group('main')), float(match.group('increment') or 0),
+                   int(match.group('periods') or 0), float(match.group('period') or 0))
+
+    def __str__(self):
+        text = "{:g}".format(self.main_time)
+        if self.increment:
+            text += "+{:g}".format(self.increment)
+        if self.periods:
+            text += "/{}x{:g}".format(self.periods, self.period_time)
+        return text
+
+
+def format_time(seconds):
+    """시계 표시 (1분 이상은 분:초, 10초 미만은 소수 한 자리)"""
+    seconds = max(0.0, seconds)
+    if seconds < 10:
+        return "{:.1f}".format(seconds)
+    seconds = int(seconds)
+    return "{}:{:02d}".format(seconds // 60, seconds % 60)
+
+
+class GameClock:
+    """흑/백 대국 시계 (한쪽 시계만 감)"""
+
+    def __init__(self, control, timer=time.perf_counter):
+        """control 규칙의 시계 (timer는 초 단위 현재 시각 함수, 시험에서 바꿔 끼움)"""
+        self.control = control
+        self.timer = timer
+        # 플레이어별 남은 본 시간과 초읽기 횟수 (시계가 가는 쪽은 멈출 때 반영)
+        self.main = [None, control.main_time, control.main_time]
+        self.periods = [None, control.periods, control.periods]
+        self.running = None
+        self.started = 0.0
+        # 시간을 다 써서 진 플레이어
+        self.flagged = None
+
+    def state(self, player):
+        """player의 (남은 본 시간, 남은 초읽기 횟수, 지금 초읽기의 남은 시간) - 가는 중이면 지금까지 쓴 시간 반영"""
+        main, periods, period = self.main[player], self.periods[player], self.control.period_time
+        elapsed = self.timer() - self.started if player == self.running else 0.0
+        if elapsed < main:
+            return main - elapsed, periods, period
+        # 본 시간을 넘긴 만큼 초읽기를 하나씩 씀
+        used = int((elapsed - main) // period) if periods else 0
+        if used >= periods:
+            return 0.0, 0, 0.0
+        return 0.0, periods - used, period - (elapsed - main) % period
+
+    def is_flagged(self, player):
+        """player가 시간을 다 썼는지"""
+        main, periods, _ = self.state(player)
+        return main <= 0 and not periods
+
+    def charge(self, moved):
+        """가는 시계를 멈추고 쓴 시간 반영 (moved면 수를 둔 것이므로 추가 시간을 더함)"""
+        player = self.running
+        if player is None:
+            return
+        main, periods, _ = self.state(player)
+        self.main[player], self.periods[player] = main, periods
+        self.running = None
+        if main <= 0 and not periods:
+            self.flagged = player
+        elif moved:
+            self.main[player] += self.control.increment
+
+    def start(self, player):
+        """player의 시계를 가게 함 (가던 시계는 추가 시간 없이 멈춤)"""
+        self.charge(False)
+        if self.flagged is None:
+            self.running = player
+            self.started = self.timer()
+
+    def press(self):
+        """수를 둔 쪽의 시계를 멈춤 (추가 시간을 더하고 초읽기는 다시 채움)"""
+        self.charge(True)
+
+    def pause(self):
+        """가는 시계를 추가 시간 없이 멈춤 (무르기, 대국 끝)"""
+        self.charge(False)
+
+    def check(self):
+        """가는 쪽이 시간을 다 썼으면 시계를 멈추고 그 플레이어를 돌려줌"""
+        if self.running is not None and self.is_flagged(self.running):
+            self.charge(False)
+        return self.flagged
+
+    def format(self, player):
+        """player의 남은 시간 표시 (초읽기 중이면 이번 초읽기 시간과 남은 횟수)"""
+        main, periods, period = self.state(player)
+        if main > 0 or not self.control.periods:
+            text = format_time(main)
+            if self.control.periods:
+                text += " + {}x{:g}s".format(periods, self.control.period_time)
+            return text
+        return "{} ({})".format(format_time(period), periods)
+
+
+class TimeManager:
+    """AI 차례에 이번 수에 쓸 시간을 정하는 클래스"""
+
+    def __init__(self, expected_moves=EXPECTED_MOVES, min_moves_to_go=MIN_MOVES_TO_GO,
+                 max_stretch=MAX_STRETCH, overhead=MOVE_OVERHEAD):
+        self.expected_moves = expected_moves
+        self.min_moves_to_go = min_moves_to_go
+        self.max_stretch = max_stretch
+        self.overhead = overhead
+
+    def allocate(self, clock, player, moves_played):
+        """(목표 시간, 최대 시간) - moves_played는 player가 이미 둔 수
+
+        목표는 남은 본 시간을 남은 수로 나눈 몫에 수마다 돌려받는 추가 시간과 초읽기 일부를 더한 값이고,
+        최대 시간은 시간을 다 쓰지 않도록 남은 본 시간 일부 (와 초읽기 한 번의 일부) 안으로 제한한다.
+        """
+        control = clock.control
+        main, periods, period = clock.state(player)
+        moves_to_go = max(self.min_moves_to_go, self.expected_moves - moves_played)
+        target = main / moves_to_go + control.increment
+        limit = min(main * MAX_MAIN_SHARE + control.increment, main)
+        if periods:
+            target += period * PERIOD_TARGET_SHARE
+            limit += period * PERIOD_MAX_SHARE
+        limit = max(0.0, min(target * self.max_stretch, limit) - self.overhead)
+        return min(target, limit), limit
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 빠른 구현 차등 퍼징
+
+조회표와 증분 갱신으로 빠르게 만든 판정을 칸을 하나씩 세는 단순한 기준 구현과 비교한다.
+    check_win   : Board.check_win (x, y를 player 돌로 보고 승리인지)
+    valid_moves : Board.get_valid_moves (빈 칸 목록)
+    evaluate    : AIPlayer._evaluate_board (돌마다 방향별 연속 개수/막힘 점수 합)
+    batch_threats, batch_evaluate: batch_service의 묶음 계산 (국면 하나씩 답하는 AIPlayer.answer와 비교)
+국면은 seed로 재현되는 무작위 수순(놓기와 되돌리기)으로 만들고, 보드 종류(Board, SparseBoard, Board3D)와
+크기, 규칙도 무작위로 고른다. 한 국면에서 빈 칸과 자기 돌 칸 x 두 플레이어를 모두 물어 사례 수를 늘린다.
+결과가 다르면 차이가 남는 동안 수순을 덜어내 최소 국면을 만들고, 다시 돌려 볼 수 있는 사례로 출력한다.
+판정마다 빠른 구현과 기준 구현의 초당 호출 수를 나란히 보고한다.
+
+사용 예:
+    python fuzz.py --positions 5000                    # 수백만 사례
+    python fuzz.py --kinds board --checks check_win --seed 7
+    python fuzz.py --replay "('board', 9, 'standard', ((4, 4, 1), ...), 'check_win', (4, 4, 1))"
+"""
+
+import ast
+import time
+import random
+import argparse
+from board import Board, DIRECTIONS
+from sparse_board import SparseBoard
+from board3d import Board3D, DIRECTIONS_3D
+from rules import RULES, requires_exact_five
+from ai_player import AIPlayer, REQUEST_THREATS, REQUEST_EVALUATE
+from batch_service import answer_requests
+
+# 보드 종류 -> (보드 생성 함수, 무작위로 고르는 크기 범위)
+BOARD_KINDS = {
+    'board': (lambda size, rule: Board(size, size, rule), (5, 19)),
+    'sparse': (lambda size, rule: SparseBoard(size, size, rule), (5, 19)),
+    'cube': (lambda size, rule: Board3D(size, rule), (5, 9)),
+}
+
+# 수순에서 돌을 되돌리는 항목의 플레이어 값
+REMOVE = 0
+
+
+def make_board(kind, size, rule, operations):
+    """수순 (칸..., 플레이어) 을 차례로 적용한 보드 (플레이어가 REMOVE면 되돌리기)"""
+    board = BOARD_KINDS[kind][0](size, rule)
+    for *cell, player in operations:
+        if player == REMOVE:
+            board.remove_stone(*cell)
+        else:
+            board.place_stone(*cell, player)
+    return board
+
+
+def board_cells(board):
+    """보드의 모든 칸 (x가 가장 빨리 변하는 순서)"""
+    if isinstance(board, Board3D):
+        size = board.size
+        return [(x, y, z) for z in range(size) for y in range(size) for x in range(size)]
+    return [(x, y) for y in range(board.rows) for x in range(board.cols)]
+
+
+def board_directions(board):
+    """보드의 라인 방향 (반대 방향 제외)"""
+    return DIRECTIONS_3D if isinstance(board, Board3D) else DIRECTIONS
+
+
+def cell_value(board, cell):
+    """칸 값 (보드 밖이면 None)"""
+    return board.get(*cell) if board.in_bounds(*cell) else None
+
+
+def step(cell, direction, k):
+    """cell에서 direction으로 k칸 간 칸"""
+    return tuple(c + k * d for c, d in zip(cell, direction))
+
+
+# ---- 기준 구현 (칸을 하나씩 읽어 센다) ----
+
+def reference_check_win(board, ai, query):
+    """cell을 player 돌로 보고 한 방향으로 5개 이상 (정확히 5 규칙이면 정확히 5개) 이어지는지"""
+    *cell, player = query
+    exact = requires_exact_five(board.rule, player)
+    for direction in board_directions(board):
+        count = 1
+        for sign in (1, -1):
+            k = 1
+            while cell_value(board, step(cell, direction, sign * k)) == player:
+                count += 1
+                k += 1
+        if count == 5 or (count > 5 and not exact):
+            return True
+    return False
+
+
+def reference_valid_moves(board, ai, query):
+    """빈 칸 전체"""
+    return sorted(cell for cell in board_cells(board) if board.get(*cell) == 0)
+
+
+def reference_line_score(board, ai, cell, direction):
+    """cell 돌의 한 방향 점수 (±4칸 안의 연속 개수와 막힌 쪽 수)"""
+    owner = board.get(*cell)
+    count, blocked = 1, 0
+    for sign in (1, -1):
+        run = 0
+        while run < 4 and cell_value(board, step(cell, direction, sign * (run + 1))) == owner:
+            run += 1
+        # 연속이 ±4칸 끝까지 이어지면 이미 5개 이상이므로 막힘은 보지 않음
+        if run < 4 and cell_value(board, step(cell, direction, sign * (run + 1))) != 0:
+            blocked += 1
+        count += run
+
+    # cell을 포함하는 5칸 중 상대 돌과 보드 밖 칸이 없는 5칸이 없으면 이 방향으로는 이길 수 없음
+    usable = any(all(cell_value(board, step(cell, direction, k)) in (0, owner)
+                     for k in range(start, start + 5))
+                 for start in range(-4, 1))
+    return ai.get_line_score(min(count, 5), blocked) if usable else 0
+
+
+def reference_evaluate(board, ai, query):
+    """player 돌의 방향별 점수 합에서 상대 돌의 점수 합을 뺀 값"""
+    player = query
+    score = 0
+    for cell in board_cells(board):
+        owner = board.get(*cell)
+        if owner == 0:
+            continue
+        stone_score = sum(reference_line_score(board, ai, cell, direction)
+                          for direction in board_directions(board))
+        score += stone_score if owner == player else -stone_score
+    return score
+
+
+# ---- 빠른 구현 ----
+
+def fast_check_win(board, ai, query):
+    return board.check_win(*query)
+
+
+def fast_valid_moves(board, ai, query):
+    return sorted(board.get_valid_moves())
+
+
+def fast_evaluate(board, ai, query):
+    return ai._evaluate_board(board, query)
+
+
+def answer_values(answer):
+    """탐색 요청의 답을 비교할 수 있는 값으로 (numpy 배열은 목록으로)"""
+    if not isinstance(answer, tuple):
+        return answer
+    return tuple(part if isinstance(part, list) else part.tolist() for part in answer)
+
+
+def fast_batch_threats(board, ai, query):
+    return answer_values(answer_requests(ai, [(REQUEST_THREATS, board, query)])[0])
+
+
+def reference_batch_threats(board, ai, query):
+    return answer_values(ai.answer((REQUEST_THREATS, board, query)))
+
+
+def fast_batch_evaluate(board, ai, query):
+    return answer_requests(ai, [(REQUEST_EVALUATE, board, query)])[0]
+
+
+def check_win_queries(board):
+    """빈 칸이나 자기 돌이 놓인 칸 x 두 플레이어 (상대 돌 위의 질의는 check_win이 가정하지 않음)"""
+    return [cell + (player,) for cell in board_cells(board) for player in (1, 2)
+            if board.get(*cell) in (0, player)]
+
+
+# 판정 이름 -> (빠른 구현, 기준 구현, 국면 하나에서 물을 질의 목록)
+CHECKS = {
+    'check_win': (fast_check_win, reference_check_win, check_win_queries),
+    'valid_moves': (fast_valid_moves, reference_valid_moves, lambda board: [None]),
+    'evaluate': (fast_evaluate, reference_evaluate, lambda board: [1, 2]),
+    'batch_threats': (fast_batch_threats, reference_batch_threats, lambda board: [1, 2]),
+    'batch_evaluate': (fast_batch_evaluate, fast_evaluate, lambda board: [1, 2]),
+}
+
+
+def random_operations(rng, kind, size):
+    """무작위 수순 (놓인 돌 옆 라인을 잇는 수를 섞어 연속이 자주 생기게 하고, 가끔 되돌림)"""
+    cube = kind == 'cube'
+    directions = DIRECTIONS_3D if cube else DIRECTIONS
+    dimension = 3 if cube else 2
+    fill = rng.choice((0.05, 0.2, 0.4, 0.7))
+    length = rng.randint(0, int(fill * size ** dimension))
+
+    stones = {}
+    operations = []
+    for _ in range(length):
+        if stones and rng.random() < 0.1:
+            cell = rng.choice(list(stones))
+            del stones[cell]
+            operations.append(cell + (REMOVE,))
+            continue
+        if stones and rng.random() < 0.6:
+            # 놓인 돌에서 라인을 따라 1~2칸
+            base = rng.choice(list(stones))
+            direction = rng.choice(directions)
+            cell = step(base, direction, rng.choice((-2, -1, 1, 2)))
+            player = stones[base] if rng.random() < 0.7 else 3 - stones[base]
+        else:
+            cell = tuple(rng.randrange(size) for _ in range(dimension))
+            player = rng.choice((1, 2))
+        if cell in stones or not all(0 <= c < size for c in cell):
+            continue
+        stones[cell] = player
+        operations.append(cell + (player,))
+    return tuple(operations)
+
+
+def random_position(rng, kinds):
+    """무작위 국면 (보드 종류, 크기, 규칙, 수순)"""
+    kind = rng.choice(kinds)
+    low, high = BOARD_KINDS[kind][1]
+    size = rng.randint(low, high)
+    rule = rng.choice(RULES)
+    return kind, size, rule, random_operations(rng, kind, size)
+
+
+def is_mismatch(case, ai, checks=CHECKS):
+    """사례 (종류, 크기, 규칙, 수순, 판정, 질의) 에서 빠른 구현과 기준 구현이 다른지"""
+    kind, size, rule, operations, check, query = case
+    fast, reference, _ = checks[check]
+    board = make_board(kind, size, rule, operations)
+    return fast(board, ai, query) != reference(board, ai, query)
+
+
+def minimize(case, ai, checks=CHECKS):
+    """차이가 남는 동안 수순 묶음을 덜어내 최소 사례를 만듦 (묶음을 점점 잘게 나눔)"""
+    kind, size, rule, operations, check, query = case
+    operations = list(operations)
+    chunk = max(1, len(operations) // 2)
+    while operations:
+        removed = False
+        start = 0
+        while start < len(operations):
+            trial = operations[:start] + operations[start + chunk:]
+            if is_mismatch((kind, size, rule, tuple(trial), check, query), ai, checks):
+                operations = trial
+                removed = True
+            else:
+                start += chunk
+        if chunk == 1 and not removed:
+            break
+        if not removed:
+            chunk = max(1, chunk // 2)
+    return kind, size, rule, tuple(operations), check, query
+
+
+def describe_case(case, ai, checks=CHECKS):
+    """사례를 다시 돌려 볼 수 있는 문자열과 두 구현의 결과 (2D면 보드 그림 포함)"""
+    kind, size, rule, operations, check, query = case
+    fast, reference, _ = checks[check]
+    board = make_board(kind, size, rule, operations)
+    lines = [repr(case),
+             "  빠른 구현: {!r}".format(fast(board, ai, query)),
+             "  기준 구현: {!r}".format(reference(board, ai, query))]
+    if kind != 'cube':
+        marks = {0: '.', 1: 'X', 2: 'O'}
+        for y in range(size):
+            lines.append('  ' + ' '.join(marks[board.get(x, y)] for x in range(size)))
+    return '\n'.join(lines)
+
+
+def fuzz(positions, seed=0, kinds=tuple(BOARD_KINDS), checks=CHECKS, max_failures=3):
+    """무작위 국면들로 판정마다 빠른 구현과 기준 구현을 비교
+
+    판정별 {'cases', 'fast_time', 'reference_time'}와 최소화한 불일치 사례 목록을 반환한다.
+    같은 국면의 질의를 구현별로 한꺼번에 돌려 시간을 재므로 호출 사이의 시간 측정 비용은 섞이지 않는다.
+    """
+    rng = random.Random(seed)
+    ai = AIPlayer()
+    stats = {name: {'cases': 0, 'fast_time': 0.0, 'reference_time': 0.0} for name in checks}
+    failures = []
+    for _ in range(positions):
+        kind, size, rule, operations = random_position(rng, kinds)
+        board = make_board(kind, size, rule, operations)
+        for name, (fast, reference, make_queries) in checks.items():
+            queries = make_queries(board)
+            start = time.perf_counter()
+            fast_results = [fast(board, ai, query) for query in queries]
+            middle = time.perf_counter()
+            reference_results = [reference(board, ai, query) for query in queries]
+            end = time.perf_counter()
+
+            stats[name]['cases'] += len(queries)
+            stats[name]['fast_time'] += middle - start
+            stats[name]['reference_time'] += end - middle
+            for query, fast_result, reference_result in zip(queries, fast_results,
+                                                            reference_results):
+                if fast_result != reference_result and len(failures) < max_failures:
+                    case = (kind, size, rule, operations, name, query)
+                    failures.append(minimize(case, ai, checks))
+        if len(failures) >= max_failures:
+            break
+    return stats, failures
+
+
+def rate(count, seconds):
+    """초당 호출 수"""
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def main():
+    """퍼징 명령줄 진입점"""
+    parser = argparse.ArgumentParser(description="빠른 판정 구현 차등 퍼징")
+    parser.add_argument('--positions', type=int, default=500, help="무작위 국면 수")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--kinds', nargs='+', choices=list(BOARD_KINDS), default=list(BOARD_KINDS))
+    parser.add_argument('--checks', nargs='+', choices=list(CHECKS), default=list(CHECKS))
+    parser.add_argument('--max-failures', type=int, default=3, help="이만큼 불일치가 나오면 멈춤")
+    parser.add_argument('--replay', metavar='CASE', help="출력된 사례 하나를 다시 비교")
+    args = parser.parse_args()
+
+    if args.replay:
+        case = ast.literal_eval(args.replay)
+        ai = AIPlayer()
+        print("불일치" if is_mismatch(case, ai) else "일치")
+        print(describe_case(case, ai))
+        return
+
+    checks = {name: CHECKS[name] for name in args.checks}
+    start = time.time()
+    stats, failures = fuzz(args.positions, args.seed, args.kinds, checks, args.max_failures)
+    print("국면 {}개, {:.1f}초 (seed {})".format(args.positions, time.time() - start, args.seed))
+    print("{:<12} {:>10} {:>14} {:>14} {:>8}".format("판정", "사례", "빠른 구현/초", "기준 구현/초", "배율"))
+    for name, stat in stats.items():
+        fast_rate = rate(stat['cases'], stat['fast_time'])
+        reference_rate = rate(stat['cases'], stat['reference_time'])
+        print("{:<12} {:>10} {:>14.0f} {:>14.0f} {:>7.1f}x".format(
+            name, stat['cases'], fast_rate, reference_rate, fast_rate / reference_rate))
+
+    if not failures:
+        print("불일치 없음")
+        return
+    ai = AIPlayer()
+    for case in failures:
+        print("\n최소 불일치 사례 (돌 {}개):".format(len(case[3])))
+        print(describe_case(case, ai, checks))
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,18 +4,48 @@
 3D 오목 게임 - 핵심 게임 로직
 """
 
+import os
 import pygame
 import numpy as np
 import sys
 import math
 from board import Board
+from rules import RULE_STANDARD, has_forbidden_moves
+from sparse_board import SparseBoard, SPARSE_BOARD_CELLS
+from board3d import Board3D
 from ai_player import AIPlayer
+from solver import ProofSolver
+from transposition import PersistentTranspositionTable
+from viewport import Viewport
+from hints import HintMap
+from timeline import Timeline
+from clock import GameClock, TimeManager
+from game_record import GameRecord, GameRecordStore, RESULT_DRAW
 
 class OmokGame:
     """3D 오목 게임 클래스"""
     
-    def __init__(self):
-        """게임 초기화"""
+    # 이보다 칸이 많은 보드는 희소 보드로 만든다
+    SPARSE_BOARD_CELLS = SPARSE_BOARD_CELLS
+    
+    # 3D 보드에서 어려운 AI의 탐색 깊이 (후보 수가 평면보다 훨씬 많음)
+    SEARCH_DEPTH_3D = 1
+    
+    # 3D 보드 오른쪽의 층 미리보기 영역 너비
+    LAYER_PANEL_WIDTH = 360
+    
+    # 방향키 화면 이동 (칸 단위 방향)
+    PAN_KEYS = {
+        pygame.K_LEFT: (-1, 0),
+        pygame.K_RIGHT: (1, 0),
+        pygame.K_UP: (0, -1),
+        pygame.K_DOWN: (0, 1),
+    }
+    
+    def __init__(self, record_path=None, rows=15, cols=15, layers=None, rule=RULE_STANDARD,
+                 time_control=None):
+        """게임 초기화 (record_path를 주면 끝난 게임을 기보 저장소에 기록, layers를 주면 3D 보드, rule은 승리/금수 규칙,
+        time_control (clock.TimeControl) 을 주면 대국 시계 사용)"""
         # 화면 설정
         self.WIDTH = 1400
         self.HEIGHT = 900
@@ -89,31 +119,79 @@ class OmokGame:
             self.large_font = pygame.font.Font(None, 48)
         
         # 게임 상태
-        self.board = Board(15, 15)  # 15x15 오목판
+        self.rows = rows
+        self.cols = cols
+        self.layers = layers
+        self.rule = rule
+        if layers:
+            self.rows = self.cols = layers
+        self.board = self.create_board()  # 기본 15x15 오목판
+        self.layer = layers // 2 if layers else 0  # 3D 보드에서 화면에 보이는 층
         self.current_player = 1  # 1: 흑돌, 2: 백돌
         self.game_mode = "2p"  # "2p": 2인용, "ai": AI 대전
         self.game_over = False
         self.winner = None
         self.last_move = None
         
+        # 이번 판의 수순 (무르기/다시 두기와 타임라인 막대로 이동, 무른 수는 새 수를 둘 때까지 남음)
+        self.timeline = Timeline(self.board)
+        self.scrubbing = False
+        self.recorded = False
+        
+        # 대국 시계 (시간 규칙이 없으면 None) 와 AI의 수마다 시간 배분
+        self.time_control = time_control
+        self.clock = GameClock(time_control) if time_control else None
+        self.time_manager = TimeManager()
+        if self.clock:
+            self.clock.start(1)
+        
+        # 후보 칸 힌트 (T로 켜고 끔, 점수는 켜져 있는 동안 돌을 놓을 때마다 증분 갱신)
+        self.show_hints = False
+        self.hint_map = None
+        
+        # 기보 저장소
+        self.record_store = GameRecordStore(record_path) if record_path else None
+        
         # AI 플레이어
         self.ai_player = AIPlayer()
+        if record_path:
+            # tune.py로 조정한 라인 점수가 있으면 사용
+            weights_path = os.path.join(record_path, 'weights.json')
+            if os.path.exists(weights_path):
+                self.ai_player.load_weights(weights_path)
+            # 끝내기 해결기가 증명한 결과는 기보 저장소 옆에 두고 다음 실행에서 다시 씀
+            self.ai_player.solver = ProofSolver(os.path.join(record_path, 'solver_results.bin'),
+                                                node_budget=AIPlayer.SOLVER_NODE_BUDGET)
+            # 탐색 치환표도 파일에 매핑해 다음 판과 다음 실행에서 이어 씀 (규칙마다 점수가 다르므로 파일 분리)
+            self.ai_player.transposition_table = PersistentTranspositionTable(
+                os.path.join(record_path, 'search_cache_{}.bin'.format(self.rule)),
+                tag=self.ai_player.weights_tag())
         self.ai_difficulty = "medium"  # easy, medium, hard
+        if layers:
+            self.ai_player.search_depth = self.SEARCH_DEPTH_3D
         
         # 3D 효과를 위한 설정
-        self.board_offset_x = 150
-        self.board_offset_y = 150
-        self.cell_size = 40
-        self.stone_radius = 18
         self.board_depth = 15  # 보드 두께
         
-        # 클릭 감지 영역
-        self.board_rect = pygame.Rect(
-            self.board_offset_x, 
-            self.board_offset_y, 
-            self.board.cols * self.cell_size, 
-            self.board.rows * self.cell_size
-        )
+        # 보드를 비추는 뷰포트 (15x15 기본 보드는 예전과 같은 위치/크기로 보임)
+        viewport_width = self.WIDTH - 200 - (self.LAYER_PANEL_WIDTH if layers else 0)
+        self.viewport = Viewport((150, 150, viewport_width, self.HEIGHT - 200), 40)
+        self.reset_view()
+        self.dragging = False
+        
+        # 매 프레임 다시 그릴 필요 없는 화면 캐시
+        self.background_surface = None
+        self.texture_surface = None
+        self.ui_panel_surface = None
+        self.layer_panel_surface = None
+        self.layer_panel_key = None
+        self.hint_surface = None
+        self.hint_origin = (0, 0)
+        self.hint_key = None
+        self.scrubber_surface = None
+        self.scrubber_key = None
+        # 층 미리보기에서 다시 그릴 칸 (수가 바뀐 칸만)
+        self.layer_panel_dirty = set()
         
         # 애니메이션 효과
         self.animation_timer = 0
@@ -136,6 +214,24 @@ class OmokGame:
         self.board_border_width = 20
         self.board_border_depth = 10
     
+    def create_board(self):
+        """보드 생성 (큰 보드는 희소 보드 사용)"""
+        if self.layers:
+            return Board3D(self.layers, self.rule)
+        if self.rows * self.cols > self.SPARSE_BOARD_CELLS:
+            return SparseBoard(self.rows, self.cols, self.rule)
+        return Board(self.rows, self.cols, self.rule)
+    
+    @property
+    def cell_size(self):
+        """현재 확대 배율의 칸 크기"""
+        return self.viewport.cell_size
+    
+    @property
+    def stone_radius(self):
+        """현재 확대 배율의 돌 반지름"""
+        return max(2, int(self.viewport.cell_size * 0.45))
+    
     def run(self):
         """게임 메인 루프"""
         clock = pygame.time.Clock()
@@ -148,15 +244,35 @@ class OmokGame:
                 elif event.type == pygame.KEYDOWN:
                     self.handle_keydown(event.key)
                 elif event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_mouse_click(event.pos)
+                    if event.button == 1:
+                        self.handle_mouse_click(event.pos)
+                    elif event.button in (2, 3):
+                        self.dragging = True
+                elif event.type == pygame.MOUSEBUTTONUP:
+                    if event.button == 1:
+                        self.scrubbing = False
+                    elif event.button in (2, 3):
+                        self.dragging = False
+                elif event.type == pygame.MOUSEWHEEL:
+                    self.viewport.zoom_at(1.1 ** event.y, *self.mouse_pos)
+                    self.update_hover_cell(self.mouse_pos)
                 elif event.type == pygame.MOUSEMOTION:
+                    if self.dragging:
+                        self.viewport.pan(-event.rel[0], -event.rel[1])
+                    if self.scrubbing:
+                        self.seek(self.get_scrubber_ply(event.pos[0]))
                     self.mouse_pos = event.pos
                     self.update_hover_cell(event.pos)
             
-            # AI 턴 처리
+            # 시간을 다 쓴 쪽이 있으면 상대 승리
+            if self.clock and not self.game_over and self.clock.check() is not None:
+                self.end_on_time()
+            
+            # AI 턴 처리 (지난 국면을 보는 중이면 두지 않음)
             if (self.game_mode == "ai" and 
                 self.current_player == 2 and 
-                not self.game_over):
+                not self.game_over and
+                self.timeline.at_end()):
                 self.ai_turn()
             
             # 애니메이션 업데이트
@@ -168,18 +284,24 @@ class OmokGame:
             pygame.display.flip()
             clock.tick(60)
     
+    def to_board_move(self, x, y):
+        """화면 칸 좌표를 보드 좌표로 변환 (3D 보드는 현재 층을 붙임)"""
+        if self.layers:
+            return x, y, self.layer
+        return x, y
+    
+    def set_layer(self, layer):
+        """화면에 보일 층 변경"""
+        if self.layers and 0 <= layer < self.layers and layer != self.layer:
+            self.layer = layer
+            self.stone_animations = []
+            self.update_hover_cell(self.mouse_pos)
+    
     def update_hover_cell(self, pos):
         """마우스 호버 셀 업데이트"""
-        if self.board_rect.collidepoint(pos):
-            board_x = (pos[0] - self.board_offset_x) // self.cell_size
-            board_y = (pos[1] - self.board_offset_y) // self.cell_size
-            
-            if (0 <= board_x < self.board.cols and 
-                0 <= board_y < self.board.rows and
-                self.board.board[board_y][board_x] == 0):
-                self.hover_cell = (board_x, board_y)
-            else:
-                self.hover_cell = None
+        cell = self.viewport.screen_to_cell(*pos)
+        if cell and self.board.is_valid_move(*self.to_board_move(*cell)):
+            self.hover_cell = cell
         else:
             self.hover_cell = None
     
@@ -216,9 +338,41 @@ class OmokGame:
         elif key == pygame.K_h:
             self.ai_difficulty = "hard"
             self.ai_player.set_difficulty("hard")
+        elif key in self.PAN_KEYS:
+            dx, dy = self.PAN_KEYS[key]
+            self.viewport.pan(dx * self.cell_size * 3, dy * self.cell_size * 3)
+        elif key == pygame.K_c:
+            self.reset_view()
+        elif key == pygame.K_PAGEUP:
+            self.set_layer(self.layer + 1)
+        elif key == pygame.K_PAGEDOWN:
+            self.set_layer(self.layer - 1)
+        elif key == pygame.K_t:
+            self.show_hints = not self.show_hints
+        elif key == pygame.K_z:
+            self.undo()
+        elif key == pygame.K_y:
+            self.redo()
+        elif key == pygame.K_HOME:
+            self.seek(0)
+        elif key == pygame.K_END:
+            self.seek(len(self.timeline))
     
     def handle_mouse_click(self, pos):
         """마우스 클릭 처리"""
+        # 타임라인 막대를 누르면 그 수로 이동하고, 버튼을 놓을 때까지 끌면서 이동
+        if self.timeline and self.get_scrubber_rect().collidepoint(pos):
+            self.scrubbing = True
+            self.seek(self.get_scrubber_ply(pos[0]))
+            return
+        
+        # 3D 보드의 층 미리보기를 누르면 그 층으로 이동
+        if self.layers:
+            layer = self.get_layer_at(pos)
+            if layer is not None:
+                self.set_layer(layer)
+                return
+        
         if self.game_over:
             return
         
@@ -226,96 +380,214 @@ class OmokGame:
         if self.game_mode == "ai" and self.current_player == 2:
             return
         
-        # 보드 영역 클릭 확인
-        if self.board_rect.collidepoint(pos):
-            # 클릭 위치를 보드 좌표로 변환
-            board_x = (pos[0] - self.board_offset_x) // self.cell_size
-            board_y = (pos[1] - self.board_offset_y) // self.cell_size
+        # 클릭 위치를 뷰포트 변환으로 보드 좌표로 변환
+        cell = self.viewport.screen_to_cell(*pos)
+        if cell and self.board.is_valid_move(*self.to_board_move(*cell)):
+            self.make_move(*self.to_board_move(*cell))
+    
+    def is_forbidden_move(self, *move):
+        """현재 플레이어가 둘 수 없는 금수 자리인지"""
+        return has_forbidden_moves(self.rule, self.current_player) and self.board.is_forbidden(*move)
+    
+    def make_move(self, *move):
+        """돌을 놓는 함수 (move는 (x, y), 3D 보드는 (x, y, z))"""
+        if self.board.is_valid_move(*move) and not self.is_forbidden_move(*move):
+            # 두기 전에 시간을 다 썼으면 그 수는 두지 않고 시간패
+            if self.clock:
+                self.clock.press()
+                if self.clock.flagged is not None:
+                    self.end_on_time()
+                    return
+            self.timeline.play(move)
+            self.update_hints([move], [])
+            self.invalidate_cells((move, self.last_move))
+            self.last_move = move
             
-            # 유효한 좌표인지 확인
-            if (0 <= board_x < self.board.cols and 
-                0 <= board_y < self.board.rows):
-                self.make_move(board_x, board_y)
-    
-    def make_move(self, x, y):
-        """돌을 놓는 함수"""
-        if self.board.is_valid_move(x, y):
-            self.board.place_stone(x, y, self.current_player)
-            self.last_move = (x, y)
+            # 3D 보드는 방금 둔 수가 있는 층을 보여줌
+            if self.layers:
+                self.set_layer(move[2])
             
             # 돌 놓기 애니메이션 추가
-            self.stone_animations.append((x, y, self.current_player, 0.0))
+            self.stone_animations.append((move[0], move[1], self.current_player, 0.0))
             
             # 승리 확인
-            if self.board.check_win(x, y, self.current_player):
-                self.game_over = True
-                self.winner = self.current_player
-                self.show_win_line = True
-                self.win_line_points = self.get_win_line_points(x, y, self.current_player)
+            if self.update_result(move, self.current_player):
+                self.save_record()
             else:
                 # 플레이어 전환
                 self.current_player = 3 - self.current_player  # 1 -> 2, 2 -> 1
+                self.update_clock()
     
-    def get_win_line_points(self, x, y, player):
-        """승리 라인의 점들을 찾는 함수"""
-        directions = [(1, 0), (0, 1), (1, 1), (1, -1)]
+    def update_result(self, move, player):
+        """player가 move를 둔 뒤 승리/무승부 판정 (끝났으면 True)"""
+        if self.board.check_win(*move, player):
+            self.game_over = True
+            self.winner = player
+            self.show_win_line = True
+            self.win_line_points = self.get_win_line_points(move, player)
+        elif self.board.is_full() or self.board.is_dead():
+            # 양쪽 모두 이길 수 있는 5칸 창이 남지 않으면 보드가 차기 전에 무승부
+            self.game_over = True
+            self.winner = None
+        return self.game_over
+    
+    def seek(self, ply):
+        """수순의 ply수 뒤 국면으로 이동 (바뀐 칸만 힌트와 층 미리보기에 반영)"""
+        ply = max(0, min(ply, len(self.timeline)))
+        if ply == self.timeline.ply:
+            return
+        previous = self.last_move
+        placed, removed = self.timeline.seek(ply)
+        self.board = self.timeline.board
+        self.update_hints(placed, removed)
+        self.last_move = self.timeline.last_move()
+        self.invalidate_cells(placed + removed + [previous, self.last_move])
+        self.stone_animations = []
         
-        for dx, dy in directions:
-            count = 1
-            points = [(x, y)]
-            
-            # 정방향 확인
-            temp_x, temp_y = x + dx, y + dy
-            while (0 <= temp_x < self.board.cols and 
-                   0 <= temp_y < self.board.rows and 
-                   self.board.board[temp_y][temp_x] == player):
-                count += 1
-                points.append((temp_x, temp_y))
-                temp_x += dx
-                temp_y += dy
+        self.current_player = self.timeline.player_to_move()
+        self.game_over = False
+        self.winner = None
+        self.show_win_line = False
+        self.win_line_points = []
+        if self.last_move is not None and self.update_result(self.last_move, 3 - self.current_player):
+            # 끝난 국면은 make_move처럼 마지막에 둔 쪽 차례로 둠
+            self.current_player = 3 - self.current_player
+        self.update_clock()
+        self.update_hover_cell(self.mouse_pos)
+    
+    def undo(self):
+        """한 수 무르기 (AI 대전에서는 사람(흑) 차례까지)"""
+        ply = self.timeline.ply - 1
+        if self.game_mode == "ai":
+            ply -= ply % 2
+        self.seek(ply)
+    
+    def redo(self):
+        """무른 수 다시 두기 (AI 대전에서는 다음 사람(흑) 차례까지)"""
+        ply = self.timeline.ply + 1
+        if self.game_mode == "ai":
+            ply += ply % 2
+        self.seek(ply)
+    
+    def update_clock(self):
+        """보고 있는 국면에서 둘 차례의 시계만 가게 함 (끝난 판과 AI가 두지 않는 지난 국면에서는 멈춤)"""
+        if self.clock is None:
+            return
+        if self.clock.flagged is not None:
+            # 시간패는 무르거나 다시 두어도 그대로
+            self.game_over = True
+            self.winner = 3 - self.clock.flagged
+        elif self.game_over or (self.game_mode == "ai" and self.current_player == 2 and
+                                not self.timeline.at_end()):
+            self.clock.pause()
+        else:
+            self.clock.start(self.current_player)
+    
+    def end_on_time(self):
+        """시간을 다 쓴 쪽의 패배로 게임 종료"""
+        self.game_over = True
+        self.winner = 3 - self.clock.flagged
+        self.save_record()
+    
+    def update_hints(self, placed, removed):
+        """바뀐 칸을 힌트 점수에 반영 (힌트를 끈 동안은 버렸다가 켤 때 다시 만듦)"""
+        if not self.show_hints:
+            self.hint_map = None
+        elif self.hint_map is not None:
+            self.hint_map.apply_changes(self.board, placed, removed)
+    
+    def invalidate_cells(self, cells):
+        """돌이나 마지막 수 표시가 바뀐 칸을 층 미리보기에서 다시 그리도록 표시"""
+        if self.layers:
+            self.layer_panel_dirty.update(cell for cell in cells if cell is not None)
+    
+    def get_win_line_points(self, move, player):
+        """승리 라인의 점들을 찾는 함수 (보드의 라인 방향을 모두 확인)"""
+        for direction in self.board.directions:
+            points = [move]
             
-            # 역방향 확인
-            temp_x, temp_y = x - dx, y - dy
-            while (0 <= temp_x < self.board.cols and 
-                   0 <= temp_y < self.board.rows and 
-                   self.board.board[temp_y][temp_x] == player):
-                count += 1
-                points.append((temp_x, temp_y))
-                temp_x -= dx
-                temp_y -= dy
+            # 정방향과 역방향 확인
+            for sign in (1, -1):
+                point = tuple(p + sign * d for p, d in zip(move, direction))
+                while (self.board.in_bounds(*point) and 
+                       self.board.get(*point) == player):
+                    points.append(point)
+                    point = tuple(p + sign * d for p, d in zip(point, direction))
             
-            if count >= 5:
+            if len(points) >= 5:
                 return points
         
         return []
     
+    def save_record(self):
+        """끝난 게임을 기보 저장소에 기록"""
+        self.ai_player.solver.save()
+        if isinstance(self.ai_player.transposition_table, PersistentTranspositionTable):
+            self.ai_player.transposition_table.flush()
+        # 기보 형식은 평면 보드와 한 변 65535칸까지만 지원 (무르고 다시 끝내도 한 판은 처음 끝난 수순으로 한 번만 기록)
+        if (self.record_store is None or self.recorded or not self.timeline.ply or self.layers or
+                not GameRecord.can_record(self.board.rows, self.board.cols)):
+            return
+        record = GameRecord(self.board.rows, self.board.cols, self.timeline.get_moves(),
+                            self.winner if self.winner else RESULT_DRAW, self.rule)
+        self.record_store.append(record)
+        self.recorded = True
+    
     def ai_turn(self):
         """AI 턴 처리"""
-        # AI가 최선의 수를 계산
-        best_move = self.ai_player.get_best_move(self.board, 2)
+        # AI가 최선의 수를 계산 (시계가 있으면 남은 시간에서 이번 수에 쓸 시간을 정함)
+        time_limits = None
+        if self.clock:
+            time_limits = self.time_manager.allocate(self.clock, 2, self.timeline.ply // 2)
+        best_move = self.ai_player.get_best_move(self.board, 2, time_limits)
         if best_move:
-            x, y = best_move
-            self.make_move(x, y)
+            self.make_move(*best_move)
     
     def restart_game(self):
         """게임 재시작"""
-        self.board = Board(15, 15)
+        self.board = self.create_board()
+        self.hint_map = None
         self.current_player = 1
         self.game_over = False
         self.winner = None
         self.last_move = None
+        self.timeline = Timeline(self.board)
+        self.scrubbing = False
+        self.recorded = False
+        if self.time_control:
+            self.clock = GameClock(self.time_control)
+            self.clock.start(1)
+        self.layer_panel_surface = None
         self.show_win_line = False
         self.win_line_points = []
         self.stone_animations = []
         self.hover_cell = None
+        if self.layers:
+            self.layer = self.layers // 2
+        self.reset_view()
+    
+    def reset_view(self):
+        """마지막 수 (없으면 보드 가운데) 가 화면 가운데 오도록 옮기고 보드 밖은 보이지 않게 맞춤"""
+        self.viewport.center_on(*(self.last_move or self.board.center())[:2])
+        if self.board.rows is not None:
+            self.viewport.clamp(self.board.cols, self.board.rows)
     
     def draw(self):
         """화면 그리기"""
         # 배경 그라데이션 그리기
         self.draw_background_gradient()
         
-        # 3D 보드 그리기
-        self.draw_3d_board()
+        # 3D 보드 그리기 (뷰포트 영역 밖은 잘라냄)
+        board_rect = self.get_board_screen_rect()
+        self.draw_3d_board(board_rect)
+        
+        viewport = self.viewport
+        self.screen.set_clip(pygame.Rect(viewport.screen_x, viewport.screen_y,
+                                         viewport.width, viewport.height))
+        
+        # 후보 칸 힌트 (돌 아래에 깔림)
+        if self.show_hints and not self.game_over:
+            self.draw_hints()
         
         # 돌 그리기
         self.draw_stones()
@@ -327,50 +599,79 @@ class OmokGame:
         if self.show_win_line and self.win_line_points:
             self.draw_win_line()
         
+        self.screen.set_clip(None)
+        
+        # 3D 보드의 층 미리보기
+        if self.layers:
+            self.draw_layer_panel()
+        
         # UI 그리기
         self.draw_ui()
         
+        # 수순 타임라인 막대
+        if self.timeline:
+            self.draw_scrubber()
+        
         # 게임 상태 메시지 그리기
         self.draw_status()
     
+    def get_board_screen_rect(self):
+        """화면에 보이는 보드 영역 (뷰포트 영역과 보드 범위의 교집합)"""
+        viewport = self.viewport
+        area = pygame.Rect(viewport.screen_x, viewport.screen_y,
+                           viewport.width, viewport.height)
+        if self.board.rows is None:
+            return area
+        left, top = viewport.cell_to_screen(0, 0)
+        right, bottom = viewport.cell_to_screen(self.board.cols, self.board.rows)
+        return area.clip(pygame.Rect(left, top, right - left, bottom - top))
+    
     def draw_background_gradient(self):
-        """배경 그라데이션 그리기"""
-        for y in range(self.HEIGHT):
-            # 위에서 아래로 갈수록 어두워지는 그라데이션
-            ratio = y / self.HEIGHT
-            r = int(205 * (1 - ratio * 0.3))
-            g = int(133 * (1 - ratio * 0.3))
-            b = int(63 * (1 - ratio * 0.3))
-            pygame.draw.line(self.screen, (r, g, b), (0, y), (self.WIDTH, y))
-    
-    def draw_3d_board(self):
+        """배경 그라데이션 그리기 (한 번 그린 화면을 재사용)"""
+        if self.background_surface is None:
+            self.background_surface = pygame.Surface((self.WIDTH, self.HEIGHT))
+            for y in range(self.HEIGHT):
+                # 위에서 아래로 갈수록 어두워지는 그라데이션
+                ratio = y / self.HEIGHT
+                r = int(205 * (1 - ratio * 0.3))
+                g = int(133 * (1 - ratio * 0.3))
+                b = int(63 * (1 - ratio * 0.3))
+                pygame.draw.line(self.background_surface, (r, g, b), (0, y), (self.WIDTH, y))
+        self.screen.blit(self.background_surface, (0, 0))
+    
+    def draw_3d_board(self, board_rect):
         """3D 효과가 있는 보드 그리기"""
+        if board_rect.width <= 0 or board_rect.height <= 0:
+            return
+        
         # 보드 테두리 3D 효과 (입체감)
-        self.draw_board_border_3d()
+        self.draw_board_border_3d(board_rect)
         
         # 보드 배경 (나무 질감)
-        self.draw_board_texture()
+        self.draw_board_texture(board_rect)
         
         # 격자 그리기 (3D 효과)
-        self.draw_grid_3d()
+        self.draw_grid_3d(board_rect)
         
         # 중앙점 표시
-        center_x = self.board_offset_x + (self.board.cols // 2) * self.cell_size
-        center_y = self.board_offset_y + (self.board.rows // 2) * self.cell_size
-        pygame.draw.circle(self.screen, self.BLACK, (center_x, center_y), 4)
+        if self.board.rows is not None:
+            center_x, center_y = self.viewport.cell_to_screen(self.board.cols // 2,
+                                                              self.board.rows // 2)
+            if board_rect.collidepoint(center_x, center_y):
+                pygame.draw.circle(self.screen, self.BLACK, (center_x, center_y), 4)
     
-    def draw_board_border_3d(self):
-        """보드 테두리 3D 효과"""
-        board_width = self.board.cols * self.cell_size
-        board_height = self.board.rows * self.cell_size
+    def draw_board_border_3d(self, board_rect):
+        """보드 테두리 3D 효과 (보이는 보드 영역 둘레)"""
+        board_offset_x, board_offset_y = board_rect.topleft
+        board_width, board_height = board_rect.size
         
         # 왼쪽 테두리 (그림자)
         for i in range(self.board_border_depth):
             color_intensity = max(0, min(255, 255 - (i * 20)))
             color = (color_intensity, color_intensity, color_intensity)
             pygame.draw.rect(self.screen, color, (
-                self.board_offset_x - self.board_border_width + i,
-                self.board_offset_y - self.board_border_width + i,
+                board_offset_x - self.board_border_width + i,
+                board_offset_y - self.board_border_width + i,
                 self.board_border_width - i,
                 board_height + self.board_border_width * 2 - i * 2
             ))
@@ -380,8 +681,8 @@ class OmokGame:
             color_intensity = max(0, min(255, 255 - (i * 20)))
             color = (color_intensity, color_intensity, color_intensity)
             pygame.draw.rect(self.screen, color, (
-                self.board_offset_x - self.board_border_width + i,
-                self.board_offset_y - self.board_border_width + i,
+                board_offset_x - self.board_border_width + i,
+                board_offset_y - self.board_border_width + i,
                 board_width + self.board_border_width * 2 - i * 2,
                 self.board_border_width - i
             ))
@@ -391,8 +692,8 @@ class OmokGame:
             color_intensity = max(0, min(255, 200 + (i * 10)))
             color = (color_intensity, color_intensity, color_intensity)
             pygame.draw.rect(self.screen, color, (
-                self.board_offset_x + board_width + i,
-                self.board_offset_y - self.board_border_width + i,
+                board_offset_x + board_width + i,
+                board_offset_y - self.board_border_width + i,
                 self.board_border_width - i,
                 board_height + self.board_border_width * 2 - i * 2
             ))
@@ -402,92 +703,141 @@ class OmokGame:
             color_intensity = max(0, min(255, 200 + (i * 10)))
             color = (color_intensity, color_intensity, color_intensity)
             pygame.draw.rect(self.screen, color, (
-                self.board_offset_x - self.board_border_width + i,
-                self.board_offset_y + board_height + i,
+                board_offset_x - self.board_border_width + i,
+                board_offset_y + board_height + i,
                 board_width + self.board_border_width * 2 - i * 2,
                 self.board_border_width - i
             ))
     
-    def draw_board_texture(self):
-        """보드 나무 질감 그리기"""
-        board_rect = pygame.Rect(
-            self.board_offset_x,
-            self.board_offset_y,
-            self.board.cols * self.cell_size,
-            self.board.rows * self.cell_size
-        )
-        
+    def draw_board_texture(self, board_rect):
+        """보드 나무 질감 그리기 (미리 그린 무늬를 보이는 영역만큼 복사)"""
         # 기본 나무 색상
         pygame.draw.rect(self.screen, self.WOOD_MEDIUM, board_rect)
         
-        # 나무 질감 효과 (작은 사각형들)
-        for y in range(0, self.board.rows * self.cell_size, 8):
-            for x in range(0, self.board.cols * self.cell_size, 8):
-                if (x + y) % 16 == 0:
-                    pygame.draw.rect(self.screen, self.WOOD_DARK, (
-                        self.board_offset_x + x,
-                        self.board_offset_y + y,
-                        4, 4
-                    ))
-                elif (x + y) % 16 == 8:
-                    pygame.draw.rect(self.screen, self.WOOD_HIGHLIGHT, (
-                        self.board_offset_x + x,
-                        self.board_offset_y + y,
-                        4, 4
-                    ))
-    
-    def draw_grid_3d(self):
-        """3D 격자 그리기"""
-        for i in range(self.board.rows + 1):
+        # 나무 질감 효과 (작은 사각형들, 16픽셀마다 반복되는 무늬)
+        if self.texture_surface is None:
+            width, height = self.viewport.width + 16, self.viewport.height + 16
+            self.texture_surface = pygame.Surface((width, height))
+            self.texture_surface.fill(self.WOOD_MEDIUM)
+            for y in range(0, height, 8):
+                for x in range(0, width, 8):
+                    if (x + y) % 16 == 0:
+                        pygame.draw.rect(self.texture_surface, self.WOOD_DARK, (x, y, 4, 4))
+                    elif (x + y) % 16 == 8:
+                        pygame.draw.rect(self.texture_surface, self.WOOD_HIGHLIGHT, (x, y, 4, 4))
+        
+        # 무늬가 보드와 함께 움직이도록 보드 원점 기준으로 위상 맞춤
+        origin_x, origin_y = self.viewport.cell_to_screen(0, 0)
+        phase_x = (board_rect.x - origin_x) % 16
+        phase_y = (board_rect.y - origin_y) % 16
+        self.screen.blit(self.texture_surface, board_rect.topleft,
+                         (phase_x, phase_y, board_rect.width, board_rect.height))
+    
+    def draw_grid_3d(self, board_rect):
+        """3D 격자 그리기 (보이는 선만)"""
+        x0, y0, x1, y1 = self.viewport.visible_cells(self.board.cols, self.board.rows)
+        shadow_offset = 2
+        
+        for i in range(y0, y1 + 1):
+            _, line_y = self.viewport.cell_to_screen(0, i)
+            if not board_rect.top <= line_y <= board_rect.bottom:
+                continue
             # 가로선 (그림자 효과)
-            shadow_offset = 2
-            start_pos_shadow = (self.board_offset_x + shadow_offset, 
-                              self.board_offset_y + i * self.cell_size + shadow_offset)
-            end_pos_shadow = (self.board_offset_x + self.board.cols * self.cell_size + shadow_offset, 
-                            self.board_offset_y + i * self.cell_size + shadow_offset)
-            pygame.draw.line(self.screen, self.DARK_GRAY, start_pos_shadow, end_pos_shadow, 3)
-            
+            pygame.draw.line(self.screen, self.DARK_GRAY,
+                             (board_rect.left + shadow_offset, line_y + shadow_offset),
+                             (board_rect.right + shadow_offset, line_y + shadow_offset), 3)
             # 가로선 (메인)
-            start_pos = (self.board_offset_x, self.board_offset_y + i * self.cell_size)
-            end_pos = (self.board_offset_x + self.board.cols * self.cell_size, 
-                      self.board_offset_y + i * self.cell_size)
-            pygame.draw.line(self.screen, self.BLACK, start_pos, end_pos, 2)
-            
+            pygame.draw.line(self.screen, self.BLACK,
+                             (board_rect.left, line_y), (board_rect.right, line_y), 2)
+        
+        for i in range(x0, x1 + 1):
+            line_x, _ = self.viewport.cell_to_screen(i, 0)
+            if not board_rect.left <= line_x <= board_rect.right:
+                continue
             # 세로선 (그림자 효과)
-            start_pos_shadow = (self.board_offset_x + i * self.cell_size + shadow_offset, 
-                              self.board_offset_y + shadow_offset)
-            end_pos_shadow = (self.board_offset_x + i * self.cell_size + shadow_offset, 
-                            self.board_offset_y + self.board.rows * self.cell_size + shadow_offset)
-            pygame.draw.line(self.screen, self.DARK_GRAY, start_pos_shadow, end_pos_shadow, 3)
-            
+            pygame.draw.line(self.screen, self.DARK_GRAY,
+                             (line_x + shadow_offset, board_rect.top + shadow_offset),
+                             (line_x + shadow_offset, board_rect.bottom + shadow_offset), 3)
             # 세로선 (메인)
-            start_pos = (self.board_offset_x + i * self.cell_size, self.board_offset_y)
-            end_pos = (self.board_offset_x + i * self.cell_size, 
-                      self.board_offset_y + self.board.rows * self.cell_size)
-            pygame.draw.line(self.screen, self.BLACK, start_pos, end_pos, 2)
+            pygame.draw.line(self.screen, self.BLACK,
+                             (line_x, board_rect.top), (line_x, board_rect.bottom), 2)
     
     def draw_stones(self):
-        """돌 그리기 (3D 효과)"""
-        for y in range(self.board.rows):
-            for x in range(self.board.cols):
-                if self.board.board[y][x] != 0:
-                    self.draw_stone_3d(x, y, self.board.board[y][x])
+        """돌 그리기 (3D 효과, 보이는 돌만)"""
+        if self.layers:
+            self.draw_neighbor_layer_stones()
+        
+        for (x, y), player in self.get_visible_stones():
+            self.draw_stone_3d(x, y, player)
         
         # 애니메이션 중인 돌들 그리기
         for x, y, player, progress in self.stone_animations:
             self.draw_stone_3d_animated(x, y, player, progress)
     
+    def draw_hints(self):
+        """후보 칸을 공격(빨강)/수비(파랑) 점수로 칠하기
+
+        점수나 화면이 바뀔 때만 후보 칸을 감싸는 영역을 칸당 한 화소 이미지로 만들어 칸 크기로 늘리고,
+        그 밖의 프레임은 만들어 둔 표면을 붙이기만 한다.
+        """
+        viewport = self.viewport
+        if self.hint_map is None:
+            self.hint_map = HintMap(self.board)
+            self.hint_key = None
+        key = (self.hint_map.version, viewport.version, self.layer, self.current_player)
+        if key != self.hint_key:
+            self.hint_key = key
+            self.hint_surface = None
+            x0, y0, x1, y1 = viewport.visible_cells(self.board.cols, self.board.rows)
+            hints = [(cell, attack, defense)
+                     for cell, (attack, defense) in self.hint_map.get_hints(self.current_player).items()
+                     if x0 <= cell[0] < x1 and y0 <= cell[1] < y1
+                     and (not self.layers or cell[2] == self.layer) and attack + defense]
+            if hints:
+                xs = np.array([cell[0] for cell, _, _ in hints])
+                ys = np.array([cell[1] for cell, _, _ in hints])
+                attack = np.array([a for _, a, _ in hints], dtype=float)
+                defense = np.array([d for _, _, d in hints], dtype=float)
+                left, top = xs.min(), ys.min()
+                # 정렬 점수 (공격 두 배 + 수비) 가 가장 큰 칸이 가장 진하게
+                value = 2 * attack + defense
+                share = 2 * attack / value
+                image = np.zeros((ys.max() - top + 1, xs.max() - left + 1, 4), dtype=np.uint8)
+                image[ys - top, xs - left] = np.stack(
+                    [255 * share, np.full(len(hints), 60), 255 * (1 - share),
+                     40 + 160 * value / value.max()], axis=1)
+                self.hint_origin = viewport.cell_to_screen(left, top)
+                corner = viewport.cell_to_screen(xs.max() + 1, ys.max() + 1)
+                cells = pygame.image.frombuffer(image.tobytes(), image.shape[1::-1], 'RGBA')
+                self.hint_surface = pygame.transform.scale(
+                    cells.convert_alpha(), (corner[0] - self.hint_origin[0], corner[1] - self.hint_origin[1]))
+        if self.hint_surface is not None:
+            self.screen.blit(self.hint_surface, self.hint_origin)
+    
+    def get_visible_stones(self):
+        """화면에 보이는 돌 목록 [((x, y), 플레이어)]
+
+        보이는 칸 수와 놓인 돌 수 중 작은 쪽을 훑으므로 보드가 커져도 비용이 늘지 않는다.
+        """
+        x0, y0, x1, y1 = self.viewport.visible_cells(self.board.cols, self.board.rows)
+        stones = self.board.layer_stones[self.layer] if self.layers else self.board.stones
+        if (x1 - x0) * (y1 - y0) < len(stones):
+            return [((x, y), stones[(x, y)])
+                    for y in range(y0, y1) for x in range(x0, x1) if (x, y) in stones]
+        return [((x, y), player) for (x, y), player in stones.items()
+                if x0 <= x < x1 and y0 <= y < y1]
+    
     def draw_stone_3d(self, x, y, player):
         """3D 돌 그리기"""
-        stone_x = self.board_offset_x + x * self.cell_size + self.cell_size // 2
-        stone_y = self.board_offset_y + y * self.cell_size + self.cell_size // 2
+        stone_x, stone_y = self.viewport.cell_center(x, y)
+        scale = self.cell_size / 40  # 확대 배율에 맞춘 그림자/하이라이트 위치
         
         # 조명 효과 계산
         light_intensity = self.calculate_light_intensity(stone_x, stone_y)
         
         if player == 1:  # 흑돌
             # 그림자
-            shadow_offset = 3
+            shadow_offset = int(3 * scale)
             pygame.draw.circle(self.screen, self.STONE_BLACK_DARK, 
                              (stone_x + shadow_offset, stone_y + shadow_offset), 
                              self.stone_radius)
@@ -498,21 +848,21 @@ class OmokGame:
             
             # 하이라이트 (조명 효과)
             highlight_radius = int(self.stone_radius * 0.6)
-            highlight_x = stone_x - 4
-            highlight_y = stone_y - 4
+            highlight_x = stone_x - int(4 * scale)
+            highlight_y = stone_y - int(4 * scale)
             pygame.draw.circle(self.screen, self.STONE_BLACK_HIGHLIGHT, 
                              (highlight_x, highlight_y), highlight_radius)
             
             # 반사광
             reflection_radius = int(self.stone_radius * 0.3)
-            reflection_x = stone_x - 2
-            reflection_y = stone_y - 2
+            reflection_x = stone_x - int(2 * scale)
+            reflection_y = stone_y - int(2 * scale)
             pygame.draw.circle(self.screen, self.STONE_BLACK_LIGHT, 
                              (reflection_x, reflection_y), reflection_radius)
             
         else:  # 백돌
             # 그림자
-            shadow_offset = 3
+            shadow_offset = int(3 * scale)
             pygame.draw.circle(self.screen, self.STONE_WHITE_DARK, 
                              (stone_x + shadow_offset, stone_y + shadow_offset), 
                              self.stone_radius)
@@ -523,27 +873,26 @@ class OmokGame:
             
             # 하이라이트 (조명 효과)
             highlight_radius = int(self.stone_radius * 0.7)
-            highlight_x = stone_x - 3
-            highlight_y = stone_y - 3
+            highlight_x = stone_x - int(3 * scale)
+            highlight_y = stone_y - int(3 * scale)
             pygame.draw.circle(self.screen, self.STONE_WHITE_HIGHLIGHT, 
                              (highlight_x, highlight_y), highlight_radius)
             
             # 반사광
             reflection_radius = int(self.stone_radius * 0.4)
-            reflection_x = stone_x - 1
-            reflection_y = stone_y - 1
+            reflection_x = stone_x - int(1 * scale)
+            reflection_y = stone_y - int(1 * scale)
             pygame.draw.circle(self.screen, self.STONE_WHITE_LIGHT, 
                              (reflection_x, reflection_y), reflection_radius)
         
         # 마지막 돌 표시 (빨간 테두리)
-        if self.last_move == (x, y):
+        if self.last_move == self.to_board_move(x, y):
             pygame.draw.circle(self.screen, self.RED, (stone_x, stone_y), 
                              self.stone_radius + 2, 3)
     
     def draw_stone_3d_animated(self, x, y, player, progress):
         """애니메이션 중인 3D 돌 그리기"""
-        stone_x = self.board_offset_x + x * self.cell_size + self.cell_size // 2
-        stone_y = self.board_offset_y + y * self.cell_size + self.cell_size // 2
+        stone_x, stone_y = self.viewport.cell_center(x, y)
         
         # 애니메이션 효과 (위에서 떨어지는 효과)
         bounce_height = int(20 * (1 - progress))
@@ -570,9 +919,16 @@ class OmokGame:
     def draw_hover_effect(self):
         """호버 효과 그리기"""
         if self.hover_cell and not self.game_over:
-            x, y = self.hover_cell
-            hover_x = self.board_offset_x + x * self.cell_size + self.cell_size // 2
-            hover_y = self.board_offset_y + y * self.cell_size + self.cell_size // 2
+            hover_x, hover_y = self.viewport.cell_center(*self.hover_cell)
+            
+            # 금수 자리는 빨간 X 표시
+            if self.is_forbidden_move(*self.to_board_move(*self.hover_cell)):
+                size = self.stone_radius // 2
+                pygame.draw.line(self.screen, self.RED, (hover_x - size, hover_y - size),
+                                 (hover_x + size, hover_y + size), 3)
+                pygame.draw.line(self.screen, self.RED, (hover_x - size, hover_y + size),
+                                 (hover_x + size, hover_y - size), 3)
+                return
             
             # 호버 링 (깜빡이는 효과)
             alpha = abs(int(255 * (self.animation_timer % 30) / 30))
@@ -604,12 +960,16 @@ class OmokGame:
         # 애니메이션 효과
         alpha = abs(int(255 * (self.animation_timer % 60) / 60))
         
-        # 승리 라인 그리기 (3D 효과)
+        # 승리 라인 그리기 (3D 효과, 3D 보드는 현재 층의 점만)
         points = []
-        for x, y in self.win_line_points:
-            screen_x = self.board_offset_x + x * self.cell_size + self.cell_size // 2
-            screen_y = self.board_offset_y + y * self.cell_size + self.cell_size // 2
-            points.append((screen_x, screen_y))
+        for point in self.win_line_points:
+            if self.layers and point[2] != self.layer:
+                continue
+            points.append(self.viewport.cell_center(point[0], point[1]))
+        
+        # 층을 가로지르는 라인은 이 층에 한 점만 있으므로 고리로 표시
+        if len(points) == 1:
+            pygame.draw.circle(self.screen, self.GOLD, points[0], self.stone_radius + 4, 4)
         
         if len(points) >= 2:
             # 그림자 효과
@@ -623,13 +983,162 @@ class OmokGame:
             highlight_points = [(x - 1, y - 1) for x, y in points]
             pygame.draw.lines(self.screen, self.YELLOW, False, highlight_points, 2)
     
+    def draw_neighbor_layer_stones(self):
+        """위/아래 층의 돌을 작은 점으로 표시 (같은 (x, y) 위치)"""
+        radius = max(2, self.stone_radius // 4)
+        x0, y0, x1, y1 = self.viewport.visible_cells(self.board.cols, self.board.rows)
+        for layer, offset in ((self.layer - 1, -radius), (self.layer + 1, radius)):
+            if not 0 <= layer < self.layers:
+                continue
+            for (x, y), player in self.board.layer_stones[layer].items():
+                if x0 <= x < x1 and y0 <= y < y1:
+                    center_x, center_y = self.viewport.cell_center(x, y)
+                    color = self.STONE_BLACK_MEDIUM if player == 1 else self.STONE_WHITE_LIGHT
+                    pygame.draw.circle(self.screen, color,
+                                       (center_x + offset, center_y + offset), radius)
+    
+    def get_layer_rects(self):
+        """층 미리보기 칸들의 화면 영역 목록 (층 번호 순서)"""
+        columns = int(math.ceil(math.sqrt(self.layers)))
+        rows = int(math.ceil(self.layers / columns))
+        left = self.WIDTH - self.LAYER_PANEL_WIDTH - 20
+        top = 150
+        cell = self.layers * max(2, min(self.LAYER_PANEL_WIDTH // columns - 10,
+                                        (self.HEIGHT - 200) // rows - 26) // self.layers)
+        return [pygame.Rect(left + (i % columns) * (cell + 10),
+                            top + (i // columns) * (cell + 26), cell, cell)
+                for i in range(self.layers)]
+    
+    def get_layer_at(self, pos):
+        """화면 좌표가 가리키는 층 미리보기 번호 (없으면 None)"""
+        for layer, rect in enumerate(self.get_layer_rects()):
+            if rect.collidepoint(pos):
+                return layer
+        return None
+    
+    def draw_layer_panel(self):
+        """모든 층의 미리보기 그리기 (층이나 승리 표시가 바뀌면 전부, 수가 바뀌면 바뀐 칸만 다시 그림)"""
+        key = (self.layer, self.show_win_line)
+        if self.layer_panel_surface is None or self.layer_panel_key != key:
+            self.layer_panel_key = key
+            self.layer_panel_dirty.clear()
+            self.layer_panel_surface = pygame.Surface((self.WIDTH, self.HEIGHT), pygame.SRCALPHA)
+            surface = self.layer_panel_surface
+            
+            for layer, rect in enumerate(self.get_layer_rects()):
+                step = rect.width // self.layers
+                pygame.draw.rect(surface, self.WOOD_LIGHT, rect)
+                for i in range(self.layers + 1):
+                    pygame.draw.line(surface, self.WOOD_DARK, (rect.left + i * step, rect.top),
+                                     (rect.left + i * step, rect.bottom))
+                    pygame.draw.line(surface, self.WOOD_DARK, (rect.left, rect.top + i * step),
+                                     (rect.right, rect.top + i * step))
+                
+                for (x, y), player in self.board.layer_stones[layer].items():
+                    self.draw_layer_panel_stone(rect, (x, y, layer), player)
+                
+                # 현재 층은 금색 테두리
+                border = self.GOLD if layer == self.layer else self.WOOD_DARK
+                pygame.draw.rect(surface, border, rect.inflate(4, 4), 2)
+                label = self.small_font.render("z = {}".format(layer), True, self.WHITE)
+                surface.blit(label, (rect.left, rect.bottom + 2))
+        elif self.layer_panel_dirty:
+            # 칸 하나를 빈 칸으로 다시 칠하고 그 칸의 돌만 다시 그림 (층 테두리는 건드리지 않도록 잘라냄)
+            surface = self.layer_panel_surface
+            rects = self.get_layer_rects()
+            for x, y, z in self.layer_panel_dirty:
+                rect = rects[z]
+                step = rect.width // self.layers
+                cell_rect = (rect.left + x * step, rect.top + y * step, step + 1, step + 1)
+                surface.set_clip(rect)
+                pygame.draw.rect(surface, self.WOOD_LIGHT, cell_rect)
+                pygame.draw.rect(surface, self.WOOD_DARK, cell_rect, 1)
+                player = self.board.get(x, y, z)
+                if player:
+                    self.draw_layer_panel_stone(rect, (x, y, z), player)
+            surface.set_clip(None)
+            self.layer_panel_dirty.clear()
+        
+        self.screen.blit(self.layer_panel_surface, (0, 0))
+    
+    def draw_layer_panel_stone(self, rect, cell, player):
+        """층 미리보기 칸 하나의 돌 (승리 라인은 금색 칸, 마지막 수는 빨간 테두리)"""
+        surface = self.layer_panel_surface
+        step = rect.width // self.layers
+        x, y, _ = cell
+        center = (rect.left + x * step + step // 2, rect.top + y * step + step // 2)
+        if self.show_win_line and cell in self.win_line_points:
+            pygame.draw.rect(surface, self.GOLD, (rect.left + x * step, rect.top + y * step, step, step))
+        color = self.STONE_BLACK_MEDIUM if player == 1 else self.STONE_WHITE_HIGHLIGHT
+        pygame.draw.circle(surface, color, center, max(1, step * 2 // 5))
+        if self.last_move == cell:
+            pygame.draw.circle(surface, self.RED, center, max(2, step // 2 - 1), 1)
+    
+    def get_scrubber_rect(self):
+        """수순 타임라인 막대 영역 (뷰포트 아래)"""
+        viewport = self.viewport
+        return pygame.Rect(viewport.screen_x, viewport.screen_y + viewport.height + 16,
+                           viewport.width - 120, 12)
+    
+    def get_scrubber_ply(self, px):
+        """타임라인 막대의 화면 x 좌표에 해당하는 수"""
+        rect = self.get_scrubber_rect()
+        fraction = min(1.0, max(0.0, (px - rect.left) / rect.width))
+        return int(round(fraction * len(self.timeline)))
+    
+    def draw_scrubber(self):
+        """수순 타임라인 막대 그리기 (지금 수나 수순 길이가 바뀔 때만 다시 그림)"""
+        rect = self.get_scrubber_rect()
+        key = (self.timeline.ply, len(self.timeline))
+        if key != self.scrubber_key:
+            self.scrubber_key = key
+            self.scrubber_surface = pygame.Surface((rect.width + 130, rect.height + 12), pygame.SRCALPHA)
+            surface = self.scrubber_surface
+            track = pygame.Rect(6, 6, rect.width, rect.height)
+            handle_x = track.left + track.width * self.timeline.ply // len(self.timeline)
+            pygame.draw.rect(surface, self.DARK_GRAY, track, border_radius=6)
+            pygame.draw.rect(surface, self.WOOD_HIGHLIGHT,
+                             (track.left, track.top, handle_x - track.left, track.height), border_radius=6)
+            pygame.draw.circle(surface, self.GOLD, (handle_x, track.centery), track.height // 2 + 4)
+            label = self.small_font.render("{} / {}".format(*key), True, self.WHITE)
+            surface.blit(label, (track.right + 16, track.centery - label.get_height() // 2))
+        self.screen.blit(self.scrubber_surface, (rect.left - 6, rect.top - 6))
+    
     def draw_ui(self):
         """UI 그리기 (3D 효과)"""
-        # UI 배경 (반투명)
-        ui_surface = pygame.Surface((300, 200))
-        ui_surface.set_alpha(200)
-        ui_surface.fill(self.WOOD_DARK)
-        self.screen.blit(ui_surface, (20, 20))
+        # 조작법 안내
+        controls = [
+            "ESC: Exit",
+            "R: Restart", 
+            "1: 2-Player Mode",
+            "2: AI Mode",
+            "E: AI Easy",
+            "M: AI Medium",
+            "H: AI Hard",
+            "Wheel / Right Drag: Zoom / Pan",
+            "Arrows: Pan, C: Center",
+            "T: Hints ({})".format("on" if self.show_hints else "off"),
+            "Z / Y: Undo / Redo, Home / End"
+        ]
+        if self.rule != RULE_STANDARD:
+            controls.append("Rule: {}".format(self.rule))
+        if self.layers:
+            controls.append("PgUp / PgDn: Layer ({}/{})".format(self.layer, self.layers - 1))
+        
+        # 대국 시계 (가는 쪽은 금색)
+        clock_lines = []
+        if self.clock:
+            controls.append("Time: {}".format(self.time_control))
+            for player, name in ((1, "Black"), (2, "White")):
+                color = self.GOLD if self.clock.running == player else self.WHITE
+                clock_lines.append(("{}: {}".format(name, self.clock.format(player)), color))
+        
+        # UI 배경 (반투명, 한 번 만든 표면 재사용)
+        if self.ui_panel_surface is None:
+            self.ui_panel_surface = pygame.Surface((300, 95 + (len(controls) + len(clock_lines)) * 25))
+            self.ui_panel_surface.set_alpha(200)
+            self.ui_panel_surface.fill(self.WOOD_DARK)
+        self.screen.blit(self.ui_panel_surface, (20, 20))
         
         # 게임 모드 표시
         mode_text = "2-Player Mode" if self.game_mode == "2p" else f"AI Mode ({self.ai_difficulty})"
@@ -642,20 +1151,12 @@ class OmokGame:
         player_surface = self.font.render(player_text, True, player_color)
         self.screen.blit(player_surface, (30, 70))
         
-        # 조작법 안내
-        controls = [
-            "ESC: Exit",
-            "R: Restart", 
-            "1: 2-Player Mode",
-            "2: AI Mode",
-            "E: AI Easy",
-            "M: AI Medium",
-            "H: AI Hard"
-        ]
-        
         for i, control in enumerate(controls):
             control_surface = self.small_font.render(control, True, self.WHITE)
             self.screen.blit(control_surface, (30, 120 + i * 25))
+        for i, (text, color) in enumerate(clock_lines, len(controls)):
+            clock_surface = self.small_font.render(text, True, color)
+            self.screen.blit(clock_surface, (30, 120 + i * 25))
     
     def draw_status(self):
         """게임 상태 메시지 그리기 (3D 효과)"""
@@ -663,6 +1164,8 @@ class OmokGame:
             # 배경 (그림자 효과)
             if self.winner:
                 winner_text = "Black Wins!" if self.winner == 1 else "White Wins!"
+                if self.clock and self.clock.flagged is not None:
+                    winner_text = winner_text[:-1] + " on Time!"
                 status_surface = self.large_font.render(winner_text, True, self.RED)
             else:
                 status_surface = self.large_font.render("Draw!", True, self.BLUE)
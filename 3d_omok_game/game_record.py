@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 기보 기록 및 국면 색인
+
+기보 파일 형식 (추가 전용):
+    [헤더 7바이트: 'OG', 행, 열, 승자, 수 개수] + [수 목록]
+    16x16 이하 보드는 수 하나당 1바이트 (y << 4 | x),
+    그보다 큰 보드는 2바이트 (y * 열 + x, 리틀 엔디언)를 사용한다.
+    한 변이 255칸을 넘는 보드는 헤더 11바이트 ['OW', 행 2바이트, 열 2바이트, 승자, 수 개수 4바이트] 이고,
+    칸이 65536개 이상이면 수 하나당 4바이트를 사용한다. (한 변은 65535칸까지)
+    승자 바이트의 위 4비트는 규칙 번호 (rules.RULES 순서, 0은 자유룰) 이다.
+
+색인은 SQLite 파일에 (정규형 해시 -> 게임, 수순, 다음 수)로 저장한다.
+해시에는 보드 크기 키를 섞고 게임마다 규칙을 저장해, 크기나 규칙이 다른 게임은 섞이지 않는다.
+다음 수는 정규형 좌표로 저장하므로 대칭 국면의 통계가 합쳐진다.
+"""
+
+import os
+import sys
+import struct
+import sqlite3
+import argparse
+from board import Board
+from sparse_board import SparseBoard, SPARSE_BOARD_CELLS
+from rules import RULE_STANDARD, RULES
+from transposition import size_key
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+RECORD_MAGIC = b'OG'
+RECORD_HEADER = struct.Struct('<2sBBBH')
+WIDE_RECORD_MAGIC = b'OW'
+WIDE_RECORD_HEADER = struct.Struct('<2sHHBI')
+MAX_RECORD_SIDE = 0xFFFF
+
+# 승자 값 (0: 무승부, 1: 흑, 2: 백, 3: 미완료)
+RESULT_DRAW = 0
+RESULT_UNFINISHED = 3
+
+# 색인 삽입 시 한 번에 커밋할 게임 수
+IMPORT_BATCH = 1000
+
+# 색인 형식 버전 (다르면 기보 파일에서 색인을 다시 만듦)
+INDEX_VERSION = 2
+
+
+def _to_signed(value):
+    """64비트 해시를 SQLite 정수 범위로 변환"""
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+
+def _position_hash(board):
+    """색인 키 (보드 크기를 섞은 정규형 해시) 와 정규형 변환 번호"""
+    canonical_hash, transform = board.get_canonical()
+    return _to_signed(canonical_hash ^ size_key(board)), transform
+
+
+class GameRecord:
+    """한 판의 기보"""
+
+    def __init__(self, rows=15, cols=15, moves=None, winner=RESULT_UNFINISHED,
+                 rule=RULE_STANDARD):
+        """기보 초기화 (기록할 수 없는 크기나 모르는 규칙이면 ValueError)"""
+        if not self.can_record(rows, cols):
+            raise ValueError("기보로 기록할 수 없는 보드 크기: {}x{}".format(rows, cols))
+        if rule not in RULES:
+            raise ValueError("알 수 없는 규칙: {}".format(rule))
+        self.rows = rows
+        self.cols = cols
+        self.moves = list(moves) if moves else []
+        self.winner = winner
+        self.rule = rule
+
+    @staticmethod
+    def can_record(rows, cols):
+        """기보 형식으로 기록할 수 있는 보드 크기인지 (크기 제한이 없는 보드는 불가)"""
+        return (rows is not None and cols is not None and
+                0 < rows <= MAX_RECORD_SIDE and 0 < cols <= MAX_RECORD_SIDE)
+
+    def uses_short_moves(self):
+        """수 하나를 1바이트로 저장할 수 있는지 확인"""
+        return self.rows <= 16 and self.cols <= 16
+
+    def uses_wide_header(self):
+        """한 변이 255칸을 넘어 넓은 헤더를 쓰는지 확인"""
+        return self.rows > 0xFF or self.cols > 0xFF
+
+    def move_format(self):
+        """칸 번호 (y * 열 + x) 하나의 struct 형식 (칸이 65536개 이상이면 4바이트)"""
+        return 'I' if self.rows * self.cols > 0x10000 else 'H'
+
+    def encode(self):
+        """기보를 바이트열로 변환"""
+        result = self.winner | RULES.index(self.rule) << 4
+        if self.uses_wide_header():
+            header = WIDE_RECORD_HEADER.pack(WIDE_RECORD_MAGIC, self.rows, self.cols,
+                                             result, len(self.moves))
+        else:
+            header = RECORD_HEADER.pack(RECORD_MAGIC, self.rows, self.cols,
+                                        result, len(self.moves))
+        if self.uses_short_moves():
+            body = bytes((y << 4) | x for x, y in self.moves)
+        else:
+            body = struct.pack('<%d%s' % (len(self.moves), self.move_format()),
+                               *[y * self.cols + x for x, y in self.moves])
+        return header + body
+
+    @classmethod
+    def read_from(cls, stream):
+        """스트림에서 기보 하나 읽기 (끝이면 None)"""
+        magic = stream.read(2)
+        if not magic:
+            return None
+        header_format = {RECORD_MAGIC: RECORD_HEADER, WIDE_RECORD_MAGIC: WIDE_RECORD_HEADER}.get(magic)
+        if header_format is None:
+            raise ValueError("기보 형식이 아닙니다")
+        header = magic + stream.read(header_format.size - 2)
+        if len(header) < header_format.size:
+            raise ValueError("기보 헤더가 잘렸습니다")
+        _, rows, cols, result, count = header_format.unpack(header)
+        if result >> 4 >= len(RULES):
+            raise ValueError("알 수 없는 규칙 번호: {}".format(result >> 4))
+
+        record = cls(rows, cols, winner=result & 0x0F, rule=RULES[result >> 4])
+        if record.uses_short_moves():
+            body = stream.read(count)
+            if len(body) < count:
+                raise ValueError("기보 본문이 잘렸습니다")
+            record.moves = [(b & 0x0F, b >> 4) for b in body]
+        else:
+            move_format = '<%d%s' % (count, record.move_format())
+            body = stream.read(struct.calcsize(move_format))
+            if len(body) < struct.calcsize(move_format):
+                raise ValueError("기보 본문이 잘렸습니다")
+            record.moves = [(i % cols, i // cols)
+                            for i in struct.unpack(move_format, body)]
+        return record
+
+    def replay(self):
+        """(보드, 수순, 다음 수, 둘 차례) 를 차례로 생성
+
+        보드 객체는 재사용되므로 보관하려면 복사해야 한다.
+        마지막에는 다음 수가 None인 최종 국면이 한 번 나온다.
+        """
+        # 게임과 같은 보드 종류로 다시 두어야 색인 해시가 게임 중 국면과 맞음
+        if self.rows * self.cols > SPARSE_BOARD_CELLS:
+            board = SparseBoard(self.rows, self.cols, self.rule)
+        else:
+            board = Board(self.rows, self.cols, self.rule)
+        player = 1
+        for ply, (x, y) in enumerate(self.moves):
+            yield board, ply, (x, y), player
+            board.place_stone(x, y, player)
+            player = 3 - player
+        yield board, len(self.moves), None, player
+
+    def to_text(self):
+        """한 줄 텍스트 형식 ("15x15 1 7,7 8,8 ...", 자유룰이 아니면 "15x15/renju 1 ...")"""
+        moves = ' '.join('%d,%d' % move for move in self.moves)
+        size = '%dx%d' % (self.rows, self.cols)
+        if self.rule != RULE_STANDARD:
+            size += '/' + self.rule
+        return ('%s %d %s' % (size, self.winner, moves)).rstrip()
+
+    @classmethod
+    def from_text(cls, line):
+        """한 줄 텍스트 형식에서 기보 생성"""
+        parts = line.split()
+        size, _, rule = parts[0].partition('/')
+        rows, cols = (int(v) for v in size.split('x'))
+        moves = [tuple(int(v) for v in part.split(',')) for part in parts[2:]]
+        return cls(rows, cols, moves, int(parts[1]), rule or RULE_STANDARD)
+
+
+class GameRecordStore:
+    """추가 전용 기보 저장소와 국면 색인"""
+
+    def __init__(self, path):
+        """저장소 열기 (디렉터리가 없으면 생성)"""
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self.data_path = os.path.join(path, 'games.dat')
+        self.index_path = os.path.join(path, 'games.idx')
+
+        self.db = sqlite3.connect(self.index_path, timeout=30)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version != INDEX_VERSION:
+            # 옛 형식 색인 (크기를 섞지 않은 해시, 규칙 없음) 은 지우고 다시 만듦
+            self.db.executescript('''
+                DROP TABLE IF EXISTS games;
+                DROP TABLE IF EXISTS positions;
+            ''')
+        self.db.executescript('''
+            CREATE TABLE IF NOT EXISTS games (
+                id INTEGER PRIMARY KEY, winner INTEGER, length INTEGER, rule TEXT);
+            CREATE TABLE IF NOT EXISTS positions (
+                hash INTEGER, game INTEGER, ply INTEGER, next_move INTEGER);
+            CREATE INDEX IF NOT EXISTS positions_hash ON positions (hash);
+        ''')
+        if version != INDEX_VERSION:
+            self.db.execute('PRAGMA user_version = {}'.format(INDEX_VERSION))
+            self.rebuild_index()
+
+    def close(self):
+        """저장소 닫기"""
+        self.db.close()
+
+    def append(self, record):
+        """기보 한 판을 저장하고 색인에 추가 (게임 번호 반환)"""
+        game_id = self._append_data([record])[0]
+        with self.db:
+            self._index_record(game_id, record)
+        return game_id
+
+    def import_records(self, records):
+        """기보를 스트리밍으로 대량 추가 (추가한 게임 수 반환)"""
+        total = 0
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= IMPORT_BATCH:
+                total += self._import_batch(batch)
+                batch = []
+        if batch:
+            total += self._import_batch(batch)
+        return total
+
+    def _import_batch(self, records):
+        """기보 묶음을 한 트랜잭션으로 저장"""
+        game_ids = self._append_data(records)
+        with self.db:
+            for game_id, record in zip(game_ids, records):
+                self._index_record(game_id, record)
+        return len(records)
+
+    def _append_data(self, records):
+        """기보 파일 끝에 추가 (게임 번호는 파일 내 위치)"""
+        with open(self.data_path, 'ab') as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                game_ids = []
+                chunks = []
+                for record in records:
+                    data = record.encode()
+                    game_ids.append(offset)
+                    chunks.append(data)
+                    offset += len(data)
+                f.write(b''.join(chunks))
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+        return game_ids
+
+    def _index_record(self, game_id, record):
+        """기보의 모든 국면을 색인에 추가"""
+        rows = []
+        for board, ply, move, _ in record.replay():
+            _, transforms = board.get_canonical_transforms()
+            if move is None:
+                next_move = -1
+            else:
+                # 국면 자체가 대칭이면 동등한 수들 중 가장 작은 칸으로 통일
+                next_move = min(cy * record.cols + cx for cx, cy in
+                                (board.to_canonical(move[0], move[1], t)
+                                 for t in transforms))
+            rows.append((_position_hash(board)[0], game_id, ply, next_move))
+        self.db.execute('INSERT INTO games VALUES (?, ?, ?, ?)',
+                        (game_id, record.winner, len(record.moves), record.rule))
+        self.db.executemany('INSERT INTO positions VALUES (?, ?, ?, ?)', rows)
+
+    def rebuild_index(self):
+        """기보 파일을 다시 읽어 색인 재생성"""
+        with self.db:
+            self.db.execute('DELETE FROM games')
+            self.db.execute('DELETE FROM positions')
+            for game_id, record in self.iter_records():
+                self._index_record(game_id, record)
+
+    def iter_records(self):
+        """저장된 기보를 (게임 번호, 기보) 로 스트리밍"""
+        if not os.path.exists(self.data_path):
+            return
+        with open(self.data_path, 'rb') as f:
+            while True:
+                offset = f.tell()
+                record = GameRecord.read_from(f)
+                if record is None:
+                    break
+                yield offset, record
+
+    def get_record(self, game_id):
+        """게임 번호로 기보 읽기"""
+        with open(self.data_path, 'rb') as f:
+            f.seek(game_id)
+            return GameRecord.read_from(f)
+
+    def count_games(self):
+        """저장된 게임 수"""
+        return self.db.execute('SELECT COUNT(*) FROM games').fetchone()[0]
+
+    def find_games(self, board):
+        """이 국면(대칭 포함)에 도달한 (게임 번호, 수순) 목록 (보드와 크기, 규칙이 같은 게임만)"""
+        key = _position_hash(board)[0]
+        return self.db.execute('''
+            SELECT p.game, p.ply FROM positions p JOIN games g ON g.id = p.game
+            WHERE p.hash = ? AND g.rule = ? ORDER BY p.game
+        ''', (key, board.rule)).fetchall()
+
+    def continuation_stats(self, board):
+        """이 국면에서 나온 다음 수별 (수, 게임 수, 둔 쪽 승수, 승률) 목록
+
+        수는 실제 보드 방향의 좌표로 돌려준다. 국면이 대칭이면
+        동등한 수들은 하나로 합쳐 그중 한 칸으로 표시한다. 보드의 규칙으로 둔 게임만 센다.
+        """
+        key, transform = _position_hash(board)
+        mover = 1 if board.move_count % 2 == 0 else 2
+        rows = self.db.execute('''
+            SELECT p.next_move, COUNT(*), SUM(g.winner = ?)
+            FROM positions p JOIN games g ON g.id = p.game
+            WHERE p.hash = ? AND g.rule = ? AND p.next_move >= 0
+            GROUP BY p.next_move ORDER BY COUNT(*) DESC
+        ''', (mover, key, board.rule)).fetchall()
+
+        stats = []
+        for next_move, games, wins in rows:
+            cx, cy = next_move % board.cols, next_move // board.cols
+            move = board.from_canonical(cx, cy, transform)
+            stats.append((move, games, wins, wins / games))
+        return stats
+
+
+def export_text(store, stream):
+    """저장소의 기보를 텍스트 형식으로 스트리밍 출력"""
+    count = 0
+    for _, record in store.iter_records():
+        stream.write(record.to_text() + '\n')
+        count += 1
+    return count
+
+
+def read_text(stream):
+    """텍스트 형식 기보를 한 줄씩 읽어 생성"""
+    for line in stream:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            yield GameRecord.from_text(line)
+
+
+def main():
+    """기보 저장소 명령줄 도구"""
+    parser = argparse.ArgumentParser(description="오목 기보 저장소 도구")
+    parser.add_argument('store', help="기보 저장소 디렉터리")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    import_parser = sub.add_parser('import', help="텍스트 기보 가져오기")
+    import_parser.add_argument('file', help="입력 파일 ('-'는 표준 입력)")
+    export_parser = sub.add_parser('export', help="텍스트 기보 내보내기")
+    export_parser.add_argument('file', help="출력 파일 ('-'는 표준 출력)")
+    sub.add_parser('reindex', help="색인 재생성")
+    sub.add_parser('stats', help="저장된 게임 수 출력")
+
+    args = parser.parse_args()
+    store = GameRecordStore(args.store)
+    try:
+        if args.command == 'import':
+            if args.file == '-':
+                count = store.import_records(read_text(sys.stdin))
+            else:
+                with open(args.file, encoding='utf-8') as stream:
+                    count = store.import_records(read_text(stream))
+            print("가져온 게임: {}".format(count))
+        elif args.command == 'export':
+            if args.file == '-':
+                count = export_text(store, sys.stdout)
+                sys.stdout.flush()
+            else:
+                with open(args.file, 'w', encoding='utf-8') as stream:
+                    count = export_text(store, stream)
+            print("내보낸 게임: {}".format(count), file=sys.stderr)
+        elif args.command == 'reindex':
+            store.rebuild_index()
+        else:
+            print("저장된 게임: {}".format(store.count_games()))
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
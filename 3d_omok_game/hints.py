@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 후보 칸 힌트 점수 (증분 갱신)
+
+돌 주변 후보 칸마다 흑/백이 그 칸에 두었을 때 만드는 방향별 위협 등급의 가중치 합을 들고 있는다.
+한 방향의 등급은 그 칸 중심 9칸 창으로만 정해지므로, 돌이 놓이거나 빠지면
+그 돌을 지나는 라인에서 4칸 이내인 후보 칸의 그 방향 값만 다시 읽으면 된다.
+    - 후보 칸은 AI와 같이 돌에서 2칸 이내 (평면은 5x5 블록, 3D는 13방향 라인) 의 빈 칸
+    - 가중치는 AIPlayer의 후보 수 정렬 가중치 (공격 두 배 + 수비가 AI의 정렬 점수)
+    - 렌주/정확히 5 규칙의 금수와 장목 구분은 보지 않음 (표준 위협 등급표만 사용)
+보드 좌표만 다루므로 pygame 없이 쓸 수 있다.
+"""
+
+import itertools
+from patterns import THREAT
+from ai_player import AIPlayer
+
+# 후보 칸 거리 (Board.get_candidate_moves 기본값)
+HINT_DISTANCE = 2
+
+# 9칸 창이 닿는 거리
+WINDOW_REACH = 4
+
+
+def neighbor_offsets(directions, distance=HINT_DISTANCE):
+    """돌 주변 후보 칸의 상대 좌표 (평면은 정사각형 블록, 3D는 라인 위)"""
+    if len(directions[0]) == 2:
+        return [offset for offset in itertools.product(range(-distance, distance + 1), repeat=2)
+                if offset != (0, 0)]
+    return [tuple(k * d for d in direction) for direction in directions
+            for k in range(-distance, distance + 1) if k]
+
+
+class HintMap:
+    """후보 칸의 흑/백 위협 점수를 증분으로 유지하는 클래스"""
+
+    def __init__(self, board, weights=AIPlayer.THREAT_ORDER_WEIGHTS):
+        """board의 현재 돌로 점수 초기화 (이후 돌을 놓거나 뺄 때마다 stone_placed/stone_removed 호출)"""
+        self.board = board
+        self.weights = weights
+        self.directions = board.directions
+        self.offsets = neighbor_offsets(self.directions)
+        # 칸 -> 주변 2칸 이내의 돌 수 (0이 되면 후보에서 빠짐)
+        self.near = {}
+        # 후보 칸 -> [흑 점수, 백 점수] 와 방향별 [흑, 백] 값
+        self.scores = {}
+        self.parts = {}
+        # 점수가 바뀔 때마다 증가 (그리기 캐시 무효화용)
+        self.version = 0
+        for cell in board.stones:
+            self.add_near(cell, 1)
+        for cell in self.near:
+            if cell not in board.stones and board.in_bounds(*cell):
+                self.score_cell(cell)
+
+    def add_near(self, cell, step):
+        """cell 주변 칸의 돌 수 갱신 - 새로 후보가 된 칸 목록"""
+        board = self.board
+        near = self.near
+        added = []
+        for offset in self.offsets:
+            other = tuple(c + o for c, o in zip(cell, offset))
+            count = near.get(other, 0) + step
+            if count:
+                near[other] = count
+                if count == 1 and step > 0 and board.in_bounds(*other):
+                    added.append(other)
+            elif other in near:
+                del near[other]
+                if other in self.scores:
+                    del self.scores[other], self.parts[other]
+        return added
+
+    def score_cell(self, cell):
+        """후보 칸의 모든 방향 값 계산"""
+        weights = self.weights
+        black, white = THREAT[1], THREAT[2]
+        parts = [[weights[black[window]], weights[white[window]]]
+                 for window in self.board.get_windows(*cell)]
+        self.parts[cell] = parts
+        self.scores[cell] = [sum(part[0] for part in parts), sum(part[1] for part in parts)]
+
+    def rescore_lines(self, cell):
+        """cell을 지나는 라인에서 창이 닿는 후보 칸의 그 방향 값만 다시 계산"""
+        board = self.board
+        weights = self.weights
+        black, white = THREAT[1], THREAT[2]
+        scores, all_parts = self.scores, self.parts
+        for index, direction in enumerate(self.directions):
+            for k in range(-WINDOW_REACH, WINDOW_REACH + 1):
+                other = tuple(c + k * d for c, d in zip(cell, direction))
+                parts = all_parts.get(other)
+                if parts is None:
+                    continue
+                window = board.get_window(*other, index)
+                old = parts[index]
+                new = [weights[black[window]], weights[white[window]]]
+                total = scores[other]
+                total[0] += new[0] - old[0]
+                total[1] += new[1] - old[1]
+                parts[index] = new
+
+    def stone_placed(self, *cell):
+        """board에 돌이 놓인 뒤 호출"""
+        if cell in self.scores:
+            del self.scores[cell], self.parts[cell]
+        for other in self.add_near(cell, 1):
+            if other not in self.board.stones:
+                self.score_cell(other)
+        self.rescore_lines(cell)
+        self.version += 1
+
+    def stone_removed(self, *cell):
+        """board에서 돌이 빠진 뒤 호출"""
+        self.add_near(cell, -1)
+        self.rescore_lines(cell)
+        if cell in self.near and self.board.in_bounds(*cell):
+            self.score_cell(cell)
+        self.version += 1
+
+    def apply_changes(self, board, placed, removed):
+        """board (같은 보드이거나 스냅숏에서 되살린 보드) 에서 여러 칸이 바뀐 뒤 호출
+
+        바뀐 칸마다 놓기/빼기 갱신을 하되, 모두 바뀐 뒤의 보드를 읽으므로 순서와 무관하다.
+        바뀐 칸이 놓인 돌보다 많으면 처음부터 다시 만드는 편이 싸다.
+        """
+        version = self.version
+        if len(placed) + len(removed) > len(board.stones):
+            self.__init__(board, self.weights)
+        else:
+            self.board = board
+            for cell in removed:
+                self.stone_removed(*cell)
+            for cell in placed:
+                self.stone_placed(*cell)
+        self.version = version + 1
+
+    def get_hints(self, player):
+        """player 차례의 후보 칸 {칸: (공격 점수, 수비 점수)}"""
+        opponent = 3 - player
+        return {cell: (score[player - 1], score[opponent - 1]) for cell, score in self.scores.items()}
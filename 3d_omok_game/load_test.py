@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 대국 서버 부하 측정 클라이언트
+
+세션 수만큼 동시에 대국을 열고, 각 세션이 중앙 근처의 무작위 수를 두며
+요청부터 응답(AI 수 포함)까지의 시간을 잰다. --spawn을 주면 서버도 이 프로세스에서 띄운다.
+처리량은 잰 수/초를 코어 수로 나눠 보고한다. --target-p99를 주면 세션 수를 두 배씩 늘리다
+p99 지연이 목표를 넘으면 이분 탐색해, 목표 안에서 버티는 최대 동시 세션 수를 잰다.
+
+사용 예:
+    python load_test.py --spawn --sessions 200 --moves 8 --workers 4
+    python load_test.py --port 9000 --sessions 1000 --connections 50
+    python load_test.py --spawn --sessions 5000 --moves 20 --no-ai
+    python load_test.py --spawn --sessions 200 --moves 8 --batch 2
+    python load_test.py --spawn --sessions 50 --moves 8 --target-p99 500
+"""
+
+import os
+import time
+import random
+import asyncio
+import argparse
+import itertools
+from server import GameServer, read_frame, write_frame
+
+
+class Connection:
+    """여러 세션이 함께 쓰는 연결 하나 (요청 id로 응답을 짝지어 동시에 여러 요청을 보냄)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.waiting = {}
+        self.request_ids = itertools.count()
+        self.receiver = asyncio.create_task(self.receive())
+
+    async def receive(self):
+        """응답을 읽어 기다리는 요청에 돌려줌"""
+        while True:
+            response = await read_frame(self.reader)
+            if response is None:
+                break
+            self.waiting.pop(response['id']).set_result(response)
+
+    async def request(self, message):
+        """요청 하나를 보내고 그 응답 받기"""
+        request_id = next(self.request_ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        write_frame(self.writer, dict(message, id=request_id))
+        await self.writer.drain()
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        await self.writer.wait_closed()
+        await self.receiver
+
+
+async def play_session(connection, args, rng, latencies):
+    """세션 하나를 열어 moves수까지 (또는 대국이 끝날 때까지) 두기"""
+    reply = await connection.request({'op': 'new', 'size': args.size, 'ai': not args.no_ai,
+                                      'depth': args.depth})
+    session = reply['session']
+    occupied = set()
+    center = args.size // 2
+    for _ in range(args.moves):
+        free = [(x, y) for x in range(center - 3, center + 4) for y in range(center - 3, center + 4)
+                if (x, y) not in occupied]
+        if not free:
+            break
+        move = rng.choice(free)
+        start = time.perf_counter()
+        reply = await connection.request({'op': 'move', 'session': session,
+                                          'x': move[0], 'y': move[1]})
+        latencies.append(time.perf_counter() - start)
+        occupied.add(move)
+        if reply.get('ai_move'):
+            occupied.add(tuple(reply['ai_move']))
+        if reply.get('over'):
+            break
+    await connection.request({'op': 'close', 'session': session})
+
+
+# 최대 동시 세션 탐색을 멈추는 상대 오차
+CAPACITY_PRECISION = 0.1
+
+
+def percentile(values, fraction):
+    """정렬된 값의 백분위 (값이 없으면 None)"""
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def format_latency(value):
+    """지연 표시 (ms, 잰 값이 없으면 -)"""
+    return "-" if value is None else "{:.1f}ms".format(value)
+
+
+async def run_load_test(host, port, args, sessions):
+    """sessions개 동시 세션 부하를 걸고 결과 요약 반환 (지연은 ms, 잰 수가 없으면 None)"""
+    connections = []
+    for _ in range(args.connections):
+        reader, writer = await asyncio.open_connection(host, port)
+        connections.append(Connection(reader, writer))
+
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(play_session(connections[i % len(connections)], args,
+                                        random.Random(args.seed + i), latencies)
+                           for i in range(sessions)))
+    elapsed = time.perf_counter() - start
+    for connection in connections:
+        await connection.close()
+
+    latencies = sorted(latency * 1000 for latency in latencies)
+    return {
+        'sessions': sessions,
+        'moves': len(latencies),
+        'elapsed': elapsed,
+        'p50': percentile(latencies, 0.5),
+        'p99': percentile(latencies, 0.99),
+    }
+
+
+async def find_capacity(host, port, args, report):
+    """p99 지연이 args.target_p99 (ms) 안인 가장 큰 동시 세션 수와 그때의 결과
+
+    args.sessions부터 두 배씩 늘리다 목표를 넘으면 지킨 값과 넘은 값 사이를 이분 탐색한다.
+    """
+    low, high, best = 0, None, None
+    sessions = args.sessions
+    while sessions > 0:
+        result = await run_load_test(host, port, args, sessions)
+        report(result)
+        if result['p99'] is not None and result['p99'] <= args.target_p99:
+            low, best = sessions, result
+        else:
+            high = sessions
+        if high is None:
+            if sessions >= args.max_sessions:
+                break
+            sessions = min(sessions * 2, args.max_sessions)
+        elif high - low <= max(1, int(high * CAPACITY_PRECISION)):
+            break
+        else:
+            sessions = (low + high) // 2
+    return low, best
+
+
+async def main_async(args):
+    """필요하면 서버를 띄우고 부하 측정"""
+    server = None
+    host, port = args.host, args.port
+    if args.spawn:
+        batch_window = args.batch / 1000 if args.batch is not None else None
+        server = GameServer(args.workers, batch_window=batch_window)
+        port = await server.start(host, 0)
+    # 띄운 서버는 AI 워커 수 (묶음 처리는 스레드 하나), 아니면 이 기계의 코어 수로 나눔
+    cores = os.cpu_count() or 1
+    if args.spawn:
+        cores = 1 if args.batch is not None else min(args.workers, cores)
+
+    def report(result):
+        throughput = result['moves'] / result['elapsed']
+        print("세션 {sessions}개, 수 {moves}개, {elapsed:.1f}초".format(**result))
+        print("  수당 지연: p50 {}, p99 {}".format(format_latency(result['p50']),
+                                                format_latency(result['p99'])))
+        print("  처리량: {:.1f}수/초, 코어당 {:.1f}수/초 (코어 {}개)".format(
+            throughput, throughput / cores, cores))
+
+    try:
+        if args.target_p99 is None:
+            report(await run_load_test(host, port, args, args.sessions))
+        else:
+            sessions, result = await find_capacity(host, port, args, report)
+            if result is None:
+                print("p99 {:g}ms 안에서 버틴 세션 수 없음".format(args.target_p99))
+            else:
+                print("p99 {:g}ms 안의 최대 동시 세션: {}개 (코어당 {:.0f}개, 코어 {}개){}".format(
+                    args.target_p99, sessions, sessions / cores, cores,
+                    " - 상한에 닿음" if sessions >= args.max_sessions else ""))
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main():
+    """부하 측정 명령줄 진입점"""
+    parser = argparse.ArgumentParser(description="오목 대국 서버 부하 측정")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('--spawn', action='store_true', help="이 프로세스에서 서버를 띄워 측정")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="--spawn일 때 서버의 AI 워커 수")
+    parser.add_argument('--batch', type=float, metavar='MS',
+                        help="--spawn일 때 서버가 AI 탐색을 묶어 처리 (요청을 모으는 시간, ms)")
+    parser.add_argument('--sessions', type=int, default=200,
+                        help="동시 대국 수 (--target-p99면 탐색을 시작하는 수)")
+    parser.add_argument('--target-p99', type=float, metavar='MS',
+                        help="p99 지연이 이 안인 최대 동시 세션 수를 찾음")
+    parser.add_argument('--max-sessions', type=int, default=20000,
+                        help="--target-p99 탐색에서 늘릴 세션 수 상한")
+    parser.add_argument('--connections', type=int, default=20, help="세션들이 나눠 쓰는 연결 수")
+    parser.add_argument('--moves', type=int, default=8, help="세션마다 둘 수")
+    parser.add_argument('--size', type=int, default=15)
+    parser.add_argument('--depth', type=int, default=0, help="서버 AI 탐색 깊이")
+    parser.add_argument('--no-ai', action='store_true',
+                        help="AI 없이 두 사람 대국으로 서버 자체의 처리 비용만 측정")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -7,6 +7,9 @@
 import sys
 import pygame
 from game import OmokGame
+from board import check_rule
+from rules import RULE_STANDARD
+from clock import TimeControl
 
 def main():
     """메인 함수"""
@@ -18,13 +21,28 @@ def main():
     print("- Press R to restart the game")
     print("- Press 1 to switch to 2-Player mode")
     print("- Press 2 to switch to AI mode")
+    print("- Mouse wheel to zoom, right drag or arrow keys to pan, C to center")
+    print("- 3D board (python main.py 9x9x9): PageUp/PageDown or click a layer preview")
+    print("- Rules (python main.py 15 renju): standard, exact-five, renju")
+    print("- Clock (python main.py 15 standard 300+5): 300 sudden death, 300+5 Fischer, 300/3x30 byoyomi")
     print()
     
     # Pygame 초기화
     pygame.init()
     
     # 게임 인스턴스 생성 및 실행
-    game = OmokGame()
+    # 보드 크기 (예: python main.py 100, 3D 보드는 python main.py 9x9x9)
+    size = sys.argv[1] if len(sys.argv) > 1 else "15"
+    # 규칙 (예: python main.py 15 renju)
+    rule = check_rule(sys.argv[2]) if len(sys.argv) > 2 else RULE_STANDARD
+    # 시간 규칙 (예: python main.py 15 standard 300+5, 초 단위)
+    time_control = TimeControl.parse(sys.argv[3]) if len(sys.argv) > 3 else None
+    if size.count("x") == 2:
+        game = OmokGame(record_path="game_records", layers=int(size.split("x")[0]), rule=rule,
+                        time_control=time_control)
+    else:
+        game = OmokGame(record_path="game_records", rows=int(size), cols=int(size), rule=rule,
+                        time_control=time_control)
     game.run()
     
     # Pygame 종료
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 라인 패턴 조회표
+
+한 점을 중심으로 한 방향 9칸(±4)을 칸당 2비트로 묶은 정수를 창 번호로 쓴다.
+    칸 값: 0 빈 칸, 1 흑, 2 백, 3 보드 밖 (i번째 칸은 비트 2*i 위치, 중심은 i=4)
+
+조회표는 처음 한 번 numpy로 만들어 디스크에 저장하고, 이후에는 읽기만 한다.
+    RUN_CLASS     : 중심 돌의 연속 개수와 막힌 쪽 수 -> 분류 번호 (count * 3 + blocked)
+                    중심을 포함하는 5칸 창이 모두 막혀 그 방향으로 이길 수 없으면 0
+    THREAT[player]: 중심에 player가 둘 때의 위협 등급 (THREAT_* 상수)
+    FREE_FIVES[player]: 중심을 포함하는 5칸 창 중 player 돌과 보드 밖 칸이 없는 창 수
+                    (중심에 player가 두면 상대가 그만큼의 창으로 더 이상 이길 수 없음)
+"""
+
+import os
+import numpy as np
+
+WINDOW_SIZE = 9
+WINDOW_CENTER = 4
+WINDOW_COUNT = 1 << (2 * WINDOW_SIZE)
+WINDOW_MASK = WINDOW_COUNT - 1
+
+EMPTY = 0
+WALL = 3
+
+# 한 방향 라인에서 수를 둔 결과의 위협 등급
+THREAT_NONE = 0
+THREAT_TWO = 1
+THREAT_THREE = 2
+THREAT_OPEN_THREE = 3
+THREAT_FOUR = 4
+THREAT_OPEN_FOUR = 5
+THREAT_FIVE = 6
+
+# 연속 개수 분류 (5개 이상은 5로 묶음)
+RUN_CLASS_COUNT = 6 * 3
+RUN_FIVE = 5 * 3
+
+TABLE_VERSION = 2
+TABLE_PATH = os.environ.get(
+    'OMOK_PATTERN_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'pattern_tables_v%d.npz' % TABLE_VERSION))
+
+
+def run_class(count, blocked):
+    """연속 개수와 막힌 쪽 수로 분류 번호 계산"""
+    return min(count, 5) * 3 + blocked
+
+
+def _window_cells():
+    """모든 창 번호의 칸 값 배열 (창 수, 9)"""
+    index = np.arange(WINDOW_COUNT, dtype=np.int64)
+    shifts = 2 * np.arange(WINDOW_SIZE, dtype=np.int64)
+    return ((index[:, None] >> shifts) & 3).astype(np.int8)
+
+
+def _build_run_class(cells):
+    """중심 돌 기준 연속 개수/막힘 분류표 생성"""
+    center = cells[:, WINDOW_CENTER]
+    rows = np.arange(len(cells))
+    count = np.ones(len(cells), dtype=np.int64)
+    blocked = np.zeros(len(cells), dtype=np.int64)
+
+    for step in (1, -1):
+        run = np.zeros(len(cells), dtype=np.int64)
+        alive = np.ones(len(cells), dtype=bool)
+        for k in range(1, 5):
+            alive &= cells[:, WINDOW_CENTER + step * k] == center
+            run += alive
+        # 연속이 창 끝까지 이어지면 이미 5개 이상이므로 막힘은 의미 없음
+        after = np.clip(WINDOW_CENTER + step * (run + 1), 0, WINDOW_SIZE - 1)
+        blocked += (run < 4) & (cells[rows, after] != EMPTY)
+        count += run
+
+    # 중심을 포함하는 5칸 창 중 상대 돌이나 보드 밖 칸이 없는 창이 하나도 없으면 죽은 방향
+    usable = np.zeros(len(cells), dtype=bool)
+    for start in range(5):
+        window = cells[:, start:start + 5]
+        usable |= ((window == EMPTY) | (window == center[:, None])).all(axis=1)
+
+    table = np.minimum(count, 5) * 3 + blocked
+    table[(center == EMPTY) | (center == WALL) | ~usable] = 0
+    return table.astype(np.uint8)
+
+
+def _build_threat(cells, player):
+    """중심에 player가 둘 때의 위협 등급표 생성"""
+    own = cells == player
+    own[:, WINDOW_CENTER] = True
+    blocked = (cells != EMPTY) & ~own
+    empty = ~own & ~blocked
+    size = len(cells)
+
+    five = np.zeros(size, dtype=bool)
+    three = np.zeros(size, dtype=bool)
+    two = np.zeros(size, dtype=bool)
+    win_points = np.zeros((size, WINDOW_SIZE), dtype=bool)
+
+    for start in range(5):
+        window = slice(start, start + 5)
+        clear = ~blocked[:, window].any(axis=1)
+        own_count = own[:, window].sum(axis=1)
+        five |= clear & (own_count == 5)
+        three |= clear & (own_count == 3)
+        two |= clear & (own_count == 2)
+        # 돌 4개와 빈칸 1개인 5칸이면 그 빈칸이 승리점
+        four = clear & (own_count == 4)
+        win_points[:, window] |= four[:, None] & empty[:, window]
+
+    # 양 끝이 비어 있는 6칸 안에 돌 3개와 빈칸 1개면 열린 3
+    open_three = np.zeros(size, dtype=bool)
+    for start in range(4):
+        inner = slice(start + 1, start + 5)
+        open_three |= (empty[:, start] & empty[:, start + 5] &
+                       ~blocked[:, inner].any(axis=1) &
+                       (own[:, inner].sum(axis=1) == 3))
+
+    point_count = win_points.sum(axis=1)
+    table = np.full(size, THREAT_NONE, dtype=np.uint8)
+    table[two] = THREAT_TWO
+    table[three] = THREAT_THREE
+    table[open_three] = THREAT_OPEN_THREE
+    table[point_count == 1] = THREAT_FOUR
+    table[point_count >= 2] = THREAT_OPEN_FOUR
+    table[five] = THREAT_FIVE
+    return table
+
+
+def _build_free_fives(cells, player):
+    """중심을 포함하는 5칸 창 중 player 돌과 보드 밖 칸이 없는 창 수 (중심 칸은 보지 않음)"""
+    free = (cells != player) & (cells != WALL)
+    free[:, WINDOW_CENTER] = True
+    table = np.zeros(len(cells), dtype=np.uint8)
+    for start in range(5):
+        table += free[:, start:start + 5].all(axis=1)
+    return table
+
+
+def build_tables():
+    """조회표 전체 생성"""
+    cells = _window_cells()
+    return {
+        'run_class': _build_run_class(cells),
+        'threat_black': _build_threat(cells, 1),
+        'threat_white': _build_threat(cells, 2),
+        'free_black': _build_free_fives(cells, 1),
+        'free_white': _build_free_fives(cells, 2),
+    }
+
+
+def load_tables(path=TABLE_PATH):
+    """디스크의 조회표를 읽고, 없으면 만들어 저장"""
+    try:
+        with np.load(path) as data:
+            tables = {name: data[name] for name in data.files}
+        if all(len(table) == WINDOW_COUNT for table in tables.values()):
+            return tables
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tables = build_tables()
+    try:
+        np.savez_compressed(path, **tables)
+    except OSError:
+        pass  # 저장할 수 없으면 메모리에서만 사용
+    return tables
+
+
+_tables = load_tables()
+
+# 파이썬 리스트 인덱싱이 numpy 스칼라 인덱싱보다 훨씬 빠르므로 리스트로 보관
+RUN_CLASS = _tables['run_class'].tolist()
+THREAT = [None, _tables['threat_black'].tolist(), _tables['threat_white'].tolist()]
+FREE_FIVES = [None, _tables['free_black'].tolist(), _tables['free_white'].tolist()]
+
+# 여러 칸의 창 번호 배열을 한 번에 분류할 때 쓰는 numpy 원본
+RUN_CLASS_ARRAY = _tables['run_class']
+THREAT_ARRAY = [None, _tables['threat_black'], _tables['threat_white']]
+FREE_FIVES_ARRAY = [None, _tables['free_black'], _tables['free_white']]
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 규칙 (자유룰 / 정확히 5 / 렌주)
+
+    standard  : 5개 이상 연속이면 흑백 모두 승리 (기존 동작)
+    exact-five: 정확히 5개만 승리 (6개 이상 장목은 승리 아님)
+    renju     : 흑은 정확히 5개만 승리하고 3-3, 4-4, 장목 자리는 금수. 백은 5개 이상 승리
+
+장목과 정확한 5는 중심에서 ±5칸을 봐야 하므로 11칸 긴 창 (칸당 2비트, 중심 i=5)
+조회표를 쓴다. 표는 규칙을 처음 쓸 때 numpy로 만들어 디스크에 저장한다.
+    LINE_FIVE        : 중심을 포함해 정확히 5개
+    LINE_OVERLINE    : 중심을 포함해 6개 이상
+    LINE_FOUR        : 한 수 더 두면 중심을 포함한 정확한 5가 되는 자리가 있음
+    LINE_DOUBLE_FOUR : 한 라인 안에 서로 다른 4가 둘 (예: ●.●●●.●)
+    LINE_OPEN_THREE  : 한 수 더 두면 열린 4 (.●●●●.) 가 됨 (금수 재귀 판정은 생략)
+"""
+
+import os
+import numpy as np
+from patterns import EMPTY, THREAT_ARRAY, THREAT_NONE, THREAT_OPEN_THREE, THREAT_OPEN_FOUR, THREAT_FIVE
+
+RULE_STANDARD = 'standard'
+RULE_EXACT_FIVE = 'exact-five'
+RULE_RENJU = 'renju'
+RULES = (RULE_STANDARD, RULE_EXACT_FIVE, RULE_RENJU)
+
+LONG_WINDOW_SIZE = 11
+LONG_WINDOW_CENTER = 5
+LONG_WINDOW_COUNT = 1 << (2 * LONG_WINDOW_SIZE)
+LONG_WINDOW_MASK = LONG_WINDOW_COUNT - 1
+
+# 라인 분류 비트
+LINE_FIVE = 1
+LINE_OVERLINE = 2
+LINE_FOUR = 4
+LINE_DOUBLE_FOUR = 8
+LINE_OPEN_THREE = 16
+
+TABLE_VERSION = 1
+TABLE_PATH = os.environ.get(
+    'OMOK_RULE_CACHE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 'rule_tables_v%d.npz' % TABLE_VERSION))
+
+_tables = None
+
+
+def requires_exact_five(rule, player):
+    """player가 정확히 5개로만 이길 수 있는 규칙인지"""
+    return rule == RULE_EXACT_FIVE or (rule == RULE_RENJU and player == 1)
+
+
+def has_forbidden_moves(rule, player):
+    """player에게 금수가 있는 규칙인지"""
+    return rule == RULE_RENJU and player == 1
+
+
+def classify_moves(board, moves, player):
+    """여러 수의 규칙을 반영한 위협 등급 배열 (player 공격, 상대 수비, player가 둘 수 있는지)
+
+    공격/수비는 (수 개수, 방향 수) 배열이다. 자유룰이 아니면 9칸 조회표가 5라고 한
+    자리만 11칸 창으로 정확한 5인지 다시 보고, 금수는 두 방향 이상 위협이 겹치거나
+    4가 생기는 자리만 검사하므로 규칙 판정은 후보 중 몇 칸에서만 일어난다.
+    """
+    windows = board.get_window_matrix(moves)
+    attack = THREAT_ARRAY[player][windows]
+    defense = THREAT_ARRAY[3 - player][windows]
+    return attack, defense, apply_move_rules(board, moves, player, attack, defense)
+
+
+def apply_move_rules(board, moves, player, attack, defense):
+    """9칸 조회표로 구한 공격/수비 등급에 규칙을 반영 (장목 5를 지움) 하고 둘 수 있는지 배열 반환"""
+    playable = np.ones(len(moves), dtype=bool)
+    if board.rule == RULE_STANDARD:
+        return playable
+
+    if has_forbidden_moves(board.rule, player):
+        suspects = (((attack >= THREAT_OPEN_THREE).sum(axis=1) >= 2) |
+                    (attack >= THREAT_OPEN_FOUR).any(axis=1))
+        for i in np.flatnonzero(suspects):
+            playable[i] = not board.is_forbidden(*moves[i])
+
+    # 장목은 5가 아님
+    for side, threats in ((player, attack), (3 - player, defense)):
+        if requires_exact_five(board.rule, side):
+            for i in np.flatnonzero((threats == THREAT_FIVE).any(axis=1)):
+                if not board.is_rule_five(moves[i], side):
+                    threats[i][threats[i] == THREAT_FIVE] = THREAT_NONE
+    return playable
+
+
+def _build_line_table(player):
+    """중심에 player가 둘 때의 11칸 창 분류표 생성"""
+    index = np.arange(LONG_WINDOW_COUNT, dtype=np.int64)
+    size = LONG_WINDOW_SIZE
+    center = LONG_WINDOW_CENTER
+    cells = [((index >> (2 * i)) & 3).astype(np.int8) for i in range(size)]
+    own = [(cells[i] == player) if i != center else np.ones(len(index), dtype=bool)
+           for i in range(size)]
+    empty = [(cells[i] == EMPTY) if i != center else np.zeros(len(index), dtype=bool)
+             for i in range(size)]
+    del index
+
+    # 중심을 지나는 연속 개수
+    run = np.ones(len(own[0]), dtype=np.int8)
+    for step in (1, -1):
+        alive = np.ones(len(own[0]), dtype=bool)
+        for k in range(1, center + 1):
+            alive &= own[center + step * k]
+            run += alive
+    five = run == 5
+    overline = run >= 6
+
+    # 승리점: 중심을 포함하는 5칸 [s, s+4] 에 돌 4개와 빈칸 1개, 양옆 칸은 내 돌이 아님
+    win_points = np.zeros((len(own[0]), size), dtype=bool)
+    for s in range(1, center + 1):
+        clear = np.ones(len(own[0]), dtype=bool)
+        count = np.zeros(len(own[0]), dtype=np.int8)
+        for i in range(s, s + 5):
+            clear &= own[i] | empty[i]
+            count += own[i]
+        exact = clear & (count == 4) & ~own[s - 1] & ~own[s + 5]
+        for i in range(s, s + 5):
+            win_points[:, i] |= exact & empty[i]
+    point_count = win_points.sum(axis=1)
+    first = np.argmax(win_points, axis=1)
+    last = size - 1 - np.argmax(win_points[:, ::-1], axis=1)
+    straight = (point_count == 2) & (last - first == 5)
+    four = point_count >= 1
+    double_four = (point_count >= 2) & ~straight
+    del win_points
+
+    # 열린 3: [a, a+3] 에 돌 3개와 빈칸 1개, a-1과 a+4는 빈칸, a-2와 a+5는 내 돌이 아님
+    open_three = np.zeros(len(own[0]), dtype=bool)
+    for a in range(2, center + 1):
+        clear = empty[a - 1] & empty[a + 4] & ~own[a - 2] & ~own[a + 5]
+        count = np.zeros(len(own[0]), dtype=np.int8)
+        for i in range(a, a + 4):
+            clear &= own[i] | empty[i]
+            count += own[i]
+        open_three |= clear & (count == 3)
+
+    table = (five * LINE_FIVE + overline * LINE_OVERLINE).astype(np.uint8)
+    settled = five | overline
+    table |= ((four & ~settled) * LINE_FOUR).astype(np.uint8)
+    table |= ((double_four & ~settled) * LINE_DOUBLE_FOUR).astype(np.uint8)
+    table |= ((open_three & ~four & ~settled) * LINE_OPEN_THREE).astype(np.uint8)
+    # 중심이 상대 돌이나 보드 밖이면 의미 없음
+    table[(cells[center] != EMPTY) & (cells[center] != player)] = 0
+    return table
+
+
+def build_rule_tables():
+    """규칙 조회표 전체 생성"""
+    return {'line_black': _build_line_table(1), 'line_white': _build_line_table(2)}
+
+
+def load_rule_tables(path=TABLE_PATH):
+    """디스크의 규칙 조회표를 읽고, 없으면 만들어 저장"""
+    try:
+        with np.load(path) as data:
+            tables = {name: data[name] for name in data.files}
+        if all(len(table) == LONG_WINDOW_COUNT for table in tables.values()):
+            return tables
+    except (OSError, ValueError, KeyError):
+        pass
+
+    tables = build_rule_tables()
+    try:
+        np.savez_compressed(path, **tables)
+    except OSError:
+        pass  # 저장할 수 없으면 메모리에서만 사용
+    return tables
+
+
+def get_line_table(player):
+    """player의 11칸 창 분류표 (처음 쓸 때 읽음)"""
+    global _tables
+    if _tables is None:
+        tables = load_rule_tables()
+        _tables = [None, tables['line_black'], tables['line_white']]
+    return _tables[player]
+
+
+def classify(long_windows, player):
+    """방향별 11칸 창 번호 목록 -> 방향별 분류 비트 목록"""
+    table = get_line_table(player)
+    return [int(table[window]) for window in long_windows]
+
+
+def is_exact_five(long_windows, player):
+    """중심에 두면 어느 방향이든 정확히 5개가 되는지"""
+    return any(code & LINE_FIVE for code in classify(long_windows, player))
+
+
+def is_forbidden(long_windows):
+    """흑이 중심에 두는 수가 렌주 금수인지 (정확한 5를 만들면 금수가 아님)"""
+    codes = classify(long_windows, 1)
+    if any(code & LINE_FIVE for code in codes):
+        return False
+    if any(code & LINE_OVERLINE for code in codes):
+        return True
+    fours = sum(1 for code in codes if code & LINE_FOUR)
+    fours += sum(1 for code in codes if code & LINE_DOUBLE_FOUR)
+    if fours >= 2:
+        return True
+    return sum(1 for code in codes if code & LINE_OPEN_THREE) >= 2
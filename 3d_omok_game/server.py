@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - asyncio 대국 서버
+
+한 프로세스의 이벤트 루프가 여러 연결과 수천 개의 대국 세션을 함께 들고 있는다.
+    - 세션마다 Board 하나와 수순, 둘 차례, 승자를 유지
+    - 사람의 수는 Board.is_valid_move (와 렌주 금수) 로 확인하고 루프 안에서 바로 둠
+    - AI 차례는 수순만 넘겨 크기가 정해진 프로세스 풀에서 탐색하므로 느린 탐색이 루프를 막지 않음
+      (대기 중인 AI 작업 수도 제한해, 넘치면 요청이 풀 자리를 기다림)
+    - --batch를 주면 프로세스 풀 대신 이 프로세스의 BatchAIService가 여러 세션의 탐색을 묶어 처리
+
+프레임: 4바이트 빅엔디언 길이 + UTF-8 JSON 객체 (요청과 응답 모두)
+    {"op": "new", "size": 15, "rule": "standard", "ai": true, "depth": 1}
+        -> {"ok": true, "session": 번호}
+    {"op": "move", "session": 번호, "x": 7, "y": 7}
+        -> {"ok": true, "ai_move": [x, y] 또는 null, "winner": 0/1/2, "ply": 수 개수}
+    {"op": "state", "session": 번호}   -> {"ok": true, "moves": [[x, y], ...], "winner": ...}
+    {"op": "close", "session": 번호}   -> {"ok": true}
+    잘못된 요청 -> {"ok": false, "error": "..."}
+    AI 수 계산이 실패하면 (워커 프로세스가 죽는 등) 사람의 수도 무르고 오류로 응답한다.
+    요청에 "id"가 있으면 응답에 그대로 붙인다. 한 연결의 요청은 동시에 처리되므로
+    (한 세션의 AI 탐색이 같은 연결의 다른 세션을 막지 않음) 응답 순서는 요청 순서와 다를 수 있다.
+
+사용 예:
+    python server.py --port 9000 --workers 4
+    python server.py --port 9000 --batch 2
+    python load_test.py --port 9000 --sessions 1000 --moves 10
+"""
+
+import os
+import json
+import struct
+import asyncio
+import argparse
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from board import Board, check_rule
+from rules import RULE_STANDARD, has_forbidden_moves
+from ai_player import AIPlayer
+from batch_service import BatchAIService
+
+FRAME_HEADER = struct.Struct('>I')
+MAX_FRAME = 1 << 16
+MAX_SIZE = 99
+MAX_DEPTH = 3
+
+# 워커 프로세스마다 하나씩 만드는 AI
+_worker_ai = None
+
+
+def _init_worker():
+    """AI 워커 프로세스 초기화"""
+    global _worker_ai
+    _worker_ai = AIPlayer()
+
+
+def _ai_move(task):
+    """워커에서 수순으로 국면을 만들어 AI 수 탐색"""
+    size, rule, moves, depth = task
+    board = Board(size, size, rule)
+    for i, move in enumerate(moves):
+        board.place_stone(*move, 1 + i % 2)
+    move, _ = _worker_ai.search(board, 1 + len(moves) % 2, depth)
+    return move
+
+
+async def read_frame(reader):
+    """프레임 하나를 읽어 JSON 객체로 (연결이 끝나면 None)"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+    except asyncio.IncompleteReadError:
+        return None
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME:
+        raise ValueError("프레임이 너무 큼: {}바이트".format(length))
+    return json.loads(await reader.readexactly(length))
+
+
+def write_frame(writer, message):
+    """JSON 객체를 프레임 하나로 쓰기 (drain은 호출한 쪽에서)"""
+    data = json.dumps(message, separators=(',', ':')).encode('utf-8')
+    writer.write(FRAME_HEADER.pack(len(data)) + data)
+
+
+class GameSession:
+    """서버의 대국 한 판"""
+
+    def __init__(self, size, rule, ai, depth):
+        """세션 초기화 (ai면 사람은 흑, AI는 백)"""
+        self.board = Board(size, size, rule)
+        self.size = size
+        self.rule = rule
+        self.ai = ai
+        self.depth = depth
+        self.moves = []
+        self.winner = 0
+        self.over = False
+        # AI 탐색 중에 같은 세션의 다음 수가 끼어들지 않도록 세션마다 순서를 지킴
+        self.lock = asyncio.Lock()
+
+    def current_player(self):
+        """둘 차례 (1 흑, 2 백)"""
+        return 1 + len(self.moves) % 2
+
+    def check_move(self, x, y):
+        """둘 수 없는 수면 이유, 둘 수 있으면 None"""
+        if self.over:
+            return "이미 끝난 대국"
+        if not self.board.is_valid_move(x, y):
+            return "둘 수 없는 자리"
+        if has_forbidden_moves(self.rule, self.current_player()) and self.board.is_forbidden(x, y):
+            return "금수"
+        return None
+
+    def play(self, x, y):
+        """수를 두고 승리/무승부 처리"""
+        player = self.current_player()
+        self.board.place_stone(x, y, player)
+        self.moves.append((x, y))
+        if self.board.check_win(x, y, player):
+            self.winner, self.over = player, True
+        elif self.board.is_full() or self.board.is_dead():
+            self.over = True
+
+    def undo(self):
+        """마지막 수 무르기 (AI 수 계산이 실패했을 때)"""
+        self.board.remove_stone(*self.moves.pop())
+        self.winner, self.over = 0, False
+
+
+class GameServer:
+    """여러 대국 세션을 들고 있는 asyncio 서버"""
+
+    def __init__(self, workers=None, max_pending=None, batch_window=None):
+        """AI 프로세스 풀 크기와 대기 중인 AI 작업 상한 설정
+        (batch_window(초)를 주면 프로세스 풀 대신 묶음 서비스로 탐색)"""
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.batch = None
+        if batch_window is None:
+            self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+        else:
+            self.batch = BatchAIService(batch_window)
+        self.pending = asyncio.Semaphore(
+            max_pending or (self.batch.max_batch if self.batch else self.workers * 4))
+        self.sessions = {}
+        self.session_ids = itertools.count(1)
+        self.server = None
+        # 연결마다 (처리 태스크, writer) - 종료할 때 연결을 닫고 처리가 끝나기를 기다림
+        self.connections = {}
+
+    async def start(self, host='127.0.0.1', port=0):
+        """연결 받기 시작 (port 0이면 빈 포트) - 실제 포트 반환"""
+        self.server = await asyncio.start_server(self.handle_connection, host, port)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        """연결 받기를 멈추고, 열린 연결을 닫은 뒤 AI 풀 종료"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in self.connections.values():
+            writer.close()
+        await asyncio.gather(*self.connections, return_exceptions=True)
+        if self.batch is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.batch.close)
+        else:
+            self.executor.shutdown()
+
+    async def handle_connection(self, reader, writer):
+        """연결 하나의 요청을 차례로 처리"""
+        task = asyncio.current_task()
+        self.connections[task] = writer
+        requests = set()
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    break
+                if not isinstance(request, dict):
+                    break
+                request_task = asyncio.create_task(self.reply(writer, request))
+                requests.add(request_task)
+                request_task.add_done_callback(requests.discard)
+            await asyncio.gather(*requests, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            del self.connections[task]
+            writer.close()
+
+    async def reply(self, writer, request):
+        """요청 하나를 처리하고 응답 프레임 쓰기 (처리 중 예외가 나도 오류 응답은 보냄)"""
+        try:
+            response = await self.handle_request(request)
+        except Exception as error:
+            response = {'ok': False, 'error': "서버 오류: {}".format(error)}
+        if 'id' in request:
+            response['id'] = request['id']
+        if not writer.is_closing():
+            write_frame(writer, response)
+            await writer.drain()
+
+    async def handle_request(self, request):
+        """요청 하나 처리 -> 응답 객체"""
+        try:
+            op = request.get('op')
+            if op == 'new':
+                return self.new_session(request)
+            session = self.sessions.get(request.get('session'))
+            if session is None:
+                return {'ok': False, 'error': "없는 세션"}
+            if op == 'move':
+                return await self.move(session, int(request['x']), int(request['y']))
+            if op == 'state':
+                return {'ok': True, 'moves': session.moves, 'winner': session.winner,
+                        'over': session.over}
+            if op == 'close':
+                del self.sessions[request['session']]
+                return {'ok': True}
+            return {'ok': False, 'error': "알 수 없는 요청: {}".format(op)}
+        except (KeyError, TypeError, ValueError) as error:
+            return {'ok': False, 'error': "잘못된 요청: {}".format(error)}
+
+    def new_session(self, request):
+        """새 대국 세션 만들기"""
+        size = int(request.get('size', 15))
+        if not 5 <= size <= MAX_SIZE:
+            return {'ok': False, 'error': "보드 크기는 5~{}".format(MAX_SIZE)}
+        depth = min(max(int(request.get('depth', 1)), 0), MAX_DEPTH)
+        session = GameSession(size, check_rule(request.get('rule', RULE_STANDARD)),
+                              bool(request.get('ai', True)), depth)
+        session_id = next(self.session_ids)
+        self.sessions[session_id] = session
+        return {'ok': True, 'session': session_id}
+
+    async def move(self, session, x, y):
+        """사람의 수를 두고, AI 대국이면 AI 수까지 두어 응답"""
+        async with session.lock:
+            error = session.check_move(x, y)
+            if error:
+                return {'ok': False, 'error': error}
+            session.play(x, y)
+
+            ai_move = None
+            if session.ai and not session.over:
+                try:
+                    ai_move = await self.ai_move(session)
+                except Exception as error:
+                    session.undo()
+                    return {'ok': False, 'error': "AI 수 계산 실패: {}".format(error)}
+                if ai_move is not None:
+                    session.play(*ai_move)
+            return {'ok': True, 'ai_move': ai_move, 'winner': session.winner,
+                    'over': session.over, 'ply': len(session.moves)}
+
+    async def ai_move(self, session):
+        """세션의 AI 수 탐색 (프로세스 풀이 깨졌으면 새 풀로 바꾼 뒤 예외를 다시 던짐)"""
+        async with self.pending:
+            if self.batch is not None:
+                ai_move, _ = await asyncio.wrap_future(self.batch.submit(
+                    session.board, session.current_player(), session.depth))
+                return ai_move
+            executor = self.executor
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    executor, _ai_move,
+                    (session.size, session.rule, list(session.moves), session.depth))
+            except BrokenProcessPool:
+                # 같은 풀을 기다리던 다른 요청이 이미 바꿨으면 그대로 둠
+                if self.executor is executor:
+                    executor.shutdown(wait=False)
+                    self.executor = ProcessPoolExecutor(self.workers, initializer=_init_worker)
+                raise
+
+
+async def serve(host, port, workers, batch_window=None):
+    """서버를 띄우고 끝날 때까지 실행"""
+    server = GameServer(workers, batch_window=batch_window)
+    port = await server.start(host, port)
+    if server.batch is not None:
+        print("대국 서버: {}:{} (AI 묶음 처리, 모으는 시간 {:g}ms)".format(
+            host, port, batch_window * 1000))
+    else:
+        print("대국 서버: {}:{} (AI 워커 {}개)".format(host, port, server.workers))
+    try:
+        await server.server.serve_forever()
+    finally:
+        await server.close()
+
+
+def main():
+    """서버 명령줄 진입점"""
+    parser = argparse.ArgumentParser(description="오목 asyncio 대국 서버")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=9000)
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="AI 워커 프로세스 수")
+    parser.add_argument('--batch', type=float, metavar='MS',
+                        help="프로세스 풀 대신 세션들의 AI 탐색을 묶어 처리 (요청을 모으는 시간, ms)")
+    args = parser.parse_args()
+    batch_window = args.batch / 1000 if args.batch is not None else None
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers, batch_window))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
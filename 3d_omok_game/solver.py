@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 증명수 탐색 (df-pn) 해결기
+
+추정 점수 대신 국면의 정확한 결과 (둘 차례 기준 승리 / 패배 / 무승부) 를 증명한다.
+"공격자가 이기는가"를 묻는 df-pn 탐색을 양쪽에 대해 한 번씩 하고,
+둘 다 반증되면 무승부이다.
+
+    - 공격자 노드는 OR, 수비자 노드는 AND. 증명수/반증수는 공격자 승리 기준이다.
+    - 바로 5를 만들 수 있으면 승리, 상대의 5 자리가 둘이면 패배, 하나면 그 자리만 본다.
+    - 공격자에게 이길 수 있는 5칸 창이 남지 않으면 바로 반증 (보드의 창 수 사용).
+    - 자유룰에서는 양쪽 모두의 5칸 창에 들지 않는 칸은 한 수 쉬는 것과 같으므로 보지 않는다.
+    - 탐색표는 항목 수 제한이 있고, 가득 차면 작업량이 작은 절반을 지운다.
+      증명 결과도 같은 수까지만 두고, 가득 차면 먼저 기록한 절반을 지운다.
+    - 증명된 결과는 정규형 해시 키로 압축 파일에 저장해 다음 실행에서 바로 쓴다.
+
+파일 형식: [헤더 'PN', 버전, 항목 수] + 항목마다 (키 8바이트, 결과 1바이트, 정규형 수 2바이트)
+
+사용 예:
+    python solver.py 7 --budget 200000
+    python solver.py 9 --moves "4,4 4,5 5,5" --save solver_results.bin
+"""
+
+import os
+import struct
+import argparse
+import numpy as np
+from board import Board
+from patterns import FREE_FIVES_ARRAY, THREAT_FIVE
+from rules import RULE_STANDARD, RULES, classify_moves
+from transposition import position_key, size_key, encode_move, decode_move, NO_MOVE, SIDE_KEY
+
+# 결과 (둘 차례 기준)
+RESULT_UNKNOWN = 0
+RESULT_WIN = 1
+RESULT_LOSS = 2
+RESULT_DRAW = 3
+RESULT_NAMES = {RESULT_UNKNOWN: 'unknown', RESULT_WIN: 'win',
+                RESULT_LOSS: 'loss', RESULT_DRAW: 'draw'}
+
+# 증명수/반증수의 무한대
+INFINITY = 1 << 30
+PROVEN = (0, INFINITY)
+DISPROVEN = (INFINITY, 0)
+
+# 같은 국면이라도 규칙과 공격자가 다르면 다른 항목
+RULE_KEYS = {rule: (0x5DEECE66D * (i + 1) * 0x9E3779B97F4A7C15) & ((1 << 64) - 1)
+             for i, rule in enumerate(RULES)}
+ATTACKER_KEYS = [None, 0xD1B54A32D192ED03, 0x8CB92BA72F3D8DD7]
+
+RESULTS_MAGIC = b'PN'
+RESULTS_VERSION = 2
+RESULTS_HEADER = struct.Struct('<2sBI')
+RESULTS_ENTRY = struct.Struct('<QBH')
+STORED_NO_MOVE = 0xFFFF
+
+# 이보다 작은 하위 트리에서 증명된 결과는 다시 푸는 편이 싸므로 저장하지 않음
+MIN_SAVED_WORK = 16
+
+
+class ProofSolver:
+    """df-pn 해결기 (path를 주면 증명 결과를 파일에서 읽고 save()로 저장)"""
+
+    def __init__(self, path=None, max_entries=200000, node_budget=100000):
+        """해결기 초기화"""
+        self.path = path
+        self.max_entries = max_entries
+        self.node_budget = node_budget
+
+        # 증명된 국면 {키: (결과, 정규형 수 번호)} 와 탐색표 {키: (증명수, 반증수, 작업량)}
+        self.results = {}
+        self.table = {}
+        self.nodes = 0
+        self.budget = node_budget
+        if path:
+            self.load()
+
+    def solve(self, board, player, node_budget=None):
+        """(결과, 수) - 결과는 player 기준 RESULT_*, 수는 이기거나 비기는 수 (없으면 None)"""
+        if board.live_windows[1] is None:
+            raise ValueError("크기 제한이 없는 보드는 증명할 수 없습니다")
+        self.nodes = 0
+        stored = self.lookup(board, player)
+        if stored is not None:
+            return stored
+
+        board = board.copy()
+        self.budget = node_budget if node_budget is not None else self.node_budget
+
+        # player가 이기는지
+        if self._prove(board, player, player) == PROVEN:
+            return self._finish(board, player, RESULT_WIN,
+                                self._find_child(board, player, player, 0))
+        win_disproven = self.table_value(board, player, player) == DISPROVEN
+
+        # 상대가 이기는지 (반증되면 그 반증을 주는 수가 비기는 수)
+        lose = self._prove(board, player, 3 - player)
+        if lose == PROVEN:
+            return self._finish(board, player, RESULT_LOSS, None)
+        if lose == DISPROVEN and win_disproven:
+            return self._finish(board, player, RESULT_DRAW,
+                                self._find_child(board, player, 3 - player, 1))
+        return RESULT_UNKNOWN, None
+
+    def _prove(self, board, player, attacker):
+        """attacker 승리를 묻는 df-pn 탐색 - 루트의 (증명수, 반증수)"""
+        return self._mid(board, player, attacker, INFINITY, INFINITY)
+
+    def _finish(self, board, player, result, move):
+        """루트 결과 기록 후 반환"""
+        self.record(board, player, result, move)
+        return result, move
+
+    def _mid(self, board, player, attacker, thpn, thdn):
+        """임계값을 넘거나 노드 예산을 다 쓸 때까지 한 노드를 확장 (df-pn MID)"""
+        self.nodes += 1
+        start = self.nodes
+        key = self.table_key(board, player, attacker)
+        value, moves = self._expand(board, player, attacker)
+        if value is not None:
+            self._store(key, *value, 1)
+            return value
+
+        # 자식 값은 돌을 놓지 않고 해시만으로 표에서 읽음
+        or_node = player == attacker
+        opponent = 3 - player
+        children = [self.hash_value(board.canonical_hash_after(*move, player),
+                                    board, opponent, attacker)
+                    for move in moves]
+
+        while True:
+            pn, dn = self._combine(children, or_node)
+            if pn >= thpn or dn >= thdn or self.nodes >= self.budget:
+                break
+            # OR 노드는 증명수, AND 노드는 반증수가 가장 작은 자식으로 내려감
+            axis = 0 if or_node else 1
+            order = sorted(range(len(children)), key=lambda i: children[i][axis])
+            best = order[0]
+            second = children[order[1]][axis] if len(order) > 1 else INFINITY
+            child_pn, child_dn = children[best]
+            if or_node:
+                child_thpn = min(thpn, second + 1)
+                child_thdn = min(INFINITY, thdn - dn + child_dn)
+            else:
+                child_thdn = min(thdn, second + 1)
+                child_thpn = min(INFINITY, thpn - pn + child_pn)
+            board.place_stone(*moves[best], player)
+            children[best] = self._mid(board, opponent, attacker, child_thpn, child_thdn)
+            board.remove_stone(*moves[best])
+
+        work = self.nodes - start + 1
+        if pn == 0 and work >= MIN_SAVED_WORK:
+            # 증명된 국면은 공격자 승리로 확정된 결과
+            best_move = moves[children.index(PROVEN)] if or_node else None
+            self.record(board, player, RESULT_WIN if or_node else RESULT_LOSS, best_move)
+        self._store(key, pn, dn, work)
+        return pn, dn
+
+    def _combine(self, children, or_node):
+        """자식들의 (증명수, 반증수) 로 노드 값 계산"""
+        if or_node:
+            return (min(pn for pn, _ in children),
+                    min(INFINITY, sum(dn for _, dn in children)))
+        return (min(INFINITY, sum(pn for pn, _ in children)),
+                min(dn for _, dn in children))
+
+    def _expand(self, board, player, attacker):
+        """(끝난 노드의 값 또는 None, 볼 수 목록)"""
+        or_node = player == attacker
+        # 공격자가 이길 수 있는 창이 없거나 보드가 차면 공격자 실패
+        if not board.live_windows[attacker] or board.is_full():
+            return DISPROVEN, None
+
+        moves = self.generate_moves(board)
+        if not moves:
+            return DISPROVEN, None
+        attack, defense, playable = classify_moves(board, moves, player)
+
+        # 바로 5를 만들면 둘 차례가 승리
+        if ((attack == THREAT_FIVE).any(axis=1) & playable).any():
+            return (PROVEN if or_node else DISPROVEN), None
+
+        # 상대의 5 자리가 둘 이상이면 패배, 하나면 그 자리만 본다
+        blocks = np.flatnonzero((defense == THREAT_FIVE).any(axis=1))
+        if len(blocks) >= 2 or (len(blocks) == 1 and not playable[blocks[0]]):
+            return (DISPROVEN if or_node else PROVEN), None
+        if len(blocks) == 1:
+            return None, [moves[blocks[0]]]
+
+        # 위협이 큰 수부터 (같은 증명수면 먼저 본 수를 고름)
+        priority = attack.sum(axis=1) * 2 + defense.sum(axis=1)
+        order = np.argsort(-priority, kind='stable')
+        moves = [moves[i] for i in order[playable[order]]]
+        if not moves:
+            return DISPROVEN, None  # 둘 수 있는 곳이 모두 금수
+        return None, moves
+
+    def generate_moves(self, board):
+        """볼 수 목록 (자유룰에서는 어느 쪽의 5칸 창에도 들지 않는 칸 제외)
+
+        자유룰에서는 돌이 하나 더 있어서 손해 보는 일이 없으므로, 아무 창에도 들지 않는
+        칸에 두는 수는 다른 어떤 수보다 좋을 수 없다. 금수나 장목이 있는 규칙에서는
+        이 성질이 깨지므로 빈 칸을 모두 본다.
+        돌에서 먼 칸도 아직 돌이 없는 창에 들면 남긴다. 수비 (AND) 노드나 반증 중에
+        그런 응수를 빼면 승리/패배/무승부 증명이 틀릴 수 있다.
+        """
+        moves = board.get_valid_moves()
+        if board.rule != RULE_STANDARD or not moves:
+            return moves
+        windows = board.get_window_matrix(moves)
+        free = FREE_FIVES_ARRAY[1][windows].sum(axis=1) + FREE_FIVES_ARRAY[2][windows].sum(axis=1)
+        return [moves[i] for i in np.flatnonzero(free)]
+
+    def _find_child(self, board, player, attacker, axis):
+        """루트에서 증명수 (axis 0) 또는 반증수 (axis 1) 가 0인 자식 수"""
+        value, moves = self._expand(board, player, attacker)
+        if value is not None:
+            # 끝난 국면: 바로 5를 만드는 수가 있으면 그 수, 아니면 어느 수든 결과가 같음
+            moves = self.generate_moves(board) or board.get_valid_moves()
+            wins = [move for move in moves if board.check_win(*move, player)]
+            return (wins or moves or [None])[0]
+        for move in moves:
+            board.place_stone(*move, player)
+            value = self.table_value(board, 3 - player, attacker)
+            board.remove_stone(*move)
+            if value[axis] == 0:
+                return move
+        return None
+
+    def table_key(self, board, player, attacker):
+        """탐색표 키 (국면, 둘 차례, 규칙, 공격자)"""
+        return self.result_key(board, player)[0] ^ ATTACKER_KEYS[attacker]
+
+    def table_value(self, board, player, attacker):
+        """국면의 (증명수, 반증수)"""
+        return self.hash_value(board.canonical_hash(), board, player, attacker)
+
+    def hash_value(self, canonical_hash, board, player, attacker):
+        """board 위 정규형 해시의 (증명수, 반증수) - 증명 결과, 탐색표, 없으면 (1, 1) 순으로 확인"""
+        key = (canonical_hash ^ size_key(board) ^ (SIDE_KEY if player == 2 else 0) ^
+               RULE_KEYS[board.rule])
+        stored = self.results.get(key)
+        if stored is not None:
+            if stored[0] == RESULT_DRAW:
+                return DISPROVEN
+            winner = player if stored[0] == RESULT_WIN else 3 - player
+            return PROVEN if winner == attacker else DISPROVEN
+        entry = self.table.get(key ^ ATTACKER_KEYS[attacker])
+        return entry[:2] if entry is not None else (1, 1)
+
+    def _store(self, key, pn, dn, work):
+        """탐색표 저장 (가득 차면 작업량이 작은 절반을 지움)"""
+        if key not in self.table and len(self.table) >= self.max_entries:
+            works = sorted(entry[2] for entry in self.table.values())
+            cutoff = works[len(works) // 2]
+            self.table = {k: entry for k, entry in self.table.items() if entry[2] > cutoff}
+        self.table[key] = (pn, dn, work)
+
+    def result_key(self, board, player):
+        """증명 결과 키와 정규형 변환 번호"""
+        key, transform = position_key(board, player)
+        return key ^ RULE_KEYS[board.rule], transform
+
+    def lookup(self, board, player):
+        """저장된 (결과, 수) 또는 None"""
+        key, transform = self.result_key(board, player)
+        entry = self.results.get(key)
+        if entry is None:
+            return None
+        return entry[0], decode_move(board, entry[1], transform)
+
+    def record(self, board, player, result, move):
+        """증명 결과 기록 (수는 정규형 칸 번호로 저장)"""
+        key, transform = self.result_key(board, player)
+        self._store_result(key, (result, encode_move(board, move, transform)))
+
+    def _store_result(self, key, value):
+        """증명 결과 저장 (가득 차면 먼저 기록한 절반을 지움)"""
+        if key not in self.results and len(self.results) >= self.max_entries:
+            for old in list(self.results)[:len(self.results) // 2]:
+                del self.results[old]
+        self.results[key] = value
+
+    def load(self):
+        """결과 파일 읽기 (없거나 형식이 다르면 무시)"""
+        try:
+            with open(self.path, 'rb') as stream:
+                data = stream.read()
+        except OSError:
+            return
+        if len(data) < RESULTS_HEADER.size:
+            return
+        magic, version, count = RESULTS_HEADER.unpack_from(data)
+        if (magic != RESULTS_MAGIC or version != RESULTS_VERSION or
+                len(data) < RESULTS_HEADER.size + count * RESULTS_ENTRY.size):
+            return
+        for key, result, move in RESULTS_ENTRY.iter_unpack(
+                data[RESULTS_HEADER.size:RESULTS_HEADER.size + count * RESULTS_ENTRY.size]):
+            self._store_result(key, (result, NO_MOVE if move == STORED_NO_MOVE else move))
+
+    def save(self):
+        """결과 파일 저장 (파일의 기존 결과와 합쳐 임시 파일에 쓴 뒤 교체)"""
+        if not self.path:
+            return
+        merged = ProofSolver(self.path, self.max_entries)
+        for key, value in self.results.items():
+            merged._store_result(key, value)
+        self.results = merged = merged.results
+        entries = [RESULTS_ENTRY.pack(key, result,
+                                      move if 0 <= move < STORED_NO_MOVE else STORED_NO_MOVE)
+                   for key, (result, move) in merged.items()]
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'wb') as stream:
+            stream.write(RESULTS_HEADER.pack(RESULTS_MAGIC, RESULTS_VERSION, len(entries)))
+            stream.write(b''.join(entries))
+        os.replace(temp_path, self.path)
+
+
+def parse_moves(text):
+    """"x,y x,y ..." 형식의 수순을 좌표 목록으로 변환"""
+    return [tuple(int(value) for value in token.split(',')) for token in text.split()]
+
+
+def main():
+    """명령줄 해결기"""
+    parser = argparse.ArgumentParser(description="df-pn 오목 해결기")
+    parser.add_argument('size', type=int, help="보드 크기 (NxN)")
+    parser.add_argument('--moves', default='', help='흑부터 번갈아 둔 수순 ("x,y x,y ...")')
+    parser.add_argument('--rule', default=RULE_STANDARD, choices=RULES)
+    parser.add_argument('--budget', type=int, default=100000, help="노드 예산")
+    parser.add_argument('--entries', type=int, default=200000, help="탐색표 최대 항목 수")
+    parser.add_argument('--save', default=None, help="증명 결과 파일")
+    args = parser.parse_args()
+
+    board = Board(args.size, args.size, args.rule)
+    player = 1
+    for x, y in parse_moves(args.moves):
+        board.place_stone(x, y, player)
+        player = 3 - player
+
+    solver = ProofSolver(args.save, args.entries, args.budget)
+    result, move = solver.solve(board, player)
+    print("{}: {} (수: {}, 노드 {}, 저장된 결과 {})".format(
+        "흑" if player == 1 else "백", RESULT_NAMES[result], move,
+        solver.nodes, len(solver.results)))
+    solver.save()
+
+
+if __name__ == "__main__":
+    main()
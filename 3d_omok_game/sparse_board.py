@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 희소 보드 (큰 보드와 무한 보드용)
+
+칸 배열 없이 놓인 돌의 좌표만 해시로 보관하고, 돌 주변 칸의 방향별
+패턴 창 번호만 색인으로 유지한다. 모든 연산의 비용이 보드 넓이가 아니라
+돌 개수에 비례하므로 100x100 보드나 크기 제한이 없는 보드에서도 쓸 수 있다.
+"""
+
+from board import (Board, DIRECTIONS, get_symmetries, transform_point, check_rule,
+                   count_five_windows)
+from rules import RULE_STANDARD
+from patterns import WALL, FREE_FIVES
+
+# 무한 보드 좌표를 정수 번호로 바꿀 때의 기준 (±524287 까지)
+CELL_BITS = 20
+CELL_OFFSET = 1 << (CELL_BITS - 1)
+
+_MASK64 = (1 << 64) - 1
+
+# 이보다 칸이 많은 보드는 희소 보드로 만든다 (게임과 기보 재생이 같은 보드 종류를 쓰도록 공유)
+SPARSE_BOARD_CELLS = 40 * 40
+
+
+def cell_key(player, x, y):
+    """칸과 플레이어의 조브리스트 키 (splitmix64로 좌표에서 바로 계산)"""
+    z = ((x & 0xFFFFFFFF) << 32 | (y & 0xFFFFFFFF)) ^ (player * 0x632BE59BD9B4E019)
+    z = (z + 0x9E3779B97F4A7C15) & _MASK64
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return z ^ (z >> 31)
+
+
+class SparseBoard(Board):
+    """희소 오목판 클래스 (rows, cols가 None이면 크기 제한 없음)"""
+
+    def __init__(self, rows=None, cols=None, rule=RULE_STANDARD):
+        """보드 초기화"""
+        self.rows = rows
+        self.cols = cols
+        self.rule = check_rule(rule)
+        self.bounded = rows is not None and cols is not None
+        self.move_count = 0
+        self.stones = {}
+
+        # 돌 주변 칸의 방향별 패턴 창 번호 {(x, y): [가로, 세로, 우하, 우상]}
+        self.windows = {}
+
+        # 크기 제한이 없으면 대칭 변환은 항등 변환만 사용
+        self.symmetries = get_symmetries(rows, cols) if self.bounded else (0,)
+        self.hashes = [0] * 8
+
+        # 플레이어별 아직 5를 만들 수 있는 5칸 창 수 (크기 제한이 없으면 무한하므로 세지 않음)
+        window_count = count_five_windows((cols, rows), DIRECTIONS) if self.bounded else None
+        self.live_windows = [None, window_count, window_count]
+
+    def in_bounds(self, x, y):
+        """보드 안의 칸인지 확인"""
+        return not self.bounded or (0 <= x < self.cols and 0 <= y < self.rows)
+
+    def is_valid_move(self, x, y):
+        """유효한 수인지 확인"""
+        return self.in_bounds(x, y) and (x, y) not in self.stones
+
+    def place_stone(self, x, y, player):
+        """돌을 놓는 함수"""
+        if self.is_valid_move(x, y):
+            self.stones[(x, y)] = player
+            self.move_count += 1
+            self._update_hashes(x, y, player)
+            if self.bounded:
+                self._update_viability(x, y, player, 1)
+            self._update_windows(x, y, player)
+            return True
+        return False
+
+    def remove_stone(self, x, y):
+        """놓인 돌을 되돌리는 함수 (탐색용)"""
+        player = self.stones.pop((x, y), None)
+        if player is None:
+            return False
+        self.move_count -= 1
+        self._update_hashes(x, y, player)
+        self._update_windows(x, y, player)
+        if self.bounded:
+            self._update_viability(x, y, player, -1)
+        return True
+
+    def _update_viability(self, x, y, player, step):
+        """상대가 이길 수 있는 5칸 창 수 갱신 (놓기는 돌을 넣기 전, 빼기는 돌을 뺀 뒤 호출)"""
+        free = FREE_FIVES[player]
+        changed = sum(free[window] for window in self.get_windows(x, y))
+        self.live_windows[3 - player] -= step * changed
+
+    def is_dead(self):
+        """두 플레이어 모두 5를 만들 수 있는 창이 없는지 (크기 제한이 없으면 항상 False)"""
+        return self.bounded and Board.is_dead(self)
+
+    def _update_hashes(self, x, y, player):
+        """대칭 해시 갱신 (놓기와 빼기 모두 XOR 한 번)"""
+        for t in self.symmetries:
+            tx, ty = transform_point(x, y, t, self.cols, self.rows)
+            self.hashes[t] ^= cell_key(player, tx, ty)
+
+    def _update_windows(self, x, y, player):
+        """(x, y)를 창에 포함하는 주변 칸들의 패턴 창 번호를 XOR"""
+        windows = self.windows
+        for direction, (dx, dy) in enumerate(DIRECTIONS):
+            for k in range(-4, 5):
+                cx, cy = x - k * dx, y - k * dy
+                if not self.in_bounds(cx, cy):
+                    continue
+                cell = windows.get((cx, cy))
+                if cell is None:
+                    cell = windows[(cx, cy)] = self._base_windows(cx, cy)
+                cell[direction] ^= player << (2 * (4 + k))
+
+    def _base_windows(self, x, y):
+        """돌이 없을 때의 패턴 창 번호 (보드 가장자리 근처만 보드 밖 칸 표시)"""
+        if (not self.bounded or
+                (4 <= x < self.cols - 4 and 4 <= y < self.rows - 4)):
+            return [0, 0, 0, 0]
+        windows = []
+        for dx, dy in DIRECTIONS:
+            window = 0
+            for k in range(-4, 5):
+                if not self.in_bounds(x + k * dx, y + k * dy):
+                    window |= WALL << (2 * (4 + k))
+            windows.append(window)
+        return windows
+
+    def canonical_hash_after(self, x, y, player):
+        """(x, y)에 player가 둔 뒤의 정규형 해시 (돌을 놓지 않고 계산)"""
+        return min(self.hashes[t] ^ cell_key(player, *transform_point(x, y, t, self.cols, self.rows))
+                   for t in self.symmetries)
+
+    def get_window(self, x, y, direction):
+        """(x, y) 중심 한 방향 9칸 패턴 창 번호"""
+        return self.get_windows(x, y)[direction]
+
+    def get_windows(self, x, y):
+        """(x, y) 중심 네 방향 패턴 창 번호 목록"""
+        windows = self.windows.get((x, y))
+        if windows is None:
+            return self._base_windows(x, y)
+        return windows
+
+    def get(self, x, y):
+        """칸의 값 (0: 빈 칸, 1: 흑, 2: 백)"""
+        return self.stones.get((x, y), 0)
+
+    def encode_cell(self, x, y):
+        """칸 좌표를 정수 번호로 변환 (치환표의 수 저장용)"""
+        if self.bounded:
+            return y * self.cols + x
+        return ((y + CELL_OFFSET) << CELL_BITS) | (x + CELL_OFFSET)
+
+    def decode_cell(self, index):
+        """정수 번호를 칸 좌표로 변환"""
+        if self.bounded:
+            return index % self.cols, index // self.cols
+        mask = (1 << CELL_BITS) - 1
+        return (index & mask) - CELL_OFFSET, (index >> CELL_BITS) - CELL_OFFSET
+
+    def center(self):
+        """보드 중앙 좌표 (크기 제한이 없으면 원점)"""
+        if self.bounded:
+            return self.cols // 2, self.rows // 2
+        return 0, 0
+
+    def is_full(self):
+        """보드가 가득 찼는지 확인"""
+        return self.bounded and self.move_count >= self.rows * self.cols
+
+    def get_candidate_moves(self, distance=2):
+        """놓인 돌에서 distance 칸 이내의 빈 칸들 (빈 보드면 중앙)"""
+        if not self.stones:
+            return [self.center()]
+
+        candidates = {}
+        for sx, sy in self.stones:
+            for y in range(sy - distance, sy + distance + 1):
+                for x in range(sx - distance, sx + distance + 1):
+                    if (x, y) not in self.stones and self.in_bounds(x, y):
+                        candidates[(x, y)] = True
+        return list(candidates)
+
+    def get_valid_moves(self):
+        """유효한 수들의 리스트 반환
+
+        크기 제한이 없으면 모든 빈 칸을 셀 수 없으므로 돌 주변 후보 수를 돌려준다.
+        """
+        if not self.bounded:
+            return self.get_candidate_moves()
+        return [(x, y) for y in range(self.rows) for x in range(self.cols)
+                if (x, y) not in self.stones]
+
+    def copy(self):
+        """보드 복사"""
+        new_board = SparseBoard(self.rows, self.cols, self.rule)
+        new_board.move_count = self.move_count
+        new_board.stones = self.stones.copy()
+        new_board.windows = {cell: windows[:] for cell, windows in self.windows.items()}
+        new_board.hashes = self.hashes[:]
+        new_board.live_windows = self.live_windows[:]
+        return new_board
+
+    def print_board(self):
+        """돌이 있는 영역만 출력 (디버깅용)"""
+        if not self.stones:
+            print()
+            return
+        xs = [x for x, _ in self.stones]
+        ys = [y for _, y in self.stones]
+        for y in range(min(ys), max(ys) + 1):
+            print(' '.join('.' if self.get(x, y) == 0 else '●' if self.get(x, y) == 1 else '○'
+                           for x in range(min(xs), max(xs) + 1)))
+        print()
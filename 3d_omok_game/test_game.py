@@ -6,6 +6,7 @@
 
 import sys
 import os
+import random
 
 # 현재 디렉토리를 Python 경로에 추가
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
@@ -66,12 +67,33 @@ def test_ai():
     move = ai.get_best_move(board, 2)
     assert move is not None, "AI가 수를 찾지 못함"
     assert board.is_valid_move(move[0], move[1]), "AI가 유효하지 않은 수를 선택"
+    
+    # 쉬운 난이도는 돌 주변이 아니라 빈 칸 전체에서 고르고, 큰 보드에서도 보드를 훑지 않음
+    from sparse_board import SparseBoard
+    random.seed(5)
+    moves = {ai.get_best_move(board, 2) for _ in range(200)}
+    assert all(board.is_valid_move(*move) for move in moves)
+    assert any(max(abs(x - 7), abs(y - 7)) > 2 for x, y in moves), "후보 수 안에서만 고름"
+    huge = SparseBoard(1000, 1000)
+    huge.place_stone(500, 500, 1)
+    assert huge.is_valid_move(*ai.get_best_move(huge, 2))
+    full = Board(5, 5)
+    for y in range(5):
+        for x in range(5):
+            if (x, y) != (4, 4):
+                full.place_stone(x, y, 1 + (x + 2 * y) % 2)
+    assert ai.get_best_move(full, 2) == (4, 4), "빈 칸이 적을 때 훑기 실패"
     print("✅ 쉬운 난이도 AI 테스트 성공")
     
     # 보통 난이도 테스트
     ai.set_difficulty("medium")
     move = ai.get_best_move(board, 2)
     assert move is not None, "AI가 수를 찾지 못함"
+    # 이기거나 막을 자리가 없으면 돌에서 먼 중앙 근처를 고름
+    corner = Board(15, 15)
+    corner.place_stone(0, 0, 1)
+    moves = {ai.get_best_move(corner, 2) for _ in range(50)}
+    assert all(abs(x - 7) + abs(y - 7) <= 3 for x, y in moves), "중앙 근처를 고르지 않음"
     print("✅ 보통 난이도 AI 테스트 성공")
     
     # 어려운 난이도 테스트 (시간이 오래 걸릴 수 있음)
@@ -107,6 +129,1160 @@ def test_win_scenarios():
     
     print("🎉 승리 시나리오 테스트 완료!\n")
 
+def test_search():
+    """PVS 탐색 테스트"""
+    print("🧠 탐색 테스트 시작...")
+    
+    ai = AIPlayer()
+    ai.set_difficulty("hard")
+    
+    # 흑 4개가 있으면 흑은 5를 완성해야 함
+    board = Board(15, 15)
+    for i in range(4):
+        board.place_stone(5 + i, 7, 1)
+        board.place_stone(5 + i, 9, 2)
+    move, score = ai.search(board, 1, 2)
+    assert move in [(4, 7), (9, 7)] and ai.is_win_score(score), "승리 수 탐색 실패"
+    print("✅ 승리 수 탐색 성공")
+    
+    # 백 차례에 흑의 열린 3은 깊이 0에서도 정지 탐색으로 막아야 함
+    board = Board(15, 15)
+    for i in range(3):
+        board.place_stone(6 + i, 7, 1)
+    board.place_stone(7, 8, 2)
+    board.place_stone(3, 3, 2)
+    move, _ = ai.search(board, 2, 0)
+    assert move in [(5, 7), (9, 7), (4, 7), (10, 7)], "열린 3 방어 실패"
+    print("✅ 열린 3 방어 성공")
+    
+    # 반드시 막아야 하는 4
+    board = Board(15, 15)
+    for i in range(4):
+        board.place_stone(3 + i, 3 + i, 2)
+    board.place_stone(2, 2, 1)
+    board.place_stone(7, 8, 1)
+    assert ai.get_best_move(board, 1) == (7, 7), "4 방어 실패"
+    print("✅ 4 방어 성공")
+    
+    # 루트에 둘 수 있는 수가 없어도 (모두 금수) 애스피레이션 재탐색이 끝나야 함
+    stuck = AIPlayer()
+    stuck.order_candidates = lambda threats, first_move=None, limit=None: []
+    assert stuck.search(board, 1, 2) == (None, -AIPlayer.INFINITY), "빈 루트 탐색 실패"
+    print("✅ 빈 루트 탐색 성공")
+    
+    print("🎉 탐색 테스트 완료!\n")
+
+def test_patterns():
+    """라인 패턴 조회표 테스트"""
+    print("🧩 패턴 조회표 테스트 시작...")
+    
+    from patterns import (THREAT, RUN_CLASS, THREAT_OPEN_FOUR, THREAT_FOUR,
+                          THREAT_OPEN_THREE, THREAT_FIVE, run_class)
+    
+    board = Board(15, 15)
+    for x in (5, 6, 7):
+        board.place_stone(x, 7, 1)
+    # _XXX_ 옆에 두면 열린 4, 한쪽이 막히면 4
+    assert THREAT[1][board.get_window(8, 7, 0)] == THREAT_OPEN_FOUR
+    board.place_stone(8, 7, 2)
+    assert THREAT[1][board.get_window(4, 7, 0)] == THREAT_FOUR
+    # 떨어진 3 (X_XX) 을 만드는 수는 열린 3
+    board.place_stone(5, 9, 1)
+    board.place_stone(7, 9, 1)
+    assert THREAT[1][board.get_window(8, 9, 0)] == THREAT_OPEN_THREE
+    # 중심 돌의 연속 개수와 막힌 쪽 수
+    assert RUN_CLASS[board.get_window(6, 7, 0)] == run_class(3, 1)
+    board.place_stone(4, 7, 1)
+    assert RUN_CLASS[board.get_window(6, 7, 0)] == run_class(4, 1)
+    assert THREAT[1][board.get_window(3, 7, 0)] == THREAT_FIVE
+    print("✅ 위협 등급 분류 성공")
+    
+    # 돌을 빼면 라인 정수가 원래대로 돌아와야 함
+    empty = Board(15, 15)
+    for x, y in list(board.stones):
+        board.remove_stone(x, y)
+    assert board.lines == empty.lines and board.get_hash() == 0
+    print("✅ 라인 정수 되돌리기 성공")
+    
+    print("🎉 패턴 조회표 테스트 완료!\n")
+
+def test_sparse_board():
+    """희소 보드 테스트"""
+    print("🌌 희소 보드 테스트 시작...")
+    
+    from sparse_board import SparseBoard
+    
+    # 같은 수순이면 일반 보드와 패턴 창/평가가 같아야 함
+    moves = [(7, 7, 1), (8, 8, 2), (0, 0, 1), (14, 3, 2), (6, 7, 1), (5, 7, 1)]
+    dense, sparse = Board(15, 15), SparseBoard(15, 15)
+    for x, y, player in moves:
+        dense.place_stone(x, y, player)
+        sparse.place_stone(x, y, player)
+    for y in range(15):
+        for x in range(15):
+            assert dense.get_windows(x, y) == sparse.get_windows(x, y), "패턴 창 불일치"
+    ai = AIPlayer()
+    assert ai.evaluate_board(dense, 1) == ai.evaluate_board(sparse, 1), "평가 불일치"
+    assert not sparse.is_valid_move(15, 0), "보드 밖 수가 유효함"
+    print("✅ 크기 제한 희소 보드 성공")
+    
+    # 크기 제한 없는 보드: 음수 좌표, 승리 판정, AI 방어
+    board = SparseBoard()
+    assert board.is_valid_move(-100000, 250000)
+    for i in range(4):
+        board.place_stone(-500 + i, 1000, 1)
+    board.place_stone(-501, 1000, 2)
+    assert board.check_win(-496, 1000, 1), "무한 보드 승리 판정 실패"
+    ai.set_difficulty("hard")
+    assert ai.get_best_move(board, 2) == (-496, 1000), "무한 보드 AI 방어 실패"
+    ai.set_difficulty("medium")
+    assert ai.get_best_move(board, 1) == (-496, 1000), "무한 보드 AI 승리 실패"
+    print("✅ 무한 보드 성공")
+    
+    print("🎉 희소 보드 테스트 완료!\n")
+
+def test_symmetry_hash():
+    """대칭 정규형 해시 테스트"""
+    print("🔄 대칭 해시 테스트 시작...")
+    
+    from board import transform_point
+    
+    stones = [(3, 4, 1), (7, 7, 2), (10, 2, 1), (0, 14, 2)]
+    board = Board(15, 15)
+    for x, y, player in stones:
+        board.place_stone(x, y, player)
+    canonical_hash, transform = board.get_canonical()
+    
+    # 8가지 대칭 국면 모두 같은 정규형 해시를 가져야 함
+    for t in range(8):
+        sym_board = Board(15, 15)
+        for x, y, player in stones:
+            tx, ty = transform_point(x, y, t, 15, 15)
+            sym_board.place_stone(tx, ty, player)
+        sym_hash, sym_transform = sym_board.get_canonical()
+        assert sym_hash == canonical_hash, "대칭 국면의 정규형 해시 불일치"
+        
+        # 정규형 좌표로 옮긴 수는 같은 칸이어야 함
+        tx, ty = transform_point(3, 4, t, 15, 15)
+        assert (sym_board.to_canonical(tx, ty, sym_transform) ==
+                board.to_canonical(3, 4, transform)), "정규형 좌표 불일치"
+        assert sym_board.from_canonical(*sym_board.to_canonical(tx, ty, sym_transform),
+                                        sym_transform) == (tx, ty), "역변환 실패"
+    print("✅ 8방향 대칭 해시 일치")
+    
+    # 다른 국면은 다른 해시
+    other = board.copy()
+    other.place_stone(5, 5, 1)
+    assert other.canonical_hash() != canonical_hash, "다른 국면의 해시가 같음"
+    print("✅ 국면 구분 성공")
+    
+    print("🎉 대칭 해시 테스트 완료!\n")
+
+def test_game_record():
+    """기보 저장소 테스트"""
+    print("📼 기보 저장소 테스트 시작...")
+    
+    import io
+    import tempfile
+    from board import transform_point
+    from sparse_board import SparseBoard
+    from game_record import GameRecord, GameRecordStore, export_text, read_text
+    from rules import RULE_STANDARD, RULE_RENJU
+    
+    # 1바이트/2바이트 인코딩 왕복
+    small = GameRecord(15, 15, [(7, 7), (8, 8), (0, 14)], 1)
+    assert len(small.encode()) == 7 + 3, "15x15 기보는 수당 1바이트여야 함"
+    assert GameRecord.read_from(io.BytesIO(small.encode())).moves == small.moves
+    large = GameRecord(40, 40, [(39, 20), (0, 0)], 2)
+    assert len(large.encode()) == 7 + 4, "큰 보드 기보는 수당 2바이트여야 함"
+    assert GameRecord.read_from(io.BytesIO(large.encode())).moves == large.moves
+    # 한 변이 255칸을 넘는 보드는 넓은 헤더, 칸이 65536개 이상이면 수당 4바이트
+    for rows, cols, size in [(300, 200, 11 + 4), (300, 300, 11 + 8), (1000, 1000, 11 + 8)]:
+        huge = GameRecord(rows, cols, [(cols - 1, rows - 1), (0, rows - 1)], 1)
+        assert len(huge.encode()) == size, "{}x{} 기보 크기".format(rows, cols)
+        copy = GameRecord.read_from(io.BytesIO(huge.encode()))
+        assert (copy.rows, copy.cols, copy.moves) == (rows, cols, huge.moves)
+    for rows, cols in [(None, None), (70000, 15), (0, 15)]:
+        try:
+            GameRecord(rows, cols)
+            assert False, "기록할 수 없는 크기를 받음: {}x{}".format(rows, cols)
+        except ValueError:
+            pass
+    print("✅ 기보 인코딩 성공")
+    
+    with tempfile.TemporaryDirectory() as path:
+        store = GameRecordStore(path)
+        # 같은 첫 수를 대칭으로 둔 두 게임과 다른 게임 하나
+        first = store.append(GameRecord(15, 15, [(7, 7), (8, 8), (9, 9)], 1))
+        moves = [transform_point(x, y, 1, 15, 15) for x, y in [(7, 7), (8, 8), (6, 6)]]
+        store.append(GameRecord(15, 15, moves, 2))
+        store.append(GameRecord(15, 15, [(7, 7), (7, 8)], 2))
+        assert store.count_games() == 3
+        assert store.get_record(first).moves == [(7, 7), (8, 8), (9, 9)]
+        
+        board = Board(15, 15)
+        board.place_stone(7, 7, 1)
+        board.place_stone(8, 8, 2)
+        assert len(store.find_games(board)) == 2, "대칭 국면 검색 실패"
+        
+        # 흑 중앙 이후 백의 응수: 대각선 2판(백 1승), 세로 1판(백 승)
+        board = Board(15, 15)
+        board.place_stone(7, 7, 1)
+        stats = dict(((abs(x - 7), abs(y - 7)), (games, wins))
+                     for (x, y), games, wins, _ in store.continuation_stats(board))
+        assert stats == {(1, 1): (2, 1), (0, 1): (1, 1)} or \
+            stats == {(1, 1): (2, 1), (1, 0): (1, 1)}, "대칭 응수 통계 실패"
+        print("✅ 국면 색인 검색 성공")
+        
+        # 텍스트 내보내기/가져오기 왕복
+        text = io.StringIO()
+        assert export_text(store, text) == 3
+        store.close()
+        
+        copy_store = GameRecordStore(path + "/copy")
+        assert copy_store.import_records(read_text(io.StringIO(text.getvalue()))) == 3
+        assert len(copy_store.find_games(board)) == 3
+        copy_store.close()
+        print("✅ 내보내기/가져오기 성공")
+        
+        # 큰 보드 기보도 저장하고 게임과 같은 희소 보드 국면으로 검색
+        big_store = GameRecordStore(path + "/big")
+        game_id = big_store.append(GameRecord(300, 300, [(150, 150), (151, 151), (299, 0)], 1))
+        assert big_store.get_record(game_id).moves == [(150, 150), (151, 151), (299, 0)]
+        board = SparseBoard(300, 300)
+        board.place_stone(150, 150, 1)
+        assert big_store.find_games(board) == [(game_id, 1)]
+        
+        # 희소 보드의 칸 키는 크기와 관계없으므로 크기가 다른 큰 보드의 같은 배치도 색인에서 구분
+        other_id = big_store.append(GameRecord(500, 500, [(2, 4), (3, 4)], 2))
+        small_id = big_store.append(GameRecord(300, 300, [(2, 4), (3, 4)], 1))
+        board, other = SparseBoard(300, 300), SparseBoard(500, 500)
+        for sparse in (board, other):
+            sparse.place_stone(2, 4, 1)
+        assert board.canonical_hash() == other.canonical_hash()
+        assert big_store.find_games(board) == [(small_id, 1)], "크기가 다른 게임이 섞임"
+        assert big_store.find_games(other) == [(other_id, 1)]
+        big_store.close()
+        print("✅ 큰 보드 기보 성공")
+        
+        # 규칙은 헤더와 텍스트에 기록되고, 다른 규칙의 게임은 검색/통계에 섞이지 않음
+        renju = GameRecord(15, 15, [(7, 7), (7, 8)], 2, RULE_RENJU)
+        copy = GameRecord.read_from(io.BytesIO(renju.encode()))
+        assert (copy.rule, copy.winner) == (RULE_RENJU, 2) and len(renju.encode()) == 7 + 2
+        assert GameRecord.from_text(renju.to_text()).rule == RULE_RENJU
+        assert GameRecord.from_text(small.to_text()).rule == RULE_STANDARD
+        rule_store = GameRecordStore(path + "/rules")
+        standard_id = rule_store.append(GameRecord(15, 15, [(7, 7), (8, 8)], 1))
+        renju_id = rule_store.append(renju)
+        board = Board(15, 15)
+        board.place_stone(7, 7, 1)
+        assert rule_store.find_games(board) == [(standard_id, 1)], "다른 규칙 게임이 섞임"
+        assert sum(games for _, games, _, _ in rule_store.continuation_stats(board)) == 1
+        board = Board(15, 15, RULE_RENJU)
+        board.place_stone(7, 7, 1)
+        assert rule_store.find_games(board) == [(renju_id, 1)]
+        rule_store.close()
+        
+        # 옛 형식 색인은 열 때 기보 파일에서 다시 만듦
+        import sqlite3
+        db = sqlite3.connect(os.path.join(path, "rules", "games.idx"))
+        db.execute('PRAGMA user_version = 1')
+        db.execute('DELETE FROM positions')
+        db.commit()
+        db.close()
+        rule_store = GameRecordStore(path + "/rules")
+        assert rule_store.count_games() == 2 and rule_store.find_games(board) == [(renju_id, 1)]
+        rule_store.close()
+        print("✅ 규칙별 기보 색인 성공")
+    
+    print("🎉 기보 저장소 테스트 완료!\n")
+
+def test_analysis():
+    """기보 일괄 분석 테스트"""
+    print("🔍 기보 분석 테스트 시작...")
+    
+    import io
+    import json
+    from game_record import GameRecord, RESULT_DRAW
+    from analyze import analyze_game, run_analysis
+    
+    # 흑이 네 번째 수 뒤 (4, 0) 승리를 놓치는 게임
+    moves = [(0, 0), (0, 6), (1, 0), (1, 6), (2, 0), (2, 6), (3, 0), (6, 3), (6, 6)]
+    record = GameRecord(7, 7, moves, 1)
+    ai = AIPlayer()
+    ai.search_depth = 0
+    annotations = analyze_game(ai, 0, record, 500)
+    assert len(annotations) == len(moves), "수마다 주석이 있어야 함"
+    assert annotations[8]['missed_win'], "놓친 필승 감지 실패"
+    assert annotations[8]['best_move'] == [4, 0], "최선의 수 오류"
+    assert not annotations[0]['missed_win']
+    print("✅ 수별 주석 생성 성공")
+    
+    # 프로세스 풀 분석 결과는 게임마다 한 번씩 모든 수를 포함해야 함
+    output = io.StringIO()
+    tasks = [(i, record) for i in range(4)]
+    games, plies = run_analysis(tasks, output, 2, 0, 500)
+    assert games == 4 and plies == 4 * len(moves)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert sorted(set(line['game'] for line in lines)) == [0, 1, 2, 3]
+    print("✅ 병렬 분석 성공")
+    
+    # 무승부로 정해진 국면 뒤에도 수를 이어 둔 기보는 최선의 수 없이 무승부로 주석
+    black = [(0, 0), (1, 2), (2, 4), (3, 1), (4, 3)]
+    white = [(0, 1), (1, 3), (2, 0), (3, 2), (4, 4)]
+    dead = [move for pair in zip(black, white) for move in pair] + [(2, 2)]
+    record = GameRecord(5, 5, dead, RESULT_DRAW)
+    annotations = analyze_game(ai, 0, record, 500)
+    assert len(annotations) == len(dead)
+    last = annotations[-1]
+    assert last['best_move'] is None and last['eval'] == last['played_eval'] == 0
+    assert not last['blunder'] and not last['missed_win']
+    output = io.StringIO()
+    assert run_analysis([(0, record)], output, 1, 0, 500) == (1, len(dead)), "죽은 국면에서 분석 중단"
+    print("✅ 죽은 국면 뒤의 수 분석 성공")
+    
+    print("🎉 기보 분석 테스트 완료!\n")
+
+def test_shared_table():
+    """공유 메모리 치환표 테스트"""
+    print("🤝 공유 치환표 테스트 시작...")
+    
+    import io
+    import json
+    import pickle
+    from game_record import GameRecord
+    from analyze import run_analysis
+    from transposition import (SharedTranspositionTable, EXACT, LOWER, UPPER, NO_MOVE,
+                               pack_entry, unpack_entry)
+    
+    for entry in [(0, EXACT, 0, 0), (7, LOWER, -999990, NO_MOVE), (255, UPPER, 10000000, 4000000)]:
+        assert unpack_entry(pack_entry(*entry)) == entry, "항목 압축 오류"
+    print("✅ 항목 압축/복원 성공")
+    
+    table = SharedTranspositionTable(1000)
+    try:
+        assert table.max_entries >= 1000 and len(table) == 0
+        table.store(12345, 3, EXACT, 50, 7)
+        table.store(12345, 2, LOWER, 10, 8)  # 더 얕은 결과로 덮어쓰지 않음
+        assert table.probe(12345) == (3, EXACT, 50, 7)
+        table.store(12345, 4, UPPER, -20, NO_MOVE)
+        assert table.probe(12345) == (4, UPPER, -20, NO_MOVE)
+        assert table.probe(54321) is None
+        
+        # 피클로 넘긴 표는 같은 공유 메모리에 연결됨
+        other = pickle.loads(pickle.dumps(table))
+        other.store(99, 1, EXACT, 5, 1)
+        assert table.probe(99) == (1, EXACT, 5, 1), "다른 연결에서 저장한 항목이 보여야 함"
+        other.close()
+        
+        # 용량보다 많이 저장해도 표 크기는 고정, 남은 항목은 모두 정확함
+        rng = random.Random(1)
+        stored = {}
+        for _ in range(5000):
+            key = rng.getrandbits(64)
+            stored[key] = (rng.randint(1, 9), EXACT, rng.randint(-1000, 1000), rng.randint(0, 224))
+            table.store(key, *stored[key])
+        assert len(table) <= table.max_entries
+        assert all(table.probe(key) in (None, entry) for key, entry in stored.items())
+        table.clear()
+        assert len(table) == 0
+        print("✅ 저장/조회/교체 성공")
+        
+        # 워커들이 함께 쓰는 표로 분석해도 모든 게임의 모든 수가 기록되어야 함
+        moves = [(3, 3), (3, 4), (4, 4), (2, 2), (4, 3), (5, 5), (4, 2)]
+        record = GameRecord(7, 7, moves, 0)
+        tasks = [(i, record) for i in range(3)]
+        private, shared = io.StringIO(), io.StringIO()
+        run_analysis(tasks, private, 2, 1, 500)
+        run_analysis(tasks, shared, 2, 1, 500, shared_table=table)
+        assert len(table) > 0, "워커가 공유 표에 저장해야 함"
+        def plies(output):
+            return sorted((line['game'], line['ply'], tuple(line['move']))
+                          for line in map(json.loads, output.getvalue().splitlines()))
+        assert plies(private) == plies(shared) and len(plies(shared)) == 3 * len(moves)
+        print("✅ 공유 치환표 병렬 분석 성공")
+    finally:
+        table.close()
+        table.unlink()
+    
+    print("🎉 공유 치환표 테스트 완료!\n")
+
+def test_persistent_table():
+    """파일 매핑 치환표 테스트"""
+    print("💾 파일 치환표 테스트 시작...")
+    
+    import tempfile
+    from transposition import PersistentTranspositionTable, position_key, EXACT, LOWER
+    from sparse_board import SparseBoard
+    
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "cache.bin")
+        table = PersistentTranspositionTable(path, 1000)
+        assert len(table) == 0 and table.max_entries >= 1000
+        table.store(42, 3, EXACT, -15, 9)
+        table.close()
+        
+        # 다시 열면 (다른 크기를 요청해도) 기존 파일과 항목을 그대로 씀
+        table = PersistentTranspositionTable(path, 10)
+        assert table.probe(42) == (3, EXACT, -15, 9), "재시작 뒤 항목이 남아 있어야 함"
+        size = os.path.getsize(path)
+        
+        # 같은 파일을 연 두 번째 연결이 쓴 항목이 바로 보임
+        other = PersistentTranspositionTable(path)
+        other.store(43, 1, LOWER, 7, 0)
+        assert table.probe(43) == (1, LOWER, 7, 0)
+        other.close()
+        
+        # 용량을 넘게 저장해도 파일 크기는 고정
+        for key in range(5000):
+            table.store(key * 7919, 1, EXACT, key, 0)
+        assert len(table) <= table.max_entries and os.path.getsize(path) == size
+        table.close()
+        print("✅ 재시작/동시 연결/크기 제한 성공")
+        
+        # 평가 tag가 다르면 옛 점수를 버리고 새 파일로 시작
+        table = PersistentTranspositionTable(path, 1000, tag=1)
+        assert len(table) == 0 and table.probe(42) is None
+        table.close()
+        print("✅ tag가 다른 파일 초기화 성공")
+        
+        # AI가 파일 치환표를 쓰면 재시작 뒤 같은 국면은 더 적은 노드로 탐색
+        board = Board(9, 9)
+        for x, y, player in [(4, 4, 1), (5, 5, 2), (4, 5, 1), (3, 3, 2)]:
+            board.place_stone(x, y, player)
+        cold = AIPlayer()
+        cold.transposition_table = PersistentTranspositionTable(os.path.join(directory, "ai.bin"))
+        cold_move, _ = cold.search(board, 1, 2)
+        cold_nodes = cold.nodes
+        cold.transposition_table.close()
+        warm = AIPlayer()
+        warm.transposition_table = PersistentTranspositionTable(os.path.join(directory, "ai.bin"))
+        warm.search(board, 1, 2)
+        assert warm.nodes < cold_nodes, "채워진 캐시에서 노드 수가 줄어야 함"
+        warm.transposition_table.close()
+        print("✅ 재시작 뒤 탐색 재사용 성공 (노드 {} -> {})".format(cold_nodes, warm.nodes))
+        
+        # 큰 보드의 칸 키는 크기와 관계없으므로 크기가 다른 보드의 같은 배치는 크기 키로 구분
+        small, large = SparseBoard(300, 300), SparseBoard(500, 500)
+        for other_board in (small, large):
+            other_board.place_stone(2, 4, 1)
+        assert small.canonical_hash() == large.canonical_hash()
+        assert position_key(small, 1)[0] != position_key(large, 1)[0], "크기가 키에 섞여야 함"
+        assert cold.eval_cache_key(small, 1) != cold.eval_cache_key(large, 1)
+        print("✅ 보드 크기별 키 구분 성공")
+    
+    print("🎉 파일 치환표 테스트 완료!\n")
+
+def test_tuning():
+    """라인 점수 가중치와 SPSA 조정 테스트"""
+    print("🎛️ 가중치 조정 테스트 시작...")
+    
+    import json
+    import tempfile
+    from patterns import run_class
+    from tune import tune, theta_from_weights, weights_from_theta
+    
+    ai = AIPlayer()
+    defaults = dict(AIPlayer.DEFAULT_LINE_WEIGHTS)
+    assert ai.get_line_score(4, 0) == defaults['open_four'] and ai.weights_tag() == 0
+    assert weights_from_theta(theta_from_weights(defaults)) == defaults, "로그 공간 변환 오류"
+    
+    ai.set_line_weights({'open_three': 250})
+    assert ai.get_line_score(3, 0) == 250 and ai.get_line_score(3, 1) == defaults['three']
+    assert ai.weights_tag() != 0, "바뀐 점수는 다른 tag"
+    print("✅ 라인 점수 교체 성공")
+    
+    with tempfile.TemporaryDirectory() as directory:
+        checkpoint = os.path.join(directory, "checkpoint.json")
+        output = os.path.join(directory, "weights.json")
+        quiet = lambda message: None
+        state = tune(checkpoint, output, 1, 2, 1, 7, 0, log=quiet)
+        assert state['iteration'] == 1 and len(state['history']) == 1
+        
+        # 다시 실행하면 체크포인트에서 이어감 (끝난 반복은 다시 하지 않음)
+        state = tune(checkpoint, output, 2, 2, 1, 7, 0, log=quiet)
+        assert state['iteration'] == 2 and [h['iteration'] for h in state['history']] == [1, 2]
+        
+        with open(output, encoding='utf-8') as stream:
+            weights = json.load(stream)['weights']
+        loaded = AIPlayer()
+        loaded.load_weights(output)
+        assert loaded.line_weights == weights, "가중치 파일 읽기 오류"
+        assert loaded.run_scores[run_class(3, 0)] == weights['open_three'], "평가 조회표 갱신 오류"
+    print("✅ SPSA 반복/체크포인트/가중치 파일 성공")
+    
+    print("🎉 가중치 조정 테스트 완료!\n")
+
+def test_server():
+    """asyncio 대국 서버 테스트"""
+    print("🌐 대국 서버 테스트 시작...")
+    
+    import asyncio
+    from server import GameServer, read_frame, write_frame
+    
+    async def scenario():
+        server = GameServer(workers=1)
+        port = await server.start()
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        
+        async def request(message):
+            write_frame(writer, message)
+            await writer.drain()
+            return await read_frame(reader)
+        
+        try:
+            # AI 대국: 사람의 수 뒤에 AI 수가 바로 옴
+            session = (await request({'op': 'new', 'size': 9, 'depth': 0}))['session']
+            reply = await request({'op': 'move', 'session': session, 'x': 4, 'y': 4, 'id': 7})
+            assert reply['ok'] and reply['ply'] == 2 and reply['id'] == 7, "AI 응답 오류"
+            assert tuple(reply['ai_move']) != (4, 4)
+            assert not (await request({'op': 'move', 'session': session, 'x': 4, 'y': 4}))['ok']
+            assert not (await request({'op': 'move', 'session': session, 'x': 9, 'y': 0}))['ok']
+            assert not (await request({'op': 'move', 'session': 999, 'x': 0, 'y': 0}))['ok']
+            assert not (await request({'op': 'new', 'size': 9, 'rule': 'gomoku'}))['ok']
+            print("✅ AI 수와 잘못된 수 거부 성공")
+            
+            # 두 사람 대국: 흑이 가로 5개를 만들면 끝남
+            session = (await request({'op': 'new', 'size': 9, 'ai': False}))['session']
+            for i in range(5):
+                reply = await request({'op': 'move', 'session': session, 'x': i, 'y': 0})
+                if i < 4:
+                    reply = await request({'op': 'move', 'session': session, 'x': i, 'y': 8})
+            assert reply['winner'] == 1 and reply['over'], "승리 판정 오류"
+            assert not (await request({'op': 'move', 'session': session, 'x': 8, 'y': 4}))['ok']
+            state = await request({'op': 'state', 'session': session})
+            assert len(state['moves']) == 9
+            assert (await request({'op': 'close', 'session': session}))['ok']
+            assert not (await request({'op': 'state', 'session': session}))['ok']
+            print("✅ 세션 상태와 승리 판정 성공")
+            
+            # AI 워커가 죽으면 오류로 응답하고 사람의 수도 무른 뒤, 새 풀로 다시 둠
+            session = (await request({'op': 'new', 'size': 9, 'depth': 0}))['session']
+            for process in list(server.executor._processes.values()):
+                process.kill()
+                process.join()
+            reply = await request({'op': 'move', 'session': session, 'x': 4, 'y': 4, 'id': 8})
+            assert not reply['ok'] and reply['id'] == 8, "워커 오류에 응답하지 않음"
+            assert (await request({'op': 'state', 'session': session}))['moves'] == []
+            reply = await request({'op': 'move', 'session': session, 'x': 4, 'y': 4})
+            assert reply['ok'] and reply['ply'] == 2, "풀을 다시 만들지 않음"
+            print("✅ 워커 오류 응답 성공")
+        finally:
+            writer.close()
+            await writer.wait_closed()
+            await server.close()
+    
+    asyncio.run(scenario())
+    print("🎉 대국 서버 테스트 완료!\n")
+
+def test_viewport():
+    """뷰포트 좌표 변환 테스트"""
+    print("🔭 뷰포트 테스트 시작...")
+    
+    from viewport import Viewport
+    
+    view = Viewport((100, 50, 400, 300), 40)
+    assert view.screen_to_cell(100, 50) == (0, 0)
+    assert view.screen_to_cell(179, 129) == (1, 1)
+    assert view.screen_to_cell(99, 50) is None, "뷰포트 밖은 None"
+    assert view.screen_to_cell(*view.cell_center(5, 3)) == (5, 3), "왕복 변환 오류"
+    print("✅ 좌표 변환 성공")
+    
+    # 확대/축소 시 마우스 아래 칸은 그대로
+    view.zoom_at(2.0, 300, 200)
+    assert view.cell_size == 80
+    assert view.screen_to_cell(300, 200) == (5, 3), "확대 기준점 이동"
+    view.zoom_at(0.01, 300, 200)
+    assert view.cell_size == view.min_cell_size, "최소 크기 제한 오류"
+    print("✅ 확대/축소 성공")
+    
+    # 보이는 칸은 보드 범위로 잘림
+    view = Viewport((0, 0, 400, 300), 40)
+    assert view.visible_cells() == (0, 0, 10, 8)
+    view.pan(-60, 0)
+    assert view.visible_cells(15, 15) == (0, 0, 9, 8)
+    assert view.visible_cell_count(15, 15) == 72
+    view.center_on(500, 500)
+    assert view.screen_to_cell(200, 150) == (500, 500)
+    assert view.visible_cell_count(15, 15) == 0, "보드 밖은 그리지 않음"
+    print("✅ 보이는 영역 계산 성공")
+    
+    # 큰 보드는 가운데를 비추고, 가장자리 근처로 옮겨도 보드 밖은 보이지 않게 맞춤
+    view = Viewport((0, 0, 400, 300), 40)
+    view.center_on(500, 500)
+    view.clamp(1000, 1000)
+    assert view.screen_to_cell(200, 150) == (500, 500), "큰 보드 가운데를 비추지 않음"
+    view.center_on(0, 999)
+    view.clamp(1000, 1000)
+    assert view.visible_cells(1000, 1000) == (0, 992, 10, 1000), "보드 밖이 보임"
+    view.center_on(2, 2)
+    view.clamp(5, 5)
+    assert (view.camera_x, view.camera_y) == (0, 0), "화면보다 작은 보드는 왼쪽 위에 맞춤"
+    print("✅ 보드 가운데 맞춤 성공")
+    
+    print("🎉 뷰포트 테스트 완료!\n")
+
+def test_board3d():
+    """3D 정육면체 보드 테스트"""
+    print("🧊 3D 보드 테스트 시작...")
+    
+    from board3d import Board3D, DIRECTIONS_3D, transform_point_3d, CANDIDATE_DISTANCE
+    
+    # 13방향 모두 승리 판정 (가운데를 지나는 5칸)
+    for direction in DIRECTIONS_3D:
+        board = Board3D(9)
+        line = [tuple(4 + k * d for d in direction) for k in range(-2, 3)]
+        for cell in line[:4]:
+            board.place_stone(*cell, 1)
+        assert board.check_win(*line[4], 1), "{} 방향 승리 판정 실패".format(direction)
+        assert not board.check_win(*line[4], 2), "상대 돌로 승리 판정"
+    
+    # 보드 끝을 넘어 이어지지 않음
+    board = Board3D(9)
+    for x, y, z in [(5, 0, 0), (6, 0, 0), (7, 0, 0), (8, 0, 0)]:
+        board.place_stone(x, y, z, 1)
+    assert not board.check_win(0, 1, 0, 1), "줄이 보드 끝을 넘어 이어짐"
+    assert board.check_win(4, 0, 0, 1)
+    print("✅ 13방향 승리 판정 성공")
+    
+    # 대칭인 국면은 같은 정규형 해시, 돌을 모두 빼면 빈 보드와 같음
+    stones = [(4, 4, 4, 1), (5, 4, 4, 2), (3, 2, 6, 1), (0, 8, 1, 2), (7, 7, 2, 1)]
+    board = Board3D(9)
+    empty_lines = board.lines.copy()
+    for x, y, z, player in stones:
+        board.place_stone(x, y, z, player)
+    for transform in (1, 13, 30, 47):
+        moved = Board3D(9)
+        for x, y, z, player in stones:
+            moved.place_stone(*transform_point_3d(x, y, z, transform, 9), player)
+        assert moved.canonical_hash() == board.canonical_hash(), "대칭 정규형 해시 불일치"
+    
+    # 후보 수 개수표는 직접 훑은 결과와 같아야 함
+    scanned = board.get_candidate_moves(CANDIDATE_DISTANCE + 1)
+    expected = set()
+    for sx, sy, sz, _ in stones:
+        for d in DIRECTIONS_3D:
+            for k in range(-CANDIDATE_DISTANCE, CANDIDATE_DISTANCE + 1):
+                cell = (sx + k * d[0], sy + k * d[1], sz + k * d[2])
+                if board.is_valid_move(*cell):
+                    expected.add(cell)
+    assert set(board.get_candidate_moves()) == expected, "후보 수 불일치"
+    assert expected < set(scanned)
+    
+    for x, y, z, _ in stones:
+        board.remove_stone(x, y, z)
+    assert (board.lines == empty_lines).all() and board.get_hash() == 0
+    assert not board.neighbor_counts, "후보 개수표가 남음"
+    print("✅ 대칭 해시와 후보 수 성공")
+    
+    # AI는 층을 가로지르는 4를 막고, 자신의 5를 완성함
+    ai = AIPlayer()
+    ai.search_depth = 1
+    board = Board3D(9)
+    for cell in [(2, 2, 2), (3, 3, 3), (4, 4, 4), (5, 5, 5)]:
+        board.place_stone(*cell, 1)
+    for cell in [(0, 8, 0), (8, 0, 8), (0, 0, 8)]:
+        board.place_stone(*cell, 2)
+    move, _ = ai.search(board, 2, 1)
+    assert move in [(1, 1, 1), (6, 6, 6)], "공간 대각선 4를 막지 못함: {}".format(move)
+    move, score = ai.search(board, 1, 1)
+    assert move in [(1, 1, 1), (6, 6, 6)] and ai.is_win_score(score), "승리 수를 찾지 못함"
+    print("✅ 3D AI 성공")
+    
+    print("🎉 3D 보드 테스트 완료!\n")
+
+def test_rules():
+    """렌주 / 정확히 5 규칙 테스트"""
+    print("📏 규칙 테스트 시작...")
+    
+    def make(rule, black, white=()):
+        board = Board(15, 15, rule)
+        for x, y in black:
+            board.place_stone(x, y, 1)
+        for x, y in white:
+            board.place_stone(x, y, 2)
+        return board
+    
+    # 3-3, 4-4, 장목 금수
+    assert make('renju', [(7, 5), (7, 6), (5, 7), (6, 7)]).is_forbidden(7, 7), "3-3 금수 실패"
+    assert make('renju', [(7, 4), (7, 6), (4, 7), (6, 7)]).is_forbidden(7, 7), "띈 3-3 금수 실패"
+    assert not make('renju', [(7, 5), (7, 6), (5, 7), (6, 7)], [(4, 7)]).is_forbidden(7, 7), \
+        "막힌 3을 열린 3으로 봄"
+    assert make('renju', [(7, 4), (7, 5), (7, 6), (4, 7), (5, 7), (6, 7)]).is_forbidden(7, 7), "4-4 금수 실패"
+    assert make('renju', [(3, 7), (5, 7), (7, 7), (9, 7)]).is_forbidden(6, 7), "한 줄 4-4 금수 실패"
+    board = make('renju', [(2, 7), (3, 7), (4, 7), (6, 7), (7, 7)])
+    assert board.is_forbidden(5, 7) and not board.check_win(5, 7, 1), "흑 장목이 승리로 처리됨"
+    
+    # 정확한 5는 4-4를 같이 만들어도 승리
+    board = make('renju', [(3, 7), (4, 7), (5, 7), (6, 7),
+                           (8, 4), (8, 5), (8, 6), (8, 9), (8, 10), (8, 11)])
+    assert not board.is_forbidden(7, 7) and board.check_win(7, 7, 1), "5 + 4-4 처리 실패"
+    print("✅ 금수 판정 성공")
+    
+    # 장목: 자유룰은 모두 승리, 렌주 백은 승리, 정확히 5 규칙은 승리 아님
+    overline = [(2, 7), (3, 7), (4, 7), (6, 7), (7, 7)]
+    assert make('standard', overline).check_win(5, 7, 1)
+    assert not make('standard', overline).is_forbidden(5, 7), "자유룰에 금수"
+    assert make('renju', [], overline).check_win(5, 7, 2), "렌주 백 장목 승리 실패"
+    assert not make('exact-five', [], overline).check_win(5, 7, 2), "정확히 5 규칙에서 장목 승리"
+    print("✅ 장목 판정 성공")
+    
+    # AI 흑은 금수 자리에 두지 않음
+    board = make('renju', overline, [(0, 0), (14, 14), (0, 14), (14, 0), (1, 1)])
+    move, score = AIPlayer().search(board, 1, 1)
+    assert move != (5, 7) and not board.is_forbidden(*move), "AI가 금수에 둠"
+    print("✅ AI 금수 회피 성공")
+    
+    print("🎉 규칙 테스트 완료!\n")
+
+def test_viability():
+    """이길 수 있는 5칸 창 수와 무승부 조기 판정 테스트"""
+    print("⚖️ 무승부 조기 판정 테스트 시작...")
+    
+    from sparse_board import SparseBoard
+    from board3d import Board3D
+    from patterns import RUN_CLASS
+    
+    def count_live(board, cells):
+        """직접 훑어 센 플레이어별 이길 수 있는 창 수"""
+        live = [None, 0, 0]
+        for cell in cells:
+            for direction in board.directions:
+                span = [tuple(c + k * d for c, d in zip(cell, direction)) for k in range(5)]
+                if not board.in_bounds(*span[-1]):
+                    continue
+                values = [board.get(*member) for member in span]
+                for player in (1, 2):
+                    live[player] += (3 - player) not in values
+        return live
+    
+    # 놓기/빼기를 섞어도 직접 센 값과 같고, 모두 빼면 처음 값으로 돌아옴
+    rng = random.Random(7)
+    cells_2d = [(x, y) for y in range(9) for x in range(11)]
+    cells_3d = [(x, y, z) for z in range(5) for y in range(5) for x in range(5)]
+    for board, cells in ((Board(9, 11), cells_2d), (SparseBoard(9, 11), cells_2d),
+                         (Board3D(5), cells_3d)):
+        initial = board.live_windows[:]
+        assert count_live(board, cells) == initial
+        placed = []
+        for step in range(120):
+            if placed and rng.random() < 0.3:
+                board.remove_stone(*placed.pop(rng.randrange(len(placed))))
+            else:
+                cell = rng.choice(cells)
+                if board.place_stone(*cell, rng.choice((1, 2))):
+                    placed.append(cell)
+            if step % 20 == 0:
+                assert count_live(board, cells) == board.live_windows, "창 수 불일치"
+        assert board.copy().live_windows == board.live_windows
+        for cell in placed:
+            board.remove_stone(*cell)
+        assert board.live_windows == initial, "창 수가 처음으로 돌아오지 않음"
+    assert not SparseBoard().is_dead()
+    print("✅ 창 수 증분 갱신 성공")
+    
+    # 5x5 보드에서 10수 만에 모든 창에 흑백이 섞이면 무승부 확정
+    board = Board(5, 5)
+    black = [(0, 0), (1, 2), (2, 4), (3, 1), (4, 3)]
+    white = [(0, 1), (1, 3), (2, 0), (3, 2), (4, 4)]
+    for (bx, by), (wx, wy) in zip(black, white):
+        assert not board.is_dead(), "너무 일찍 무승부 판정"
+        board.place_stone(bx, by, 1)
+        board.place_stone(wx, wy, 2)
+    assert board.is_dead() and not board.is_full(), "무승부 조기 판정 실패"
+    ai = AIPlayer()
+    move, score = ai.search(board, 1, 3)
+    assert score == 0 and ai.nodes <= len(board.get_candidate_moves()), "죽은 국면을 계속 탐색함"
+    print("✅ 무승부 조기 판정 성공")
+    
+    # 이길 수 있는 창이 없는 방향의 연속 돌은 점수 0
+    board = Board(15, 15)
+    for x in range(3):
+        board.place_stone(x, 0, 1)
+    assert RUN_CLASS[board.get_window(1, 0, 0)] > 0
+    board.place_stone(3, 0, 2)
+    assert RUN_CLASS[board.get_window(1, 0, 0)] == 0, "죽은 방향에 점수가 남음"
+    print("✅ 죽은 창 점수 0 성공")
+    
+    print("🎉 무승부 조기 판정 테스트 완료!\n")
+
+def test_solver():
+    """증명수 탐색 해결기 테스트"""
+    print("🧮 해결기 테스트 시작...")
+    
+    import tempfile
+    from solver import ProofSolver, RESULT_WIN, RESULT_LOSS, RESULT_DRAW
+    from sparse_board import SparseBoard
+    
+    def exhaustive(board, player):
+        """모든 빈 칸을 보는 완전 탐색 결과 (1 승리, 0 무승부, -1 패배)"""
+        moves = board.get_valid_moves()
+        if any(board.check_win(*move, player) for move in moves):
+            return 1
+        best = 0 if not moves else -1
+        for move in moves:
+            board.place_stone(*move, player)
+            best = max(best, -exhaustive(board, 3 - player))
+            board.remove_stone(*move)
+            if best == 1:
+                break
+        return best
+    
+    # 3-3 자리를 찾아 승리를 증명
+    board = Board(9, 9)
+    for x, y, player in [(3, 4, 1), (4, 4, 1), (5, 2, 1), (5, 3, 1),
+                         (0, 0, 2), (8, 8, 2), (8, 0, 2), (0, 8, 2)]:
+        board.place_stone(x, y, player)
+    solver = ProofSolver(node_budget=20000)
+    assert solver.solve(board, 1) == (RESULT_WIN, (5, 4)), "3-3 승리 증명 실패"
+    print("✅ 승리 증명 성공 ({} 노드)".format(solver.nodes))
+    
+    # 작은 보드 끝내기는 완전 탐색과 결과가 같고, 탐색표 크기 제한을 지킴
+    rng = random.Random(3)
+    expected = {1: RESULT_WIN, 0: RESULT_DRAW, -1: RESULT_LOSS}
+    seen = set()
+    solver = ProofSolver(max_entries=200, node_budget=100000)
+    for _ in range(12):
+        board, player = Board(5, 5), 1
+        cells = board.get_valid_moves()
+        rng.shuffle(cells)
+        for cell in cells[:18]:
+            if board.check_win(*cell, player):
+                break
+            board.place_stone(*cell, player)
+            player = 3 - player
+        else:
+            result, move = solver.solve(board, player)
+            assert result == expected[exhaustive(board, player)], "해결기 결과 불일치"
+            assert len(solver.table) <= 200, "탐색표 크기 제한 초과"
+            seen.add(result)
+    assert RESULT_DRAW in seen and RESULT_WIN in seen
+    print("✅ 끝내기 결과 일치")
+    
+    # 돌에서 먼 칸도 아직 이길 수 있는 창에 들면 응수로 봄 (빼면 무승부/패배 증명이 틀림)
+    open_board = Board(11, 11)
+    open_board.place_stone(5, 5, 1)
+    moves = set(solver.generate_moves(open_board))
+    assert (0, 0) in moves and (10, 0) in moves and len(moves) == 11 * 11 - 1, "가장자리 칸을 빼고 증명함"
+    
+    # 끝난 노드와 증명 결과도 항목 수 제한을 지킴
+    bounded = ProofSolver(max_entries=50, node_budget=5000)
+    bounded.solve(Board(6, 6), 1)
+    assert len(bounded.table) <= 50, "끝난 노드가 탐색표 제한을 넘음"
+    for key in range(200):
+        bounded._store_result(key, (RESULT_WIN, 0))
+    assert len(bounded.results) <= 50 and 199 in bounded.results, "증명 결과가 제한을 넘음"
+    print("✅ 응수 생성과 크기 제한 성공")
+    
+    # 증명 결과는 파일에 저장되어 다음에는 탐색 없이 나옴
+    with tempfile.TemporaryDirectory() as path:
+        path = os.path.join(path, 'solver_results.bin')
+        solver = ProofSolver(path)
+        answer = solver.solve(board, player)
+        solver.save()
+        reloaded = ProofSolver(path)
+        assert reloaded.solve(board, player) == answer and reloaded.nodes == 0, "저장된 결과 재사용 실패"
+        assert os.path.getsize(path) == 7 + 11 * len(reloaded.results)
+        
+        
+        # 결과 파일은 보드 크기와 관계없이 하나이므로 크기가 다른 보드의 같은 배치는 다른 결과
+        small, large = SparseBoard(300, 300), SparseBoard(500, 500)
+        for other_board in (small, large):
+            other_board.place_stone(2, 4, 1)
+        assert small.canonical_hash() == large.canonical_hash()
+        reloaded.record(small, 2, RESULT_WIN, (3, 4))
+        assert reloaded.lookup(large, 2) is None, "다른 크기 보드의 결과를 재사용함"
+        assert reloaded.table_value(small, 2, 2) != reloaded.table_value(large, 2, 2)
+    print("✅ 결과 파일 성공")
+    
+    # AI는 볼 수가 적게 남으면 해결기의 수를 둠
+    ai = AIPlayer()
+    ai.set_difficulty("hard")
+    assert ai.get_best_move(board, player) == answer[1] or answer[0] == RESULT_LOSS
+    print("✅ AI 끝내기 성공")
+    
+    print("🎉 해결기 테스트 완료!\n")
+
+def test_fuzz():
+    """빠른 판정 차등 퍼징 테스트"""
+    print("🎲 차등 퍼징 테스트 시작...")
+    
+    from fuzz import CHECKS, fuzz, make_board, random_position, reference_check_win
+    
+    # 같은 seed면 같은 국면
+    assert random_position(random.Random(5), ['board']) == random_position(random.Random(5), ['board'])
+    
+    # 세 보드 종류 모두 빠른 구현과 기준 구현이 일치
+    stats, failures = fuzz(30, seed=11)
+    assert not failures, "불일치: {}".format(failures)
+    assert all(stat['cases'] > 0 for stat in stats.values())
+    print("✅ 판정 일치 ({}개 사례)".format(sum(stat['cases'] for stat in stats.values())))
+    
+    # 대각선을 보지 않는 잘못된 구현은 돌 4개짜리 최소 국면으로 잡힘
+    def broken_check_win(board, ai, query):
+        *cell, player = query
+        board = make_board('board', board.rows, board.rule,
+                           tuple((x, y, p) for (x, y), p in board.stones.items()
+                                 if x == cell[0] or y == cell[1]))
+        return board.check_win(*query)
+    
+    checks = {'check_win': (broken_check_win, reference_check_win, CHECKS['check_win'][2])}
+    _, failures = fuzz(200, seed=2, kinds=['board'], checks=checks, max_failures=1)
+    assert failures, "잘못된 구현을 찾지 못함"
+    kind, size, rule, operations, check, query = failures[0]
+    assert len(operations) == 4, "최소화 실패: {}".format(operations)
+    board = make_board(kind, size, rule, operations)
+    assert reference_check_win(board, None, query) and not broken_check_win(board, None, query)
+    print("✅ 불일치 최소화 성공")
+    
+    print("🎉 차등 퍼징 테스트 완료!\n")
+
+def test_batch_service():
+    """여러 대국 묶음 처리 테스트"""
+    print("📦 묶음 처리 테스트 시작...")
+    
+    from ai_player import REQUEST_THREATS, REQUEST_EVALUATE
+    from batch_service import BatchAIService, answer_requests
+    from fuzz import answer_values, make_board, random_position
+    from sparse_board import SparseBoard
+    
+    # 크기, 규칙, 종류가 섞인 요청 묶음의 답이 국면마다 따로 답한 것과 같음
+    rng = random.Random(7)
+    boards = [make_board(*random_position(rng, ['board', 'board', 'sparse', 'cube']))
+              for _ in range(24)]
+    requests = [(kind, board, player) for board in boards
+                for kind in (REQUEST_THREATS, REQUEST_EVALUATE) for player in (1, 2)]
+    answers = answer_requests(AIPlayer(), requests)
+    reference = AIPlayer()
+    for request, answer in zip(requests, answers):
+        assert answer_values(answer) == answer_values(reference.answer(request)), request[0]
+    print("✅ 묶음 답 일치 ({}개 요청)".format(len(requests)))
+    
+    # 여러 스레드에서 동시에 넣은 탐색이 혼자 탐색한 결과와 같음
+    positions = []
+    for seed in range(6):
+        rng = random.Random(seed)
+        board = Board(9, 9)
+        for i in range(4 + seed % 3):
+            moves = [(x, y) for x, y in board.get_valid_moves() if 2 <= x <= 6 and 2 <= y <= 6]
+            board.place_stone(*rng.choice(moves), 1 + i % 2)
+        positions.append((board, 1 + board.move_count % 2))
+    sparse = SparseBoard()
+    sparse.place_stone(0, 0, 1)
+    positions.append((sparse, 2))
+    
+    with BatchAIService(window=0.01) as service:
+        futures = [service.submit(board, player, 0) for board, player in positions]
+        results = [future.result(timeout=60) for future in futures]
+    for (board, player), result in zip(positions, results):
+        assert result == AIPlayer().search(board, player, 0), "탐색 결과 다름"
+    assert service.requests > service.batches, "요청이 묶이지 않음"
+    assert service.nodes >= len(positions)
+    print("✅ 묶음 탐색 결과 일치 ({}개 국면, 평균 묶음 {:.1f})".format(
+        len(positions), service.requests / service.batches))
+    
+    # 같은 AIPlayer의 사본으로 번갈아 진행한 탐색도 노드 수는 혼자 탐색한 것과 같음
+    # (보드 크기가 달라 치환표 항목을 같이 쓰지 않는 두 국면)
+    ai = AIPlayer()
+    searches = []
+    for size in (9, 11):
+        board = Board(size, size)
+        board.place_stone(4, 4, 1)
+        board.place_stone(5, 5, 2)
+        searcher = ai.fork()
+        searches.append([searcher, board, searcher.search_steps(board, 1, 1), None])
+    for search in searches:
+        search[3] = next(search[2])
+    while searches:
+        for search in list(searches):
+            searcher, board, steps, request = search
+            try:
+                search[3] = steps.send(ai.answer(request))
+            except StopIteration:
+                searches.remove(search)
+                reference = AIPlayer()
+                reference.search(board, 1, 1)
+                assert searcher.nodes == reference.nodes, "번갈아 돈 탐색의 노드 수가 섞임"
+    assert ai.nodes == 0
+    print("✅ 탐색별 노드 수 분리 성공")
+    
+    print("🎉 묶음 처리 테스트 완료!\n")
+
+def test_hints():
+    """후보 칸 힌트 증분 갱신 테스트"""
+    print("💡 힌트 테스트 시작...")
+    
+    from fuzz import make_board, random_position, REMOVE
+    from hints import HintMap
+    from patterns import THREAT_OPEN_FOUR
+    
+    # 열린 3 옆 칸은 흑에게 열린 4 자리, 백에게는 막아야 할 자리
+    board = Board(15, 15)
+    hints = HintMap(board)
+    for x in (5, 6, 7):
+        board.place_stone(x, 7, 1)
+        hints.stone_placed(x, 7)
+    open_four = AIPlayer.THREAT_ORDER_WEIGHTS[THREAT_OPEN_FOUR]
+    attack, defense = hints.get_hints(1)[(8, 7)]
+    assert attack >= open_four and defense == 0
+    assert hints.get_hints(2)[(8, 7)] == (0, attack)
+    assert set(hints.scores) == set(board.get_candidate_moves())
+    print("✅ 위협 점수 계산 성공")
+    
+    # 놓기/되돌리기를 섞어도 증분 갱신 결과가 처음부터 다시 만든 것과 같음
+    rng = random.Random(3)
+    for _ in range(60):
+        kind, size, rule, operations = random_position(rng, ['board', 'sparse', 'cube'])
+        board = make_board(kind, size, rule, [])
+        hints = HintMap(board)
+        for *cell, player in operations:
+            if player == REMOVE:
+                board.remove_stone(*cell)
+                hints.stone_removed(*cell)
+            else:
+                board.place_stone(*cell, player)
+                hints.stone_placed(*cell)
+        assert hints.scores == HintMap(board).scores, "증분 갱신 불일치 ({})".format(kind)
+        assert set(hints.scores) == (set(board.get_candidate_moves()) if board.stones else set())
+    print("✅ 증분 갱신 일치")
+    
+    print("🎉 힌트 테스트 완료!\n")
+
+def test_timeline():
+    """수순 타임라인 테스트"""
+    print("⏪ 타임라인 테스트 시작...")
+    
+    from fuzz import make_board, random_position, REMOVE
+    from hints import HintMap
+    from timeline import Timeline
+    
+    # 무르기/다시 두기와 새 수를 두면 뒤 수순을 버림
+    timeline = Timeline(Board(15, 15))
+    for move in [(7, 7), (8, 8), (7, 8), (9, 9)]:
+        assert timeline.play(move)
+    assert not timeline.play((7, 7)), "놓인 칸"
+    timeline.undo(2)
+    assert timeline.ply == 2 and timeline.player_to_move() == 1 and timeline.last_move() == (8, 8)
+    assert timeline.redo() == ([(7, 8)], [])
+    timeline.play((3, 3))
+    assert timeline.get_moves() == [(7, 7), (8, 8), (7, 8), (3, 3)] and timeline.at_end()
+    assert timeline.board.get(3, 3) == 2 and timeline.board.get(9, 9) == 0
+    print("✅ 무르기/다시 두기 성공")
+    
+    # 스냅숏을 거치든 하나씩 두고 빼든 임의의 수로 이동한 국면이 처음부터 둔 국면과 같고,
+    # 바뀐 칸만 반영한 힌트 점수도 다시 만든 것과 같음
+    rng = random.Random(4)
+    for _ in range(40):
+        kind, size, rule, operations = random_position(rng, ['board', 'sparse', 'cube'])
+        timeline = Timeline(make_board(kind, size, rule, []))
+        hints = HintMap(timeline.board)
+        for *cell, player in operations:
+            if player != REMOVE and timeline.play(tuple(cell)):
+                hints.stone_placed(*cell)
+        for _ in range(8):
+            placed, removed = timeline.seek(rng.randint(0, len(timeline)))
+            hints.apply_changes(timeline.board, placed, removed)
+            moves = [(*move, 1 + i % 2) for i, move in enumerate(timeline.get_moves())]
+            expected = make_board(kind, size, rule, moves)
+            assert timeline.board.stones == expected.stones, "국면 불일치 ({})".format(kind)
+            assert timeline.board.get_hash() == expected.get_hash()
+            assert hints.scores == HintMap(timeline.board).scores, "힌트 불일치 ({})".format(kind)
+    print("✅ 임의 이동 성공")
+    
+    # 긴 수순에는 스냅숏이 생기고, 지난 국면에서 새 수를 두면 그 뒤 스냅숏도 버림
+    timeline = Timeline(Board(15, 15))
+    cells = [(x, y) for y in range(15) for x in range(15)]
+    rng.shuffle(cells)
+    for cell in cells[:100]:
+        timeline.play(cell)
+    assert len(timeline.keyframes) > 1, "스냅숏 없음"
+    timeline.seek(10)
+    timeline.play(cells[50])
+    assert len(timeline) == 11 and max(timeline.keyframe_plies) <= 10
+    print("✅ 스냅숏 관리 성공")
+    
+    print("🎉 타임라인 테스트 완료!\n")
+
+def test_clock():
+    """대국 시계와 AI 시간 배분 테스트"""
+    print("⏱️ 대국 시계 테스트 시작...")
+    
+    import time
+    from clock import TimeControl, GameClock, TimeManager
+    
+    now = [0.0]
+    def timer():
+        return now[0]
+    
+    # 피셔: 둘 때마다 추가 시간, 다 쓰면 패배
+    clock = GameClock(TimeControl.parse("60+5"), timer)
+    clock.start(1)
+    now[0] = 10
+    clock.press()
+    clock.start(2)
+    assert clock.main[1] == 55 and clock.running == 2
+    now[0] = 20
+    assert clock.format(1) == "0:55" and clock.format(2) == "0:50"
+    now[0] = 100
+    assert clock.check() == 2 and clock.running is None
+    print("✅ 피셔 시계 성공")
+    
+    # 초읽기: 초읽기 안에 두면 그대로, 넘기면 한 번씩 줄고 모두 넘기면 패배
+    clock = GameClock(TimeControl.parse("10/3x30"), timer)
+    now[0] = 0
+    clock.start(1)
+    now[0] = 35
+    clock.press()
+    assert clock.main[1] == 0 and clock.periods[1] == 3
+    clock.start(1)
+    now[0] = 70
+    assert clock.state(1) == (0.0, 2, 25.0) and clock.format(1) == "0:25 (2)"
+    clock.press()
+    clock.start(1)
+    now[0] = 130
+    assert clock.check() == 1
+    print("✅ 초읽기 시계 성공")
+    
+    # 서든데스와 잘못된 규칙
+    assert str(TimeControl.parse("300")) == "300" and str(TimeControl.parse("300+2/5x10")) == "300+2/5x10"
+    for text in ["", "5m", "300/0x30", "300/3x0"]:
+        try:
+            TimeControl.parse(text)
+            assert False, "잘못된 규칙을 받음: {}".format(text)
+        except ValueError:
+            pass
+    
+    # 시간 배분: 목표는 최대 이하, 최대는 남은 시간 안 (초읽기 중에는 초읽기 한 번 안)
+    manager = TimeManager()
+    for text in ["300", "300+5", "300/3x30", "0/3x10", "1+5"]:
+        clock = GameClock(TimeControl.parse(text), timer)
+        target, limit = manager.allocate(clock, 2, 5)
+        main, periods, period = clock.state(2)
+        assert 0 <= target <= limit < main + period, text
+    print("✅ 시간 배분 성공")
+    
+    # 시간 제한 탐색: 둘 수가 하나뿐이면 바로 두고, 최대 시간은 넘기지 않음
+    ai = AIPlayer()
+    ai.set_difficulty("hard")
+    board = Board(15, 15)
+    for x, y, player in [(7, 7, 1), (8, 7, 1), (9, 7, 1), (10, 7, 1), (6, 7, 2), (7, 8, 2)]:
+        board.place_stone(x, y, player)
+    start = time.perf_counter()
+    assert ai.get_best_move(board, 2, (5.0, 20.0)) == (11, 7)
+    assert time.perf_counter() - start < 0.5, "강제 수에 시간을 씀"
+    
+    board = Board(15, 15)
+    for x, y, player in [(7, 7, 1), (8, 8, 2), (8, 7, 1), (9, 7, 2), (6, 8, 1), (7, 8, 2), (6, 6, 1)]:
+        board.place_stone(x, y, player)
+    start = time.perf_counter()
+    move = ai.get_best_move(board, 2, (0.05, 0.2))
+    assert move is not None and board.is_valid_move(*move)
+    assert time.perf_counter() - start < 0.5, "최대 시간 초과"
+    assert ai.deadline is None
+    print("✅ 시간 제한 탐색 성공")
+    
+    print("🎉 대국 시계 테스트 완료!\n")
+
 def main():
     """메인 테스트 함수"""
     print("🚀 3D 오목 게임 테스트 시작\n")
@@ -115,6 +1291,26 @@ def main():
         test_board()
         test_ai()
         test_win_scenarios()
+        test_search()
+        test_patterns()
+        test_sparse_board()
+        test_symmetry_hash()
+        test_game_record()
+        test_analysis()
+        test_shared_table()
+        test_persistent_table()
+        test_tuning()
+        test_server()
+        test_viewport()
+        test_board3d()
+        test_rules()
+        test_viability()
+        test_solver()
+        test_fuzz()
+        test_batch_service()
+        test_hints()
+        test_timeline()
+        test_clock()
         
         print("🎊 모든 테스트가 성공적으로 완료되었습니다!")
         print("게임을 실행하려면: python main.py")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 수순 타임라인 (무르기/다시 두기/임의의 수로 이동)
+
+수순은 칸 번호 (Board.encode_cell) 배열 하나로 들고, 중간중간 보드 스냅숏을 남긴다.
+    - 스냅숏은 마지막 스냅숏 뒤로 둔 수를 다시 두는 시간이 그 보드를 복사하는 시간만큼 쌓였을 때 남긴다.
+      (평면 보드는 복사가 싸서 몇 수마다, 희소 보드는 복사가 돌 수에 비례하므로 돌이 많을수록 드물게)
+    - 임의의 수로 이동할 때는 지금 보드에서 그 사이의 수를 하나씩 두거나 빼는 것과
+      목표 이전의 가장 가까운 스냅숏을 복사하고 남은 수만 두는 것 중 재어 둔 시간으로 싼 쪽을 고른다.
+이동 결과로 새로 놓인 칸과 빠진 칸을 돌려주므로 화면 캐시와 힌트 점수는 그 칸만 고치면 된다.
+흑과 백이 번갈아 두므로 플레이어는 수 번호로 정해진다.
+"""
+
+import time
+from array import array
+from bisect import bisect_right
+
+# 스냅숏 사이의 최소 수
+MIN_KEYFRAME_INTERVAL = 4
+
+# 한 수를 두거나 빼는 시간의 처음 추정값 (초, 두는 동안 지수 평균으로 고침)
+INITIAL_STEP_TIME = 10e-6
+
+
+class Timeline:
+    """수순 기록과 스냅숏으로 임의의 수로 이동하는 클래스"""
+
+    def __init__(self, board):
+        """빈 board에서 시작하는 타임라인 (board는 이동할 때 바뀌거나 스냅숏 복사본으로 바뀜)"""
+        self.board = board
+        self.moves = array('q')
+        self.ply = 0
+        self.step_time = INITIAL_STEP_TIME
+        # 스냅숏의 수 번호와 (보드, 복사에 걸린 시간) - 수 번호 순서
+        self.keyframe_plies = []
+        self.keyframes = []
+        self.add_keyframe()
+
+    def __len__(self):
+        return len(self.moves)
+
+    def at_end(self):
+        """마지막 수 뒤 국면인지"""
+        return self.ply == len(self.moves)
+
+    def player_to_move(self):
+        """지금 국면에서 둘 차례 (1 흑, 2 백)"""
+        return 1 + self.ply % 2
+
+    def get_move(self, index):
+        """index번째 (0부터) 수의 칸"""
+        return self.board.decode_cell(self.moves[index])
+
+    def get_moves(self):
+        """지금 국면까지의 수순 [(x, y), ...]"""
+        return [self.get_move(i) for i in range(self.ply)]
+
+    def last_move(self):
+        """지금 국면의 마지막 수 (없으면 None)"""
+        return self.get_move(self.ply - 1) if self.ply else None
+
+    def add_keyframe(self):
+        """지금 보드의 스냅숏 남기기"""
+        start = time.perf_counter()
+        snapshot = self.board.copy()
+        self.keyframe_plies.append(self.ply)
+        self.keyframes.append((snapshot, time.perf_counter() - start))
+
+    def play(self, move):
+        """지금 국면에 둘 차례의 돌을 놓음 (뒤에 이어지던 수순은 버림) - 놓았는지"""
+        start = time.perf_counter()
+        if not self.board.place_stone(*move, self.player_to_move()):
+            return False
+        self.step_time += (time.perf_counter() - start - self.step_time) / 16
+
+        del self.moves[self.ply:]
+        kept = bisect_right(self.keyframe_plies, self.ply)
+        del self.keyframe_plies[kept:], self.keyframes[kept:]
+        self.moves.append(self.board.encode_cell(*move))
+        self.ply += 1
+
+        since = self.ply - self.keyframe_plies[-1]
+        if since >= MIN_KEYFRAME_INTERVAL and since * self.step_time >= self.keyframes[-1][1]:
+            self.add_keyframe()
+        return True
+
+    def seek(self, ply):
+        """ply수 뒤 국면으로 이동 - (새로 놓인 칸 목록, 빠진 칸 목록)"""
+        ply = max(0, min(ply, len(self.moves)))
+        current = self.ply
+        if ply >= current:
+            placed, removed = [self.get_move(i) for i in range(current, ply)], []
+        else:
+            placed, removed = [], [self.get_move(i) for i in range(ply, current)]
+
+        index = bisect_right(self.keyframe_plies, ply) - 1
+        base = self.keyframe_plies[index]
+        keyframe, copy_time = self.keyframes[index]
+        if copy_time + (ply - base) * self.step_time < abs(ply - current) * self.step_time:
+            self.board = keyframe.copy()
+            current = base
+
+        board = self.board
+        for i in range(current, ply):
+            board.place_stone(*self.get_move(i), 1 + i % 2)
+        for i in range(current - 1, ply - 1, -1):
+            board.remove_stone(*self.get_move(i))
+        self.ply = ply
+        return placed, removed
+
+    def undo(self, count=1):
+        """count수 무르기"""
+        return self.seek(self.ply - count)
+
+    def redo(self, count=1):
+        """무른 수를 count수 다시 두기"""
+        return self.seek(self.ply + count)
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 치환표 (탐색 결과 캐시)
+
+키는 대칭 정규형 해시에 둘 차례를 섞은 값이고,
+최선의 수는 정규형 좌표의 칸 번호로 저장한다.
+
+SharedTranspositionTable은 같은 인터페이스로 multiprocessing.shared_memory 위에 놓인
+고정 크기 표를 써서 여러 프로세스가 잠금 없이 함께 조회/저장한다.
+    항목: 64비트 단어 2개 [키 ^ 데이터, 데이터]
+    데이터: 깊이 8비트 | 경계 2비트 | 점수 32비트 | 수 22비트
+    버킷: 항목 4개 (64바이트), 키의 하위 비트로 버킷을 고르고 가장 얕은 항목을 교체
+두 단어를 쓰는 사이에 다른 프로세스가 읽으면 키 ^ 데이터 검사가 맞지 않아 없는 항목으로 본다.
+
+PersistentTranspositionTable은 같은 배치를 파일에 두고 mmap으로 열어,
+게임이 끝나거나 프로그램을 다시 시작해도 탐색 결과를 이어 쓴다.
+    파일 형식: 64바이트 헤더 ('OMOKTT', 버전, 버킷 수, tag) + 버킷 배열
+"""
+
+import os
+import mmap
+import functools
+import struct
+from multiprocessing import shared_memory
+import numpy as np
+
+# 점수 경계 종류
+EXACT = 0   # 정확한 값
+LOWER = 1   # 하한 (베타 컷)
+UPPER = 2   # 상한 (알파 이하)
+
+# 백 차례 국면을 구분하기 위한 키
+SIDE_KEY = 0x9E3779B97F4A7C15
+
+NO_MOVE = -1
+
+# 공유 치환표 항목 배치
+KEY_MASK = (1 << 64) - 1
+BUCKET_ENTRIES = 4
+ENTRY_WORDS = 2
+BUCKET_WORDS = BUCKET_ENTRIES * ENTRY_WORDS
+WORD_BYTES = 8
+MAX_STORED_DEPTH = 255
+SCORE_SHIFT = 10
+SCORE_OFFSET = 1 << 31
+MOVE_SHIFT = 42
+STORED_NO_MOVE = (1 << 22) - 1  # 이보다 큰 칸 번호(아주 큰 무한 보드)는 수 없이 저장
+
+# 파일 치환표 헤더 (버킷 하나 크기로 맞춰 항목 단어 정렬을 유지)
+PERSISTENT_MAGIC = b'OMOKTT'
+PERSISTENT_VERSION = 2
+PERSISTENT_HEADER = struct.Struct('<6sHQQ')
+HEADER_WORDS = BUCKET_WORDS
+
+
+@functools.lru_cache(maxsize=None)
+def _shape_key(rows, cols, directions):
+    """보드 모양 (행, 열, 방향 수) 의 64비트 키 (splitmix64로 섞음, 무한 보드는 행/열 0)"""
+    key = 0
+    for value in (rows or 0, cols or 0, directions):
+        key = (key + value + 0x9E3779B97F4A7C15) & KEY_MASK
+        key = ((key ^ (key >> 30)) * 0xBF58476D1CE4E5B9) & KEY_MASK
+        key = ((key ^ (key >> 27)) * 0x94D049BB133111EB) & KEY_MASK
+        key ^= key >> 31
+    return key
+
+
+def size_key(board):
+    """보드 크기 키 (돌 배치가 같아도 크기가 다르면 가장자리 때문에 다른 국면)"""
+    return _shape_key(board.rows, board.cols, len(board.directions))
+
+
+def position_key(board, player):
+    """(치환표 키, 정규형 변환 번호) 반환 - 둘 차례와 보드 크기를 섞음"""
+    canonical_hash, transform = board.get_canonical()
+    canonical_hash ^= size_key(board)
+    if player == 2:
+        canonical_hash ^= SIDE_KEY
+    return canonical_hash, transform
+
+
+def encode_move(board, move, transform):
+    """실제 좌표의 수를 정규형 칸 번호로 변환"""
+    if move is None:
+        return NO_MOVE
+    return board.encode_cell(*board.to_canonical(*move, transform))
+
+
+def decode_move(board, move_index, transform):
+    """정규형 칸 번호를 실제 좌표의 수로 변환"""
+    if move_index == NO_MOVE:
+        return None
+    return board.from_canonical(*board.decode_cell(move_index), transform)
+
+
+class TranspositionTable:
+    """프로세스 내부 치환표 (딕셔너리, 크기 초과 시 비움)"""
+
+    def __init__(self, max_entries=500000):
+        """치환표 초기화"""
+        self.max_entries = max_entries
+        self.entries = {}
+
+    def probe(self, key):
+        """(깊이, 경계 종류, 점수, 수) 또는 None"""
+        return self.entries.get(key)
+
+    def store(self, key, depth, flag, score, move_index):
+        """탐색 결과 저장 (더 깊은 결과는 얕은 결과로 덮어쓰지 않음)"""
+        old = self.entries.get(key)
+        if old is not None and old[0] > depth:
+            return
+        if old is None and len(self.entries) >= self.max_entries:
+            self.entries.clear()
+        self.entries[key] = (depth, flag, score, move_index)
+
+    def clear(self):
+        """치환표 비우기"""
+        self.entries.clear()
+
+    def __len__(self):
+        return len(self.entries)
+
+
+def pack_entry(depth, flag, score, move_index):
+    """(깊이, 경계 종류, 점수, 수)를 64비트 데이터 단어로 묶기 (빈 칸과 겹치지 않도록 점수에 오프셋)"""
+    if move_index == NO_MOVE or move_index >= STORED_NO_MOVE:
+        move_index = STORED_NO_MOVE
+    depth = min(max(depth, 0), MAX_STORED_DEPTH)
+    return (depth | flag << 8 | (score + SCORE_OFFSET) << SCORE_SHIFT |
+            move_index << MOVE_SHIFT)
+
+
+def unpack_entry(data):
+    """64비트 데이터 단어를 (깊이, 경계 종류, 점수, 수)로 풀기"""
+    move_index = data >> MOVE_SHIFT
+    return (data & 0xFF, (data >> 8) & 3,
+            ((data >> SCORE_SHIFT) & 0xFFFFFFFF) - SCORE_OFFSET,
+            NO_MOVE if move_index == STORED_NO_MOVE else move_index)
+
+
+def _attach_shared_table(name):
+    """피클에서 복원할 때 같은 공유 메모리에 다시 연결"""
+    return SharedTranspositionTable(name=name)
+
+
+def bucket_count(max_entries):
+    """max_entries 이상을 담는 2의 거듭제곱 버킷 수"""
+    buckets = 1
+    while buckets * BUCKET_ENTRIES < max_entries:
+        buckets *= 2
+    return buckets
+
+
+class PackedTranspositionTable:
+    """64비트 단어 배열 위의 버킷 치환표 (공유 메모리/파일 매핑 치환표의 공통 부분)
+
+    하위 클래스가 buffer(쓰기 가능한 버퍼), offset(항목이 시작하는 단어 위치),
+    buckets를 정한 뒤 _attach()를 부른다.
+    """
+
+    def _attach(self, buffer, offset, buckets):
+        """버퍼의 offset 단어부터 buckets개 버킷을 치환표로 사용"""
+        self.buffer = buffer
+        self.offset = offset
+        self.max_entries = buckets * BUCKET_ENTRIES
+        self.bucket_mask = buckets - 1
+        # memoryview 원소 읽기/쓰기는 정렬된 8바이트 한 번이라 numpy 스칼라보다 빠름
+        self.words = buffer.cast('Q')
+
+    def __del__(self):
+        # 버퍼를 닫으려면 먼저 cast로 만든 memoryview를 놓아야 함
+        if hasattr(self, 'words'):
+            self.words.release()
+
+    def probe(self, key):
+        """(깊이, 경계 종류, 점수, 수) 또는 None"""
+        key &= KEY_MASK
+        words = self.words
+        base = self.offset + (key & self.bucket_mask) * BUCKET_WORDS
+        for i in range(base, base + BUCKET_WORDS, ENTRY_WORDS):
+            data = words[i + 1]
+            if data and words[i] ^ data == key:
+                return unpack_entry(data)
+        return None
+
+    def store(self, key, depth, flag, score, move_index):
+        """탐색 결과 저장 (같은 키의 더 깊은 결과는 유지, 아니면 버킷에서 가장 얕은 항목 교체)"""
+        key &= KEY_MASK
+        words = self.words
+        base = self.offset + (key & self.bucket_mask) * BUCKET_WORDS
+        target, target_depth = base, MAX_STORED_DEPTH + 1
+        for i in range(base, base + BUCKET_WORDS, ENTRY_WORDS):
+            data = words[i + 1]
+            if not data:
+                if target_depth >= 0:
+                    target, target_depth = i, -1
+                continue
+            if words[i] ^ data == key:
+                if data & 0xFF > depth:
+                    return
+                target = i
+                break
+            if data & 0xFF < target_depth:
+                target, target_depth = i, data & 0xFF
+        data = pack_entry(depth, flag, score, move_index)
+        words[target + 1] = data
+        words[target] = key ^ data
+
+    def entry_words(self):
+        """항목 영역의 numpy 보기 (단어 2개씩)"""
+        return np.frombuffer(self.buffer, dtype=np.uint64)[self.offset:]
+
+    def clear(self):
+        """치환표 비우기"""
+        self.entry_words()[:] = 0
+
+    def __len__(self):
+        return int(np.count_nonzero(self.entry_words()[1::ENTRY_WORDS]))
+
+
+class SharedTranspositionTable(PackedTranspositionTable):
+    """여러 프로세스가 함께 쓰는 고정 크기 치환표 (공유 메모리, 잠금 없음)
+
+    만든 프로세스가 unlink()로 공유 메모리를 지운다. 워커에는 객체를 그대로 넘기면
+    (피클 시 이름으로 다시 연결) 같은 표를 쓴다.
+    """
+
+    def __init__(self, max_entries=500000, name=None):
+        """max_entries 이상을 담는 2의 거듭제곱 개 버킷으로 표 생성, name이 있으면 기존 표에 연결"""
+        if name is None:
+            buckets = bucket_count(max_entries)
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=buckets * BUCKET_WORDS * WORD_BYTES)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            buckets = self.shm.size // (BUCKET_WORDS * WORD_BYTES)
+            self.owner = False
+        self.name = self.shm.name
+        self._attach(self.shm.buf, 0, buckets)
+
+    def __reduce__(self):
+        return _attach_shared_table, (self.name,)
+
+    def close(self):
+        """이 프로세스의 연결 닫기"""
+        self.words.release()
+        self.shm.close()
+
+    def unlink(self):
+        """공유 메모리 삭제 (만든 프로세스에서 close() 뒤 호출)"""
+        self.shm.unlink()
+
+
+class PersistentTranspositionTable(PackedTranspositionTable):
+    """디스크 파일을 메모리 매핑한 치환표 (게임, 재시작, 여러 게임 프로세스 사이에서 유지)
+
+    파일 크기는 처음 만들 때 정해지고 버킷 교체로만 항목이 바뀐다.
+    헤더가 맞지 않는 파일(다른 형식/평가 버전)은 임시 파일로 새로 만들어 원자적으로 바꿔 끼우므로,
+    이미 열어 둔 다른 프로세스는 옛 파일을 계속 쓰다가 다음에 열 때 새 파일을 쓴다.
+    """
+
+    def __init__(self, path, max_entries=1 << 20, tag=0):
+        """path의 파일을 열거나 만들기 (tag는 평가 방식이 바뀌면 옛 점수를 버리기 위한 번호)"""
+        self.path = path
+        self.tag = tag
+        self.stream = self._open(bucket_count(max_entries))
+        self.map = mmap.mmap(self.stream.fileno(), 0)
+        _, _, buckets, _ = PERSISTENT_HEADER.unpack_from(self.map)
+        self._attach(memoryview(self.map), HEADER_WORDS, buckets)
+
+    def _valid_header(self, stream):
+        """파일 헤더와 크기가 이 형식/tag와 맞는지"""
+        header = stream.read(PERSISTENT_HEADER.size)
+        if len(header) != PERSISTENT_HEADER.size:
+            return False
+        magic, version, buckets, tag = PERSISTENT_HEADER.unpack(header)
+        size = os.fstat(stream.fileno()).st_size
+        return (magic == PERSISTENT_MAGIC and version == PERSISTENT_VERSION and
+                tag == self.tag and buckets & (buckets - 1) == 0 and
+                size == (HEADER_WORDS + buckets * BUCKET_WORDS) * WORD_BYTES)
+
+    def _open(self, buckets):
+        """맞는 파일이 있으면 열고, 없으면 빈 표 파일을 만들어 열기"""
+        try:
+            stream = open(self.path, 'r+b')
+            if self._valid_header(stream):
+                return stream
+            stream.close()
+        except OSError:
+            pass
+        temp_path = '{}.{}.tmp'.format(self.path, os.getpid())
+        with open(temp_path, 'wb') as temp:
+            temp.write(PERSISTENT_HEADER.pack(PERSISTENT_MAGIC, PERSISTENT_VERSION,
+                                              buckets, self.tag))
+            temp.truncate((HEADER_WORDS + buckets * BUCKET_WORDS) * WORD_BYTES)
+        os.replace(temp_path, self.path)
+        return open(self.path, 'r+b')
+
+    def flush(self):
+        """매핑된 내용을 디스크에 기록"""
+        self.map.flush()
+
+    def close(self):
+        """기록하고 파일 닫기"""
+        self.words.release()
+        self.buffer.release()
+        self.map.flush()
+        self.map.close()
+        self.stream.close()
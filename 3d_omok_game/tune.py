@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 자체 대국으로 라인 점수 조정 (SPSA)
+
+AIPlayer의 라인 점수('five' 제외)를 로그 공간 θ에서 SPSA로 조정한다.
+    반복 k마다 모든 점수를 같은 크기 c_k, 무작위 부호 Δ로 흔든 θ+ = θ + c_k Δ, θ- = θ - c_k Δ를
+    짧은 자체 대국 여러 판(같은 무작위 초반을 흑백 바꿔 두 번씩)으로 겨루게 하고
+        θ += a_k * (θ+의 득점률 - θ-의 득점률) / (2 c_k) * Δ
+    로 옮긴다. 점수 하나를 바꿀 때마다 대국을 따로 할 필요가 없어 점수 개수와 무관하게 반복당 한 번의 대국 묶음이면 된다.
+대국은 프로세스 풀에 한 판씩 나눠 주고, 반복마다 체크포인트(JSON)와 가중치 파일을 원자적으로 쓴다.
+같은 명령을 다시 실행하면 체크포인트의 반복부터 이어간다. (반복 k의 난수는 seed + k로 정해 재현 가능)
+
+가중치 파일은 AIPlayer.load_weights()로 읽고, 게임은 game_records/weights.json이 있으면 자동으로 쓴다.
+
+사용 예:
+    python tune.py --iterations 50 --games 16 --workers 8
+    python tune.py --validate game_records/weights.json --games 40 --baseline-depth 2
+"""
+
+import os
+import json
+import math
+import time
+import random
+import argparse
+import multiprocessing
+from board import Board
+from ai_player import AIPlayer
+
+# 조정하는 라인 점수 ('five'는 승리와 같으므로 고정)
+TUNED_NAMES = [name for name in AIPlayer.DEFAULT_LINE_WEIGHTS if name != 'five']
+
+# SPSA 계수 (Spall의 권장 지수)
+SPSA_A = 0.5
+SPSA_C = 0.2
+SPSA_STABILITY = 5
+SPSA_ALPHA = 0.602
+SPSA_GAMMA = 0.101
+
+# 대국마다 무작위로 두는 초반 수 (흑백을 바꿔 같은 초반을 두 번 둠)
+OPENING_MOVES = 3
+
+CHECKPOINT_VERSION = 1
+
+
+def theta_from_weights(weights):
+    """라인 점수 -> 로그 공간 매개변수 목록"""
+    return [math.log(max(weights[name], 1)) for name in TUNED_NAMES]
+
+
+def weights_from_theta(theta):
+    """로그 공간 매개변수 -> 라인 점수 (정수, 'five'는 기본값)"""
+    weights = dict(AIPlayer.DEFAULT_LINE_WEIGHTS)
+    for name, value in zip(TUNED_NAMES, theta):
+        weights[name] = max(1, int(round(math.exp(value))))
+    return weights
+
+
+def play_game(task):
+    """(흑 점수, 백 점수, 초반 seed, 크기, 흑 깊이, 백 깊이) 한 판 -> 승자 (0은 무승부)"""
+    black_weights, white_weights, seed, size, black_depth, white_depth = task
+    rng = random.Random(seed)
+    board = Board(size, size)
+    players = [None, AIPlayer(), AIPlayer()]
+    players[1].set_line_weights(black_weights)
+    players[2].set_line_weights(white_weights)
+    depths = [None, black_depth, white_depth]
+
+    player = 1
+    while not board.is_dead() and not board.is_full():
+        if board.move_count < OPENING_MOVES:
+            # 초반은 중앙 근처의 무작위 수
+            cx, cy = board.center()
+            moves = [(x, y) for x, y in board.get_valid_moves()
+                     if abs(x - cx) <= 2 and abs(y - cy) <= 2]
+            move = rng.choice(moves)
+        else:
+            move, _ = players[player].search(board, player, depths[player])
+        board.place_stone(*move, player)
+        if board.check_win(*move, player):
+            return player
+        player = 3 - player
+    return 0
+
+
+def match(pool, weights, other_weights, games, seed, size, depth, other_depth=None):
+    """weights가 other_weights를 상대로 얻은 득점률 (승 1, 무 0.5, 패 0 의 평균)"""
+    if other_depth is None:
+        other_depth = depth
+    tasks = []
+    for i in range((games + 1) // 2):
+        opening = seed * 100003 + i
+        tasks.append((weights, other_weights, opening, size, depth, other_depth))
+        tasks.append((other_weights, weights, opening, size, other_depth, depth))
+    points = 0.0
+    for i, winner in enumerate(pool.map(play_game, tasks, chunksize=1)):
+        # 짝수 번째 대국은 weights가 흑
+        mine = 1 if i % 2 == 0 else 2
+        points += 0.5 if winner == 0 else float(winner == mine)
+    return points / len(tasks)
+
+
+def write_json(path, data):
+    """임시 파일에 쓰고 바꿔 끼워 중간에 끊겨도 이전 파일이 남도록 기록"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'w', encoding='utf-8') as stream:
+        json.dump(data, stream, indent=2)
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(path):
+    """체크포인트 읽기 (없거나 형식이 다르면 None)"""
+    try:
+        with open(path, encoding='utf-8') as stream:
+            checkpoint = json.load(stream)
+    except (OSError, ValueError):
+        return None
+    if checkpoint.get('version') != CHECKPOINT_VERSION:
+        return None
+    return checkpoint
+
+
+def tune(checkpoint_path, output_path, iterations, games, workers, size, depth, seed=0,
+         log=print):
+    """SPSA 조정 실행 (체크포인트가 있으면 이어서) - 마지막 체크포인트 반환"""
+    checkpoint = load_checkpoint(checkpoint_path) or {
+        'version': CHECKPOINT_VERSION,
+        'iteration': 0,
+        'theta': theta_from_weights(AIPlayer.DEFAULT_LINE_WEIGHTS),
+        'history': [],
+    }
+    theta = checkpoint['theta']
+
+    with multiprocessing.Pool(workers) as pool:
+        for k in range(checkpoint['iteration'], iterations):
+            start = time.time()
+            rng = random.Random(seed + k)
+            a_k = SPSA_A / (k + 1 + SPSA_STABILITY) ** SPSA_ALPHA
+            c_k = SPSA_C / (k + 1) ** SPSA_GAMMA
+            delta = [rng.choice((-1, 1)) for _ in theta]
+            plus = weights_from_theta([t + c_k * d for t, d in zip(theta, delta)])
+            minus = weights_from_theta([t - c_k * d for t, d in zip(theta, delta)])
+
+            # θ+의 득점률에서 θ-의 득점률 (1 - 득점률) 을 뺀 값
+            score = 2 * match(pool, plus, minus, games, seed + k, size, depth) - 1
+            step = a_k * score / (2 * c_k)
+            theta = [t + step * d for t, d in zip(theta, delta)]
+
+            weights = weights_from_theta(theta)
+            checkpoint['iteration'] = k + 1
+            checkpoint['theta'] = theta
+            checkpoint['history'].append({'iteration': k + 1, 'score': score, 'weights': weights})
+            write_json(checkpoint_path, checkpoint)
+            write_json(output_path, {'weights': weights, 'iterations': k + 1,
+                                     'games_per_iteration': (games + 1) // 2 * 2,
+                                     'size': size, 'depth': depth})
+            log("반복 {:>4}: θ+ 대 θ- {:+.2f}, {:.1f}초, {}".format(
+                k + 1, score, time.time() - start,
+                ' '.join('{}={}'.format(name, weights[name]) for name in TUNED_NAMES)))
+    return checkpoint
+
+
+def main():
+    """조정 도구 명령줄 진입점"""
+    parser = argparse.ArgumentParser(description="자체 대국 SPSA 라인 점수 조정")
+    parser.add_argument('--iterations', type=int, default=50, help="총 SPSA 반복 수")
+    parser.add_argument('--games', type=int, default=16, help="반복마다 대국 수 (짝수로 올림)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="워커 프로세스 수")
+    parser.add_argument('--size', type=int, default=9, help="자체 대국 보드 크기")
+    parser.add_argument('-d', '--depth', type=int, default=1, help="자체 대국 탐색 깊이")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--checkpoint', default='tune_checkpoint.json')
+    parser.add_argument('-o', '--output', default=os.path.join('game_records', 'weights.json'),
+                        help="가중치 파일 (게임이 자동으로 읽는 위치가 기본)")
+    parser.add_argument('--validate', metavar='WEIGHTS',
+                        help="조정하지 않고 가중치 파일을 기본 점수와 겨루게 함")
+    parser.add_argument('--baseline-depth', type=int,
+                        help="검증 때 기본 점수 쪽 탐색 깊이 (더 깊은 기본 AI와 비교)")
+    args = parser.parse_args()
+
+    if args.validate:
+        with open(args.validate, encoding='utf-8') as stream:
+            weights = json.load(stream)['weights']
+        with multiprocessing.Pool(args.workers) as pool:
+            rate = match(pool, weights, AIPlayer.DEFAULT_LINE_WEIGHTS, args.games, args.seed,
+                         args.size, args.depth, args.baseline_depth)
+        print("조정된 점수 (깊이 {}) 대 기본 점수 (깊이 {}): 득점률 {:.1%}".format(
+            args.depth, args.baseline_depth if args.baseline_depth is not None else args.depth,
+            rate))
+        return
+
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    tune(args.checkpoint, args.output, args.iterations, args.games, args.workers,
+         args.size, args.depth, args.seed)
+
+
+if __name__ == "__main__":
+    main()
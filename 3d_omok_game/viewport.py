@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+3D 오목 게임 - 화면 뷰포트 (이동/확대 및 보이는 영역 계산)
+
+보드 좌표 (칸 단위) 와 화면 좌표 (픽셀) 사이의 변환만 담당하므로 pygame 없이 쓸 수 있다.
+"""
+
+import math
+
+
+class Viewport:
+    """보드를 비추는 카메라 클래스"""
+
+    def __init__(self, screen_rect, cell_size=40, min_cell_size=8, max_cell_size=96):
+        """뷰포트 초기화 (screen_rect = (x, y, 너비, 높이))"""
+        self.screen_x, self.screen_y, self.width, self.height = screen_rect
+        self.cell_size = cell_size
+        self.min_cell_size = min_cell_size
+        self.max_cell_size = max_cell_size
+
+        # 화면 영역 왼쪽 위에 오는 보드 좌표 (칸 단위, 실수)
+        self.camera_x = 0.0
+        self.camera_y = 0.0
+
+        # 뷰포트가 바뀔 때마다 증가 (그리기 캐시 무효화용)
+        self.version = 0
+
+    def cell_to_screen(self, x, y):
+        """칸의 왼쪽 위 화면 좌표"""
+        return (int(round(self.screen_x + (x - self.camera_x) * self.cell_size)),
+                int(round(self.screen_y + (y - self.camera_y) * self.cell_size)))
+
+    def cell_center(self, x, y):
+        """칸 중심의 화면 좌표"""
+        left, top = self.cell_to_screen(x, y)
+        return left + int(self.cell_size) // 2, top + int(self.cell_size) // 2
+
+    def contains(self, px, py):
+        """화면 좌표가 뷰포트 영역 안인지 확인"""
+        return (self.screen_x <= px < self.screen_x + self.width and
+                self.screen_y <= py < self.screen_y + self.height)
+
+    def screen_to_cell(self, px, py):
+        """화면 좌표의 칸 (뷰포트 밖이면 None)"""
+        if not self.contains(px, py):
+            return None
+        return (int(math.floor(self.camera_x + (px - self.screen_x) / self.cell_size)),
+                int(math.floor(self.camera_y + (py - self.screen_y) / self.cell_size)))
+
+    def visible_cells(self, cols=None, rows=None):
+        """보이는 칸 범위 (x0, y0, x1, y1), x1/y1은 포함하지 않음
+
+        cols/rows를 주면 보드 범위로 잘라낸다.
+        """
+        x0 = int(math.floor(self.camera_x))
+        y0 = int(math.floor(self.camera_y))
+        x1 = int(math.ceil(self.camera_x + self.width / self.cell_size))
+        y1 = int(math.ceil(self.camera_y + self.height / self.cell_size))
+        if cols is not None:
+            x0, x1 = max(0, x0), min(cols, x1)
+        if rows is not None:
+            y0, y1 = max(0, y0), min(rows, y1)
+        return x0, y0, x1, y1
+
+    def visible_cell_count(self, cols=None, rows=None):
+        """보이는 칸 개수"""
+        x0, y0, x1, y1 = self.visible_cells(cols, rows)
+        return max(0, x1 - x0) * max(0, y1 - y0)
+
+    def pan(self, dx, dy):
+        """픽셀 단위로 화면 이동 (양수면 보드가 왼쪽/위로 움직임)"""
+        self.camera_x += dx / self.cell_size
+        self.camera_y += dy / self.cell_size
+        self.version += 1
+
+    def zoom_at(self, factor, px, py):
+        """(px, py) 아래의 보드 위치를 고정한 채 확대/축소"""
+        new_size = max(self.min_cell_size, min(self.max_cell_size, self.cell_size * factor))
+        if new_size == self.cell_size:
+            return
+        world_x = self.camera_x + (px - self.screen_x) / self.cell_size
+        world_y = self.camera_y + (py - self.screen_y) / self.cell_size
+        self.cell_size = new_size
+        self.camera_x = world_x - (px - self.screen_x) / self.cell_size
+        self.camera_y = world_y - (py - self.screen_y) / self.cell_size
+        self.version += 1
+
+    def center_on(self, x, y):
+        """칸 (x, y) 가 화면 영역 가운데 오도록 이동"""
+        self.camera_x = x + 0.5 - self.width / self.cell_size / 2
+        self.camera_y = y + 0.5 - self.height / self.cell_size / 2
+        self.version += 1
+
+    def clamp(self, cols, rows):
+        """보드 (cols x rows 칸) 밖이 보이지 않도록 이동 (보드가 화면보다 작은 쪽은 왼쪽/위에 맞춤)"""
+        camera_x = min(max(self.camera_x, 0.0), max(0.0, cols - self.width / self.cell_size))
+        camera_y = min(max(self.camera_y, 0.0), max(0.0, rows - self.height / self.cell_size))
+        if (camera_x, camera_y) != (self.camera_x, self.camera_y):
+            self.camera_x, self.camera_y = camera_x, camera_y
+            self.version += 1